@@ -1,69 +1,386 @@
 # File: multilingual-support/adapter_manager.py
 
-import boto3
+import hashlib
 import json
 import os
-from typing import Dict, Optional
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterator, List, Optional, Union
+from botocore.exceptions import ReadTimeoutError
+from aws_clients import get_runtime_client
 from logger import setup_logger
-from config import ADAPTER_CONFIGS, SAGEMAKER_CONFIG
+from metrics import MetricsRegistry, get_registry
+from config import (ADAPTER_CONFIGS, BATCHING_CONFIG, CACHE_CONFIG, COALESCING_CONFIG, DEADLINE_CONFIG,
+                    HEDGING_CONFIG, SAGEMAKER_CONFIG)
+from deadline import Deadline, DeadlineExceeded, max_tokens_within, read_timeout_for
+from hedging import HedgedInvoker
+from micro_batcher import MicroBatcher
+from prompt_shaper import PromptShaper
+from resilience import CircuitBreaker, CircuitOpenError, RetryPolicy
+from response_cache import ResponseCache, normalize_query
+from single_flight import SingleFlight
+from streaming import StreamLatencyStats, TokenStreamDecoder
 
 logger = setup_logger('adapter_manager')
 
 class LoraAdapterManager:
-    def __init__(self, endpoint_name: str = SAGEMAKER_CONFIG['endpoint_name']):
-        """Initialize the LORA adapter manager"""
-        self.runtime = boto3.client('sagemaker-runtime')
+    GENERATION_PARAMETERS = {'temperature': 0.7, 'do_sample': True}
+
+    def __init__(self, endpoint_name: str = SAGEMAKER_CONFIG['endpoint_name'],
+                 response_cache: Optional[ResponseCache] = None,
+                 runtime=None,
+                 metrics: Optional[MetricsRegistry] = None,
+                 prompt_shaper: Optional[PromptShaper] = None):
+        """
+        Initialize the LORA adapter manager
+
+        Args:
+            endpoint_name (str): SageMaker endpoint to invoke
+            response_cache (ResponseCache, optional): Cache used instead of the CACHE_CONFIG default
+            runtime (optional): sagemaker-runtime client, e.g. a FakeSageMakerRuntime for offline runs
+            metrics (MetricsRegistry, optional): Registry for stage timings; defaults to the process-wide one
+            prompt_shaper (PromptShaper, optional): Fits inputs to the token limits and picks max_new_tokens
+        """
+        # Only the shared clients, or a router's, can be swapped for one with a shorter read timeout
+        self._shared_runtime = runtime is None
+        self.runtime = runtime or get_runtime_client()
         self.endpoint_name = endpoint_name
+        if response_cache is None and CACHE_CONFIG['enabled']:
+            response_cache = ResponseCache()
+        self.response_cache = response_cache
+        self.single_flight = SingleFlight() if COALESCING_CONFIG['enabled'] else None
+        self.stream_stats = StreamLatencyStats()
+        self.metrics = metrics or get_registry()
+        self.prompt_shaper = prompt_shaper or PromptShaper(metrics=self.metrics)
+        self.retry_policy = RetryPolicy()
+        self.circuit_breaker = CircuitBreaker()
+        # Opt-in: duplicates calls that outlive the adapter's observed p95
+        self.hedger = HedgedInvoker() if HEDGING_CONFIG['enabled'] else None
+        # Opt-in: concurrent requests for the same adapter share one multi-input payload
+        self.batcher = MicroBatcher(self._send_batch, metrics=self.metrics) if BATCHING_CONFIG['enabled'] else None
         self.current_language = None
         self.current_domain = None
 
+    def _adapter_name(self, language: str, domain: str) -> str:
+        """Resolve the combined language-domain adapter name"""
+        return f"{ADAPTER_CONFIGS['languages'][language]['name']}-{ADAPTER_CONFIGS['domains'][domain]}"
+
     def _format_prompt(self, input_text: str, language: str, domain: str) -> Dict:
-        """Format the input prompt with adapter information"""
-        adapter_name = f"{ADAPTER_CONFIGS['languages'][language]['name']}-{ADAPTER_CONFIGS['domains'][domain]}"
-        
+        """Format the input prompt with adapter information, shaped to the endpoint's token limits"""
+        adapter_name = self._adapter_name(language, domain)
+        shaped = self.prompt_shaper.shape(input_text, domain)
+        logger.info("Prompt for %s: %d input tokens, max_new_tokens %d, %d tokens saved", adapter_name,
+                    shaped['input_tokens'], shaped['max_new_tokens'], shaped['tokens_saved'],
+                    extra={'per_request': True})
+
         return {
-            "inputs": input_text,
+            "inputs": shaped['inputs'],
             "parameters": {
-                "max_new_tokens": 512,
-                "temperature": 0.7,
-                "do_sample": True,
+                "max_new_tokens": shaped['max_new_tokens'],
+                **self.GENERATION_PARAMETERS,
                 "adapter_name": adapter_name
             }
         }
 
-    def invoke_model(self, input_text: str, language: str = 'spanish', domain: str = 'technical') -> str:
+    def _payload_hash(self, payload: Dict) -> str:
+        """Hash a formatted payload on its normalized input text, adapter and generation parameters"""
+        key_material = json.dumps(
+            {'inputs': normalize_query(payload['inputs']), 'parameters': payload['parameters']},
+            sort_keys=True,
+            ensure_ascii=False
+        )
+        return hashlib.sha256(key_material.encode('utf-8')).hexdigest()
+
+    def _runtime_for(self, deadline: Optional[Deadline]):
+        """Runtime client for the next attempt, with a read timeout that fits the remaining budget"""
+        if deadline is None:
+            return self.runtime
+        read_timeout = read_timeout_for(deadline.remaining())
+        if read_timeout is None:
+            raise DeadlineExceeded(
+                f"{deadline.remaining():.3f}s left is too little for another endpoint call", stage='invoke_endpoint'
+            )
+        if self._shared_runtime:
+            return get_runtime_client(read_timeout=read_timeout)
+        # e.g. an EndpointRouter, which passes the timeout on to its targets' clients
+        if hasattr(self.runtime, 'with_read_timeout'):
+            return self.runtime.with_read_timeout(read_timeout)
+        return self.runtime
+
+    def _fit_to_deadline(self, payload: Dict, deadline: Deadline, tags: Dict) -> Dict:
+        """Shrink max_new_tokens to what can be generated in the remaining budget"""
+        requested = payload['parameters']['max_new_tokens']
+        affordable = max_tokens_within(deadline.remaining(), requested)
+        if affordable < min(requested, DEADLINE_CONFIG['min_new_tokens']):
+            raise DeadlineExceeded(
+                f"Only {affordable} tokens fit in the remaining {deadline.remaining():.3f}s", stage='invoke_model'
+            )
+        if affordable == requested:
+            return payload
+        self.metrics.increment('deadline_token_reductions', **tags)
+        deadline.tokens_reduced = True
+        return {**payload, 'parameters': {**payload['parameters'], 'max_new_tokens': affordable}}
+
+    def invoke_model(self, input_text: str, language: str = 'spanish', domain: str = 'technical',
+                     deadline: Optional[Union[float, Deadline]] = None) -> str:
         """
         Invoke the model with specified language and domain adapters
+
+        With a deadline (seconds or a Deadline), max_new_tokens shrinks to fit
+        the remaining budget, each attempt's read timeout is derived from it and
+        DeadlineExceeded is raised once it runs out
         """
+        deadline = Deadline.coerce(deadline)
+        tags = {'language': language, 'domain': domain, 'adapter': self._adapter_name(language, domain)}
         try:
-            # Format the prompt with adapter information
-            payload = self._format_prompt(input_text, language, domain)
-            
-            # Add retry logic
-            max_retries = 3
-            retry_count = 0
-            
-            while retry_count < max_retries:
-                try:
-                    response = self.runtime.invoke_endpoint(
+            with self.metrics.stage('invoke_model', **tags):
+                # Format the prompt with adapter information
+                payload = self._format_prompt(input_text, language, domain)
+
+                payload_key = None
+                use_cache = self.response_cache is not None and self.response_cache.should_cache(payload)
+                if use_cache:
+                    with self.metrics.stage('cache_lookup', **tags):
+                        payload_key = self._payload_hash(payload)
+                        cached_response = self.response_cache.get(payload_key)
+                    if cached_response is not None:
+                        self.metrics.increment('cache_hits', **tags)
+                        return cached_response
+
+                if deadline is not None:
+                    deadline.check('invoke_model')
+                    fitted = self._fit_to_deadline(payload, deadline, tags)
+                    if fitted is not payload:
+                        # A shortened generation must not be cached under the full payload's key
+                        payload, payload_key = fitted, None
+
+                def call_endpoint() -> str:
+                    # Once per logical call, so hedges and batching do not earn retries
+                    self.retry_policy.budget.record_request()
+                    # Requests with a deadline keep their own timeouts and token budget
+                    if self.batcher is not None and deadline is None:
+                        return self.batcher.submit(payload)
+                    if self.hedger is not None:
+                        return self.hedger.call(tags['adapter'],
+                                                lambda: self._invoke_endpoint(payload, tags, deadline))
+                    return self._invoke_endpoint(payload, tags, deadline)
+
+                if self.single_flight is not None:
+                    payload_key = payload_key or self._payload_hash(payload)
+                    flight_key = payload_key
+                    if deadline is not None:
+                        # The token budget is already in the payload; callers with a different
+                        # read timeout (or none) must not inherit this call's DeadlineExceeded
+                        flight_key = f"{payload_key}:deadline:{read_timeout_for(deadline.remaining())}"
+                    try:
+                        generated_text = self.single_flight.do(
+                            flight_key, call_endpoint, timeout=deadline.remaining() if deadline else None
+                        )
+                    except TimeoutError:
+                        raise DeadlineExceeded("Deadline exceeded waiting for an identical in-flight call",
+                                               stage='invoke_model')
+                else:
+                    generated_text = call_endpoint()
+
+                if use_cache:
+                    self.response_cache.put(payload_key or self._payload_hash(payload), generated_text)
+                return generated_text
+
+        except DeadlineExceeded as e:
+            self.metrics.increment('deadline_exceeded', **tags)
+            logger.warning(f"Deadline exceeded invoking model: {str(e)}")
+            raise
+        except Exception as e:
+            self.metrics.increment('invoke_errors', **tags)
+            logger.error(f"Error invoking model: {str(e)}")
+            raise
+
+    @staticmethod
+    def _generated_text(result, payload: Dict):
+        """generated_text of a response, or one per input for a batched payload"""
+        def unwrap(item):
+            return item[0] if isinstance(item, list) else item
+
+        if isinstance(payload['inputs'], list):
+            return [unwrap(item)['generated_text'] for item in result]
+        return unwrap(result)['generated_text']
+
+    def _send_batch(self, payload: Dict):
+        """Send a payload assembled by the micro-batcher"""
+        adapter_name = payload['parameters']['adapter_name']
+        return self._invoke_endpoint(payload, {'adapter': adapter_name})
+
+    def _invoke_endpoint(self, payload: Dict, tags: Optional[Dict] = None,
+                         deadline: Optional[Deadline] = None) -> str:
+        """
+        Send a formatted payload to the endpoint
+
+        Throttling, model and transient errors are retried with jittered
+        exponential backoff while the shared retry budget allows it; the
+        circuit breaker fails fast while the endpoint keeps failing. With a
+        deadline, a retry is only made if it can still finish in time
+        """
+        tags = tags or {}
+        attempt = 0
+
+        while True:
+            # Before allow_request, so running out of time never holds the half-open probe
+            runtime = self._runtime_for(deadline)
+            if not self.circuit_breaker.allow_request():
+                self.metrics.increment('circuit_open_rejections', **tags)
+                raise CircuitOpenError(f"Circuit open for endpoint {self.endpoint_name}; failing fast")
+
+            recorded = False
+            try:
+                with self.metrics.stage('encode', **tags):
+                    body = json.dumps(payload)
+                # Covers the network round trip, endpoint queueing and generation
+                with self.metrics.stage('endpoint', **tags):
+                    response = runtime.invoke_endpoint(
                         EndpointName=self.endpoint_name,
                         ContentType='application/json',
-                        Body=json.dumps(payload)
+                        Body=body
                     )
+                with self.metrics.stage('decode', **tags):
                     result = json.loads(response['Body'].read().decode())
-                    return result['generated_text']
-                
-                except self.runtime.exceptions.ModelError:
-                    logger.warning(f"Model error occurred. Retry {retry_count + 1}/{max_retries}")
-                    retry_count += 1
-                    if retry_count == max_retries:
-                        raise
-                    time.sleep(1)  # Wait before retrying
-                
-                except Exception as e:
-                    logger.error(f"Error invoking model: {str(e)}")
+                self.circuit_breaker.record_success()
+                recorded = True
+                return self._generated_text(result, payload)
+
+            except Exception as e:
+                kind = self.retry_policy.classify(e)
+                # A read timeout shortened to fit a deadline says nothing about endpoint health
+                deadline_timeout = deadline is not None and isinstance(e, ReadTimeoutError)
+                if kind in ('model', 'transient') and not deadline_timeout:
+                    self.circuit_breaker.record_failure()
+                    recorded = True
+                    self.metrics.increment('model_errors' if kind == 'model' else 'transient_errors', **tags)
+                elif not deadline_timeout and self.circuit_breaker.state != CircuitBreaker.CLOSED:
+                    # Throttling or a rejected request still shows the endpoint is reachable
+                    self.circuit_breaker.record_success()
+                    recorded = True
+                if kind == 'throttle':
+                    self.metrics.increment('throttled', **tags)
+                if deadline_timeout:
+                    # The timeout already used the largest step that fit; a retry would get less
+                    raise DeadlineExceeded(f"Endpoint call timed out within the deadline: {str(e)}",
+                                           stage='invoke_endpoint') from e
+
+                attempt += 1
+                if kind is None or attempt >= self.retry_policy.max_attempts:
+                    raise
+                if not self.retry_policy.budget.try_spend():
+                    logger.warning("Retry budget exhausted; not retrying")
                     raise
-    
+
+                delay = self.retry_policy.backoff(attempt - 1, kind)
+                if deadline is not None and read_timeout_for(deadline.remaining() - delay) is None:
+                    raise DeadlineExceeded(
+                        f"No time left to retry after {kind} error: {str(e)}", stage='invoke_endpoint'
+                    ) from e
+                self.metrics.increment('retries', kind=kind, **tags)
+                logger.warning(
+                    f"{kind.capitalize()} error occurred. Retry {attempt}/{self.retry_policy.max_attempts - 1} "
+                    f"in {delay:.2f}s"
+                )
+                time.sleep(delay)
+            finally:
+                if not recorded:
+                    self.circuit_breaker.release_probe()
+
+    def invoke_model_stream(self, input_text: str, language: str = 'spanish',
+                            domain: str = 'technical') -> Iterator[str]:
+        """
+        Invoke the model and yield tokens as the LMI container produces them
+
+        Time-to-first-token and total latency are recorded in self.stream_stats
+        """
+        payload = self._format_prompt(input_text, language, domain)
+        payload['stream'] = True
+
+        if not self.circuit_breaker.allow_request():
+            raise CircuitOpenError(f"Circuit open for endpoint {self.endpoint_name}; failing fast")
+
+        start = time.perf_counter()
+        first_token_at = None
+        recorded = False
+        try:
+            response = self.runtime.invoke_endpoint_with_response_stream(
+                EndpointName=self.endpoint_name,
+                ContentType='application/json',
+                Body=json.dumps(payload)
+            )
+
+            decoder = TokenStreamDecoder()
+            for event in response['Body']:
+                if 'PayloadPart' not in event:
+                    error = event.get('ModelStreamError') or event.get('InternalStreamFailure')
+                    if error:
+                        raise RuntimeError(f"Stream failed: {error.get('Message', error)}")
+                    continue
+
+                for token in decoder.feed(event['PayloadPart']['Bytes']):
+                    if first_token_at is None:
+                        first_token_at = time.perf_counter()
+                    yield token
+
+            for token in decoder.flush():
+                if first_token_at is None:
+                    first_token_at = time.perf_counter()
+                yield token
+            self.circuit_breaker.record_success()
+            recorded = True
+
         except Exception as e:
-            logger.error(f"Error invoking model: {str(e)}")
-            raise
\ No newline at end of file
+            if self.retry_policy.classify(e) in ('model', 'transient'):
+                self.circuit_breaker.record_failure()
+                recorded = True
+            elif self.circuit_breaker.state != CircuitBreaker.CLOSED:
+                self.circuit_breaker.record_success()
+                recorded = True
+            logger.error(f"Error streaming from model: {str(e)}")
+            raise
+
+        finally:
+            # An abandoned stream (GeneratorExit) says nothing about endpoint health
+            if not recorded:
+                self.circuit_breaker.release_probe()
+            total = time.perf_counter() - start
+            ttft = first_token_at - start if first_token_at is not None else None
+            self.stream_stats.record(ttft, total)
+            adapter = payload['parameters']['adapter_name']
+            if ttft is not None:
+                self.metrics.observe('stream_ttft_ms', ttft * 1000, adapter=adapter)
+            self.metrics.observe('stream_total_ms', total * 1000, adapter=adapter)
+
+    def invoke_many(self, requests: List[Dict], max_workers: Optional[int] = None) -> List[Dict]:
+        """
+        Invoke the model for many requests concurrently
+
+        Args:
+            requests (List[Dict]): Items with 'input_text' and optional 'language' and 'domain'
+            max_workers (int, optional): Overrides SAGEMAKER_CONFIG['max_concurrent_invocations']
+
+        Returns:
+            List[Dict]: One result per request, in input order. A failed item is
+            reported with 'status': 'error' instead of failing the whole batch
+        """
+        if not requests:
+            return []
+
+        max_workers = max_workers or SAGEMAKER_CONFIG['max_concurrent_invocations']
+
+        def _invoke_one(request: Dict) -> Dict:
+            try:
+                response = self.invoke_model(
+                    input_text=request['input_text'],
+                    language=request.get('language', 'spanish'),
+                    domain=request.get('domain', 'technical')
+                )
+                return {'status': 'success', 'response': response}
+            except Exception as e:
+                return {'status': 'error', 'error_message': str(e)}
+
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(requests))) as executor:
+            # map() yields results in submission order
+            return list(executor.map(_invoke_one, requests))
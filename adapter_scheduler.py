@@ -0,0 +1,186 @@
+# File: multilingual-support/adapter_scheduler.py
+
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeoutError, wait
+from typing import Dict, List, Optional
+from logger import setup_logger
+from config import SCHEDULER_CONFIG
+from deadline import Deadline, DeadlineExceeded
+
+logger = setup_logger('adapter_scheduler')
+
+
+class _PendingRequest:
+    def __init__(self, input_text: str, language: str, domain: str, adapter_name: str,
+                 deadline: Optional[Deadline] = None):
+        self.input_text = input_text
+        self.language = language
+        self.domain = domain
+        self.adapter_name = adapter_name
+        self.deadline = deadline
+        self.enqueued_at = time.monotonic()
+        self.future = Future()
+
+
+class AdapterAffinityScheduler:
+    def __init__(self, adapter_manager,
+                 wave_size: int = SCHEDULER_CONFIG['wave_size'],
+                 max_wait_seconds: float = SCHEDULER_CONFIG['max_wait_seconds'],
+                 max_consecutive_waves: int = SCHEDULER_CONFIG['max_consecutive_waves']):
+        """
+        Queue requests and dispatch them in waves that share one adapter
+
+        The endpoint only keeps MAX_CPU_LORA adapters resident, so mixed
+        traffic in FIFO order keeps swapping adapters in and out. Each wave
+        is sent concurrently and finishes before the next one starts.
+
+        Args:
+            adapter_manager (LoraAdapterManager): Manager used to invoke the model
+            wave_size (int): Maximum requests dispatched in one wave
+            max_wait_seconds (float): Queue time after which a request is served next
+            max_consecutive_waves (int): Waves one adapter may run while others are waiting
+        """
+        self.adapter_manager = adapter_manager
+        self.wave_size = wave_size
+        self.max_wait_seconds = max_wait_seconds
+        self.max_consecutive_waves = max_consecutive_waves
+
+        self._queues: 'OrderedDict[str, deque]' = OrderedDict()
+        self._condition = threading.Condition()
+        self._executor = ThreadPoolExecutor(max_workers=wave_size)
+        self._running = True
+
+        self._current_adapter: Optional[str] = None
+        self._consecutive_waves = 0
+        self._last_submitted_adapter: Optional[str] = None
+        self._counters = {
+            'requests': 0,
+            'waves': 0,
+            'adapter_switches': 0,
+            'fifo_adapter_switches': 0,
+            'max_wait_promotions': 0,
+            'fairness_rotations': 0,
+        }
+
+        self._dispatcher = threading.Thread(target=self._dispatch_loop, name='adapter-scheduler', daemon=True)
+        self._dispatcher.start()
+
+    def submit(self, input_text: str, language: str = 'spanish', domain: str = 'technical',
+               deadline: Optional[Deadline] = None) -> Future:
+        """Queue a request and return a future for its generated text"""
+        request = _PendingRequest(input_text, language, domain,
+                                  self.adapter_manager._adapter_name(language, domain), deadline)
+        with self._condition:
+            if not self._running:
+                raise RuntimeError("Scheduler has been shut down")
+            # Switches a plain FIFO client would have caused, for comparison
+            if self._last_submitted_adapter not in (None, request.adapter_name):
+                self._counters['fifo_adapter_switches'] += 1
+            self._last_submitted_adapter = request.adapter_name
+            self._counters['requests'] += 1
+
+            self._queues.setdefault(request.adapter_name, deque()).append(request)
+            self._condition.notify()
+        return request.future
+
+    def invoke(self, input_text: str, language: str = 'spanish', domain: str = 'technical',
+               deadline: Optional[Deadline] = None) -> str:
+        """Queue a request and block until its response is available or its deadline passes"""
+        future = self.submit(input_text, language, domain, deadline)
+        if deadline is None:
+            return future.result()
+        try:
+            return future.result(timeout=deadline.remaining())
+        except FutureTimeoutError:
+            future.cancel()
+            raise DeadlineExceeded("Deadline exceeded waiting in the adapter scheduler", stage='scheduler')
+
+    def _select_adapter(self) -> str:
+        """Pick the adapter for the next wave; caller must hold the lock"""
+        now = time.monotonic()
+
+        # A request past its maximum wait is served regardless of affinity
+        oldest_adapter = min(self._queues, key=lambda name: self._queues[name][0].enqueued_at)
+        if now - self._queues[oldest_adapter][0].enqueued_at >= self.max_wait_seconds:
+            if oldest_adapter != self._current_adapter:
+                self._counters['max_wait_promotions'] += 1
+            return oldest_adapter
+
+        current = self._current_adapter
+        if current in self._queues:
+            if self._consecutive_waves < self.max_consecutive_waves or len(self._queues) == 1:
+                return current
+            self._counters['fairness_rotations'] += 1
+
+        # Otherwise the largest group, oldest head first on ties
+        candidates = [name for name in self._queues if name != current] or list(self._queues)
+        return max(candidates, key=lambda name: (len(self._queues[name]), -self._queues[name][0].enqueued_at))
+
+    def _next_wave(self) -> Optional[List[_PendingRequest]]:
+        """Block until requests are queued, then take one adapter-grouped wave"""
+        with self._condition:
+            while self._running and not self._queues:
+                self._condition.wait()
+            if not self._queues:
+                return None
+
+            adapter_name = self._select_adapter()
+            queue = self._queues[adapter_name]
+            wave = [queue.popleft() for _ in range(min(self.wave_size, len(queue)))]
+            if not queue:
+                del self._queues[adapter_name]
+
+            if adapter_name == self._current_adapter:
+                self._consecutive_waves += 1
+            else:
+                if self._current_adapter is not None:
+                    self._counters['adapter_switches'] += 1
+                self._current_adapter = adapter_name
+                self._consecutive_waves = 1
+            self._counters['waves'] += 1
+            return wave
+
+    def _run_request(self, request: _PendingRequest):
+        if not request.future.set_running_or_notify_cancel():
+            return
+        try:
+            request.future.set_result(self.adapter_manager.invoke_model(
+                input_text=request.input_text,
+                language=request.language,
+                domain=request.domain,
+                deadline=request.deadline
+            ))
+        except Exception as e:
+            request.future.set_exception(e)
+
+    def _dispatch_loop(self):
+        while True:
+            wave = self._next_wave()
+            if wave is None:
+                return
+            wait([self._executor.submit(self._run_request, request) for request in wave])
+
+    def stats(self) -> Dict:
+        """Return scheduling counters, including adapter switches avoided versus FIFO order"""
+        with self._condition:
+            return {
+                **self._counters,
+                'switches_avoided': self._counters['fifo_adapter_switches'] - self._counters['adapter_switches'],
+                'queued': sum(len(queue) for queue in self._queues.values()),
+            }
+
+    def shutdown(self, wait_for_pending: bool = True):
+        """Stop accepting requests; queued requests are drained unless wait_for_pending is False"""
+        with self._condition:
+            self._running = False
+            if not wait_for_pending:
+                for queue in self._queues.values():
+                    for request in queue:
+                        request.future.cancel()
+                self._queues.clear()
+            self._condition.notify_all()
+        self._dispatcher.join()
+        self._executor.shutdown(wait=True)
+        logger.info(f"Adapter scheduler stopped: {self.stats()}")
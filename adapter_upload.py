@@ -0,0 +1,263 @@
+# File: multilingual-support/adapter_upload.py
+
+import argparse
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+import boto3
+from boto3.s3.transfer import TransferConfig
+from botocore.config import Config
+from config import AWS_CONFIG, S3_CONFIG, UPLOAD_CONFIG
+from logger import setup_logger
+
+logger = setup_logger('adapter_upload')
+
+_MB = 1024 * 1024
+_NOT_FOUND_CODES = ('404', 'NoSuchKey', 'NotFound')
+
+
+def file_sha256(path: str, chunk_size: int = UPLOAD_CONFIG['hash_chunk_mb'] * _MB) -> str:
+    """SHA-256 of a file, read in chunks"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def local_files(local_dir: str) -> List[str]:
+    """Relative POSIX paths of the files under local_dir, without hidden and .tmp files"""
+    files = []
+    for root, dirs, names in os.walk(local_dir):
+        dirs[:] = sorted(name for name in dirs if not name.startswith('.'))
+        for name in sorted(names):
+            if name.startswith('.') or name.endswith('.tmp'):
+                continue
+            files.append(os.path.relpath(os.path.join(root, name), local_dir).replace(os.sep, '/'))
+    return files
+
+
+class AdapterUploader:
+    def __init__(self, s3_client=None,
+                 bucket: str = S3_CONFIG['lora_bucket'],
+                 prefix: str = S3_CONFIG['adapter_prefix'],
+                 part_size_mb: float = UPLOAD_CONFIG['part_size_mb'],
+                 max_workers: int = UPLOAD_CONFIG['max_workers'],
+                 max_concurrent_files: int = UPLOAD_CONFIG['max_concurrent_files'],
+                 manifest_name: str = UPLOAD_CONFIG['manifest_name'],
+                 delete_removed: bool = UPLOAD_CONFIG['delete_removed']):
+        """
+        Uploads local adapter artifacts to S3, skipping files already there
+
+        Files are identified by their SHA-256. The manifest at
+        <prefix><manifest_name> maps each relative path to the hash and size
+        last uploaded, and every object carries its hash as 'sha256'
+        metadata, so only changed files are sent. Those go up with boto3's
+        managed multipart transfer, several files at a time. Files gone from
+        the local directory are dropped from the manifest and, with
+        delete_removed, their objects are deleted too.
+
+        Args:
+            s3_client (optional): boto3 s3 client, or a FakeS3Client for local runs
+            bucket (str): Destination bucket
+            prefix (str): Key prefix the local directory is mirrored under
+            part_size_mb (float): Multipart threshold and part size
+            max_workers (int): Parts transferred at once per file
+            max_concurrent_files (int): Files uploaded at once
+            manifest_name (str): Manifest object name under prefix
+            delete_removed (bool): Delete the objects of files removed locally
+        """
+        self.s3_client = s3_client or boto3.client(
+            's3', region_name=AWS_CONFIG['region'],
+            config=Config(max_pool_connections=max_workers * max_concurrent_files)
+        )
+        self.bucket = bucket
+        self.prefix = prefix
+        self.max_concurrent_files = max_concurrent_files
+        self.manifest_key = f"{prefix}{manifest_name}"
+        self.delete_removed = delete_removed
+        part_size = int(part_size_mb * _MB)
+        self.transfer_config = TransferConfig(
+            multipart_threshold=part_size,
+            multipart_chunksize=part_size,
+            max_concurrency=max_workers,
+            use_threads=True,
+        )
+
+    def load_manifest(self) -> Dict[str, Dict]:
+        """Relative path -> {'sha256', 'size'} from the uploaded manifest; empty when there is none"""
+        try:
+            body = self.s3_client.get_object(Bucket=self.bucket, Key=self.manifest_key)['Body'].read()
+        except self.s3_client.exceptions.NoSuchKey:
+            return {}
+        return json.loads(body.decode('utf-8'))['files']
+
+    def _remote_sha256(self, key: str) -> Optional[str]:
+        """The sha256 metadata of an object, or None when it does not exist"""
+        try:
+            return self.s3_client.head_object(Bucket=self.bucket, Key=key)['Metadata'].get('sha256')
+        except self.s3_client.exceptions.ClientError as e:
+            if e.response['Error']['Code'] in _NOT_FOUND_CODES:
+                return None
+            raise
+
+    def _upload_file(self, path: str, key: str, sha256: str):
+        self.s3_client.upload_file(
+            Filename=path,
+            Bucket=self.bucket,
+            Key=key,
+            ExtraArgs={'Metadata': {'sha256': sha256}},
+            Config=self.transfer_config
+        )
+
+    def _delete_objects(self, names: List[str]) -> Dict[str, str]:
+        """Delete the objects of names in delete_objects batches; returns the errors by name"""
+        failed = {}
+        for start in range(0, len(names), 1000):
+            batch = names[start:start + 1000]
+            response = self.s3_client.delete_objects(
+                Bucket=self.bucket,
+                Delete={'Objects': [{'Key': self.prefix + name} for name in batch], 'Quiet': True}
+            )
+            for error in response.get('Errors', []):
+                failed[error['Key'][len(self.prefix):]] = f"{error.get('Code')} {error.get('Message')}"
+        return failed
+
+    def upload(self, local_dir: str) -> Dict:
+        """
+        Mirror local_dir under the prefix, uploading only files whose hash changed
+
+        The manifest is written after the transfers, including when some of
+        them failed, so a rerun only retries what is missing. Manifest entries
+        of files no longer in local_dir are dropped; their objects are deleted
+        when delete_removed is set and otherwise left in place and reported.
+
+        Args:
+            local_dir (str): Local adapter directory, e.g. lora-adapters/
+
+        Returns:
+            Dict: Files uploaded, skipped and removed, bytes, timings and upload throughput
+        """
+        try:
+            files = local_files(local_dir)
+            paths = {name: os.path.join(local_dir, name) for name in files}
+            sizes = {name: os.path.getsize(path) for name, path in paths.items()}
+
+            started_at = time.monotonic()
+            with ThreadPoolExecutor(max_workers=self.max_concurrent_files) as executor:
+                hashes = dict(zip(files, executor.map(file_sha256, paths.values())))
+            hash_seconds = time.monotonic() - started_at
+
+            previous = self.load_manifest()
+            removed = sorted(name for name in previous if name not in paths)
+            manifest = {name: entry for name, entry in previous.items() if name in paths}
+            # Files missing from the manifest may still have been uploaded, e.g. by hand
+            unknown = [name for name in files if name not in previous]
+            with ThreadPoolExecutor(max_workers=self.max_concurrent_files) as executor:
+                remote = dict(zip(unknown, executor.map(lambda name: self._remote_sha256(self.prefix + name),
+                                                        unknown)))
+
+            pending, skipped = [], []
+            for name in files:
+                known = previous[name]['sha256'] if name in previous else remote[name]
+                if known == hashes[name]:
+                    skipped.append(name)
+                    manifest[name] = {'sha256': hashes[name], 'size': sizes[name]}
+                else:
+                    pending.append(name)
+
+            started_at = time.monotonic()
+            failed = {}
+            with ThreadPoolExecutor(max_workers=self.max_concurrent_files,
+                                    thread_name_prefix='adapter-upload') as executor:
+                futures = {
+                    name: executor.submit(self._upload_file, paths[name], self.prefix + name, hashes[name])
+                    for name in pending
+                }
+                for name, future in futures.items():
+                    try:
+                        future.result()
+                        manifest[name] = {'sha256': hashes[name], 'size': sizes[name]}
+                    except Exception as e:
+                        logger.error(f"Error uploading {name}: {str(e)}")
+                        failed[name] = str(e)
+            upload_seconds = time.monotonic() - started_at
+
+            deleted = []
+            if removed and self.delete_removed:
+                delete_failed = self._delete_objects(removed)
+                for name, error in delete_failed.items():
+                    logger.error(f"Error deleting {name}: {error}")
+                    # Kept in the manifest so the next run retries the delete
+                    manifest[name] = previous[name]
+                failed.update(delete_failed)
+                deleted = [name for name in removed if name not in delete_failed]
+            elif removed:
+                logger.warning(f"{len(removed)} files removed locally are still in s3://{self.bucket}/{self.prefix}, "
+                               f"e.g. {removed[0]}; pass delete_removed to delete them")
+
+            if manifest != previous:
+                self.s3_client.put_object(
+                    Bucket=self.bucket,
+                    Key=self.manifest_key,
+                    Body=json.dumps({
+                        'version': 1,
+                        'updated_at': datetime.now(timezone.utc).isoformat(),
+                        'files': manifest,
+                    }, indent=2, sort_keys=True).encode('utf-8'),
+                    ContentType='application/json'
+                )
+
+            uploaded = [name for name in pending if name not in failed]
+            bytes_uploaded = sum(sizes[name] for name in uploaded)
+            report = {
+                'files': len(files),
+                'uploaded': len(uploaded),
+                'skipped': len(skipped),
+                'removed': removed,
+                'deleted': len(deleted),
+                'failed': failed,
+                'bytes_uploaded': bytes_uploaded,
+                'bytes_skipped': sum(sizes[name] for name in skipped),
+                'hash_seconds': hash_seconds,
+                'upload_seconds': upload_seconds,
+                'throughput_mb_per_second': bytes_uploaded / _MB / upload_seconds if upload_seconds > 0 else 0.0,
+                'manifest_key': self.manifest_key,
+            }
+            logger.info(f"Uploaded {len(uploaded)} files ({bytes_uploaded / _MB:.1f} MB, "
+                        f"{report['throughput_mb_per_second']:.1f} MB/s), skipped {len(skipped)} unchanged, "
+                        f"removed {len(removed)} ({len(deleted)} deleted)")
+            if failed:
+                raise RuntimeError(f"{len(failed)} of {len(pending) + len(removed)} uploads and deletes failed: "
+                                   f"{', '.join(sorted(failed))}")
+            return report
+
+        except Exception as e:
+            logger.error(f"Error uploading adapters from {local_dir}: {str(e)}")
+            raise
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Upload changed adapter files to the LORA bucket")
+    parser.add_argument('local_dir', help="Local adapter directory, mirrored under the adapter prefix")
+    parser.add_argument('--bucket', default=S3_CONFIG['lora_bucket'])
+    parser.add_argument('--prefix', default=S3_CONFIG['adapter_prefix'])
+    parser.add_argument('--part-size-mb', type=float, default=UPLOAD_CONFIG['part_size_mb'])
+    parser.add_argument('--workers', type=int, default=UPLOAD_CONFIG['max_workers'])
+    parser.add_argument('--files', type=int, default=UPLOAD_CONFIG['max_concurrent_files'])
+    parser.add_argument('--delete-removed', action='store_true', default=UPLOAD_CONFIG['delete_removed'],
+                        help="Delete the objects of files removed locally")
+    args = parser.parse_args()
+
+    uploader = AdapterUploader(bucket=args.bucket, prefix=args.prefix, part_size_mb=args.part_size_mb,
+                               max_workers=args.workers, max_concurrent_files=args.files,
+                               delete_removed=args.delete_removed)
+    logger.info(f"Upload report: {json.dumps(uploader.upload(args.local_dir), indent=2)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,246 @@
+# File: multilingual-support/adapter_warmup.py
+
+import argparse
+import json
+import os
+import re
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+from aws_clients import get_runtime_client
+from config import ADAPTER_CONFIGS, LOGGING_CONFIG, SAGEMAKER_CONFIG, WARMUP_CONFIG
+from logger import setup_logger
+from metrics import MetricsRegistry, get_registry
+
+logger = setup_logger('adapter_warmup')
+
+_PROMPT_LOG_PATTERN = re.compile(r"Prompt for ([\w-]+):")
+# logging's default asctime, at the start of text lines and in the JSON 'timestamp' field
+_TIMESTAMP_PATTERN = re.compile(r"(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2})")
+_DEFAULT_WINDOW_SECONDS = WARMUP_CONFIG['traffic_window_intervals'] * WARMUP_CONFIG['interval_seconds']
+
+
+def all_adapters() -> List[str]:
+    """Every language-domain adapter name, in ADAPTER_CONFIGS order"""
+    return [
+        f"{language['name']}-{domain}"
+        for language in ADAPTER_CONFIGS['languages'].values()
+        for domain in ADAPTER_CONFIGS['domains'].values()
+    ]
+
+
+def traffic_from_metrics(registry: Optional[MetricsRegistry] = None) -> Dict[str, float]:
+    """Requests per adapter since process start, from the invoke_model stage histograms"""
+    registry = registry or get_registry()
+    traffic = Counter()
+    for histogram in registry.snapshot()['histograms']:
+        tags = histogram['tags']
+        if histogram['name'] == 'stage_latency_ms' and tags.get('stage') == 'invoke_model' and 'adapter' in tags:
+            traffic[tags['adapter']] += histogram['count']
+    return dict(traffic)
+
+
+def traffic_from_log(log_path: str = LOGGING_CONFIG['file_path'],
+                     since: Optional[float] = None) -> Dict[str, float]:
+    """
+    Requests per adapter, from the per-request prompt lines in the application log
+
+    Those lines are sampled, but the sample keeps the traffic mix.
+
+    Args:
+        log_path (str): Application log, text or JSON lines
+        since (float, optional): Epoch seconds; older lines, and lines without a timestamp, are ignored
+    """
+    traffic = Counter()
+    if not os.path.exists(log_path):
+        return {}
+    with open(log_path, encoding='utf-8', errors='replace') as f:
+        for line in f:
+            match = _PROMPT_LOG_PATTERN.search(line)
+            if not match:
+                continue
+            if since is not None:
+                timestamp = _TIMESTAMP_PATTERN.search(line)
+                if timestamp is None:
+                    continue
+                logged_at = datetime.strptime(timestamp.group(1), '%Y-%m-%d %H:%M:%S').timestamp()
+                if logged_at < since:
+                    continue
+            traffic[match.group(1)] += 1
+    return dict(traffic)
+
+
+class RecentTraffic:
+    def __init__(self, registry: Optional[MetricsRegistry] = None,
+                 log_path: str = LOGGING_CONFIG['file_path'],
+                 window_seconds: float = _DEFAULT_WINDOW_SECONDS,
+                 clock: Callable[[], float] = time.time):
+        """
+        Requests per adapter since the previous call, so the mix follows traffic shifts
+
+        The metrics registry only has cumulative counts, so each call returns
+        the difference from the previous call's snapshot. Without metrics, the
+        application log's prompt lines from the last window_seconds are counted.
+
+        Args:
+            registry (MetricsRegistry, optional): Defaults to the process registry
+            log_path (str): Application log used when metrics are disabled
+            window_seconds (float): How far back log lines count
+            clock (Callable): Wall-clock source, compared with log timestamps
+        """
+        self.registry = registry
+        self.log_path = log_path
+        self.window_seconds = window_seconds
+        self._clock = clock
+        self._previous: Optional[Dict[str, float]] = None
+
+    def __call__(self) -> Dict[str, float]:
+        counts = traffic_from_metrics(self.registry)
+        if counts:
+            previous, self._previous = self._previous or {}, counts
+            return {adapter: count - previous.get(adapter, 0) for adapter, count in counts.items()
+                    if count > previous.get(adapter, 0)}
+        return traffic_from_log(self.log_path, since=self._clock() - self.window_seconds)
+
+
+class AdapterWarmer:
+    def __init__(self, runtime=None,
+                 endpoint_name: str = SAGEMAKER_CONFIG['endpoint_name'],
+                 max_resident: int = SAGEMAKER_CONFIG['max_cpu_lora'],
+                 probe_text: str = WARMUP_CONFIG['probe_text'],
+                 traffic_source: Optional[Callable[[], Dict[str, float]]] = None):
+        """
+        Keeps the busiest adapters resident on the endpoint with 1-token probes
+
+        The endpoint keeps MAX_CPU_LORA adapters and evicts the least recently
+        used, so the top adapters are probed least busy first and the busiest
+        last. Each adapter is probed twice; the first probe shows the
+        cold-load cost if it was not resident, the second the warm latency.
+        A round with no recent traffic keeps the previous round's adapters.
+
+        Args:
+            runtime (optional): sagemaker-runtime client; the shared client by default
+            endpoint_name (str): Endpoint to warm
+            max_resident (int): Adapters the endpoint keeps resident (MAX_CPU_LORA)
+            probe_text (str): Input of each probe
+            traffic_source (Callable, optional): Returns recent requests per adapter; RecentTraffic by default
+        """
+        self.runtime = runtime or get_runtime_client()
+        self.endpoint_name = endpoint_name
+        self.max_resident = max_resident
+        self.probe_text = probe_text
+        self.traffic_source = traffic_source or RecentTraffic()
+        self._last_adapters: Optional[List[str]] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def select_adapters(self, traffic: Dict[str, float]) -> List[str]:
+        """
+        Adapters to keep resident, busiest first
+
+        With little or no traffic yet, the remaining slots follow ADAPTER_CONFIGS order
+        """
+        known = set(all_adapters())
+        ranked = sorted((name for name in traffic if name in known), key=lambda name: -traffic[name])
+        ranked += [name for name in all_adapters() if name not in ranked]
+        return ranked[:self.max_resident]
+
+    def probe(self, adapter_name: str) -> float:
+        """Send a 1-token request for an adapter and return its latency in seconds"""
+        payload = {
+            'inputs': self.probe_text,
+            'parameters': {'max_new_tokens': 1, 'do_sample': False, 'adapter_name': adapter_name},
+        }
+        start = time.monotonic()
+        response = self.runtime.invoke_endpoint(
+            EndpointName=self.endpoint_name,
+            ContentType='application/json',
+            Body=json.dumps(payload)
+        )
+        response['Body'].read()
+        return time.monotonic() - start
+
+    def warm(self, traffic: Optional[Dict[str, float]] = None) -> Dict:
+        """
+        Probe the adapters that should be resident
+
+        Returns:
+            Dict: The adapters warmed, busiest first, and per adapter the first
+            probe, warm probe and cold-load penalty in milliseconds
+        """
+        traffic = self.traffic_source() if traffic is None else traffic
+        if not traffic and self._last_adapters is not None:
+            adapters = self._last_adapters
+        else:
+            adapters = self.select_adapters(traffic)
+        self._last_adapters = adapters
+        report = {'adapters': adapters, 'latency_ms': {}, 'failed': {}}
+
+        for adapter_name in reversed(adapters):
+            try:
+                first = self.probe(adapter_name)
+                warm = self.probe(adapter_name)
+            except Exception as e:
+                logger.warning(f"Warm-up probe for {adapter_name} failed: {str(e)}")
+                report['failed'][adapter_name] = str(e)
+                continue
+            report['latency_ms'][adapter_name] = {
+                'first_probe_ms': first * 1000,
+                'warm_probe_ms': warm * 1000,
+                'cold_penalty_ms': max(0.0, first - warm) * 1000,
+            }
+
+        logger.info(f"Warmed {len(report['latency_ms'])} adapters on {self.endpoint_name}: "
+                    f"{', '.join(report['latency_ms'])}")
+        return report
+
+    def start(self, interval_seconds: float = WARMUP_CONFIG['interval_seconds']):
+        """Warm the adapters now and then every interval_seconds in a background thread"""
+        if self._thread is not None:
+            return
+
+        def run():
+            while not self._stop.is_set():
+                try:
+                    self.warm()
+                except Exception as e:
+                    logger.error(f"Scheduled adapter warm-up failed: {str(e)}")
+                self._stop.wait(interval_seconds)
+
+        self._stop.clear()
+        self._thread = threading.Thread(target=run, name='adapter-warmup', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop the scheduled warm-up"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Warm the busiest LORA adapters on the endpoint")
+    parser.add_argument('--log-file', help="Read the traffic mix from this application log")
+    parser.add_argument('--interval', type=float, help="Keep warming every INTERVAL seconds")
+    args = parser.parse_args()
+
+    interval = args.interval or WARMUP_CONFIG['interval_seconds']
+    source = RecentTraffic(log_path=args.log_file or LOGGING_CONFIG['file_path'],
+                           window_seconds=WARMUP_CONFIG['traffic_window_intervals'] * interval)
+    warmer = AdapterWarmer(traffic_source=source)
+    if args.interval:
+        warmer.start(args.interval)
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            warmer.stop()
+    else:
+        logger.info(f"Warm-up report: {json.dumps(warmer.warm())}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,214 @@
+# File: multilingual-support/admission.py
+
+import heapq
+import itertools
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple, Union
+from config import ADMISSION_CONFIG
+from deadline import Deadline
+from logger import setup_logger
+from metrics import MetricsRegistry
+from resilience import TokenBucket
+
+logger = setup_logger('admission')
+
+
+class _QueuedRequest:
+    def __init__(self, query: str, domain: str, priority: int, deadline: Optional[Deadline]):
+        self.query = query
+        self.domain = domain
+        self.priority = priority
+        self.deadline = deadline
+        self.enqueued_at = time.monotonic()
+        self.future = Future()
+
+
+class AdmissionController:
+    def __init__(self, handler,
+                 max_queue_size: int = ADMISSION_CONFIG['max_queue_size'],
+                 rate_per_second: float = ADMISSION_CONFIG['rate_per_second'],
+                 burst: float = ADMISSION_CONFIG['burst'],
+                 max_concurrency: int = ADMISSION_CONFIG['max_concurrency'],
+                 domain_priorities: Optional[Dict[str, int]] = None,
+                 default_priority: int = ADMISSION_CONFIG['default_priority'],
+                 metrics: Optional[MetricsRegistry] = None):
+        """
+        Bounded priority queue and rate limit in front of CustomerSupportInference
+
+        Requests are queued by domain priority (then arrival order) and
+        released no faster than a token bucket sized to endpoint capacity,
+        with at most max_concurrency in progress. A request is rejected up
+        front when the queue is full or its deadline cannot cover the
+        expected wait, and shed from the queue when its deadline passes. A
+        full queue makes room for a higher-priority request by shedding the
+        lowest-priority one.
+
+        Args:
+            handler (CustomerSupportInference): Handler that processes admitted requests
+            max_queue_size (int): Requests waiting at most
+            rate_per_second (float): Sustained admissions per second
+            burst (float): Admissions allowed at once after an idle period
+            max_concurrency (int): Admitted requests processed at once
+            domain_priorities (Dict[str, int], optional): Priority per domain, lower served first
+            default_priority (int): Priority of domains not listed
+            metrics (MetricsRegistry, optional): Defaults to the handler's registry
+        """
+        self.handler = handler
+        self.max_queue_size = max_queue_size
+        self.domain_priorities = domain_priorities or ADMISSION_CONFIG['domain_priorities']
+        self.default_priority = default_priority
+        self.metrics = metrics or handler.metrics
+        self.bucket = TokenBucket(rate=rate_per_second, capacity=burst)
+
+        self._heap: List[Tuple[int, int, _QueuedRequest]] = []
+        self._sequence = itertools.count()
+        self._condition = threading.Condition()
+        self._slots = threading.Semaphore(max_concurrency)
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix='admission')
+        self._running = True
+        self._counters = {
+            'submitted': 0,
+            'admitted': 0,
+            'rejected': 0,
+            'shed': 0,
+        }
+
+        self._dispatcher = threading.Thread(target=self._dispatch_loop, name='admission-dispatcher', daemon=True)
+        self._dispatcher.start()
+
+    @staticmethod
+    def _refusal(status: str, reason: str, message: str) -> Dict:
+        return {'status': status, 'reason': reason, 'error_message': message}
+
+    def _refuse(self, request: _QueuedRequest, status: str, reason: str, message: str):
+        """Resolve a request without processing it; caller must hold the lock"""
+        self._counters[status] += 1
+        self.metrics.increment(f"admission_{status}", reason=reason, domain=request.domain)
+        if status == 'shed':
+            self.metrics.observe('admission_queue_wait_ms', (time.monotonic() - request.enqueued_at) * 1000,
+                                 domain=request.domain, outcome='shed')
+        if request.future.set_running_or_notify_cancel():
+            request.future.set_result(self._refusal(status, reason, message))
+
+    def _estimated_wait(self, priority: int) -> float:
+        """Seconds until a new request of this priority would be released; caller must hold the lock"""
+        ahead = sum(1 for queued_priority, _, _ in self._heap if queued_priority <= priority)
+        missing = ahead + 1 - self.bucket.available
+        if missing <= 0:
+            return 0.0
+        return missing / self.bucket.rate if self.bucket.rate > 0 else float('inf')
+
+    def submit(self, customer_query: str, deadline: Optional[Union[float, Deadline]] = None) -> Future:
+        """
+        Queue a query and return a future for its process_query result
+
+        Refused requests resolve to {'status': 'rejected' or 'shed', 'reason', 'error_message'}
+        """
+        deadline = Deadline.coerce(deadline)
+        _, domain = self.handler._detect_language_and_domain(customer_query)
+        priority = self.domain_priorities.get(domain, self.default_priority)
+        request = _QueuedRequest(customer_query, domain, priority, deadline)
+
+        with self._condition:
+            self._counters['submitted'] += 1
+            if not self._running:
+                self._refuse(request, 'rejected', 'shutdown', "Admission controller has been shut down")
+                return request.future
+            if deadline is not None and self._estimated_wait(priority) > deadline.remaining():
+                self._refuse(request, 'rejected', 'deadline', "Expected queue wait exceeds the deadline")
+                return request.future
+            if len(self._heap) >= self.max_queue_size:
+                lowest = max(self._heap)
+                if lowest[0] <= priority:
+                    self._refuse(request, 'rejected', 'queue_full', "Admission queue is full")
+                    return request.future
+                self._heap.remove(lowest)
+                heapq.heapify(self._heap)
+                self._refuse(lowest[2], 'shed', 'displaced', "Displaced by a higher-priority request")
+
+            heapq.heappush(self._heap, (priority, next(self._sequence), request))
+            self.metrics.set_gauge('admission_queue_depth', len(self._heap))
+            self._condition.notify()
+        return request.future
+
+    def process_query(self, customer_query: str, deadline: Optional[Union[float, Deadline]] = None) -> Dict:
+        """Queue a query and block until it is processed or refused"""
+        return self.submit(customer_query, deadline).result()
+
+    def _shed_expired(self):
+        """Drop queued requests whose deadline has passed; caller must hold the lock"""
+        expired = [entry for entry in self._heap if entry[2].deadline is not None and entry[2].deadline.expired()]
+        if not expired:
+            return
+        self._heap = [entry for entry in self._heap if entry not in expired]
+        heapq.heapify(self._heap)
+        for _, _, request in expired:
+            self._refuse(request, 'shed', 'deadline', "Deadline passed while queued")
+
+    def _next_request(self) -> Optional[_QueuedRequest]:
+        """Block until a token is available and a live request is queued, then take it"""
+        with self._condition:
+            while True:
+                self._shed_expired()
+                if not self._heap:
+                    if not self._running:
+                        return None
+                    self._condition.wait()
+                    continue
+                token_wait = self.bucket.time_until_available()
+                if token_wait > 0:
+                    # New submissions wake us early so their deadlines and priorities are seen
+                    self._condition.wait(min(token_wait, 0.05))
+                    continue
+                self.bucket.try_acquire()
+                _, _, request = heapq.heappop(self._heap)
+                self.metrics.set_gauge('admission_queue_depth', len(self._heap))
+                return request
+
+    def _dispatch_loop(self):
+        while True:
+            while not self._slots.acquire(timeout=0.05):
+                # All slots busy; keep shedding requests that expire in the meantime
+                with self._condition:
+                    self._shed_expired()
+            request = self._next_request()
+            if request is None:
+                self._slots.release()
+                return
+            if not request.future.set_running_or_notify_cancel():
+                self._slots.release()
+                continue
+            with self._condition:
+                self._counters['admitted'] += 1
+            self.metrics.observe('admission_queue_wait_ms', (time.monotonic() - request.enqueued_at) * 1000,
+                                 domain=request.domain, outcome='admitted')
+            self._executor.submit(self._run, request)
+
+    def _run(self, request: _QueuedRequest):
+        try:
+            request.future.set_result(self.handler.process_query(request.query, deadline=request.deadline))
+        except Exception as e:
+            request.future.set_exception(e)
+        finally:
+            self._slots.release()
+
+    def stats(self) -> Dict:
+        """Admission counters and the current queue depth"""
+        with self._condition:
+            return {**self._counters, 'queue_depth': len(self._heap)}
+
+    def shutdown(self, wait: bool = True):
+        """Stop admitting; queued requests are shed and in-progress ones finish"""
+        with self._condition:
+            self._running = False
+            if self._heap:
+                logger.info(f"Shutting down admission control; shedding {len(self._heap)} queued requests")
+            for _, _, request in self._heap:
+                self._refuse(request, 'shed', 'shutdown', "Admission controller has been shut down")
+            self._heap = []
+            self._condition.notify_all()
+        if wait:
+            self._dispatcher.join()
+        self._executor.shutdown(wait=wait)
@@ -0,0 +1,54 @@
+# File: multilingual-support/aws_clients.py
+
+import threading
+from typing import Dict, Optional, Tuple
+import boto3
+from botocore.config import Config
+from logger import setup_logger
+from config import RUNTIME_CLIENT_CONFIG
+
+logger = setup_logger('aws_clients')
+
+_clients: Dict[Tuple, object] = {}
+_clients_lock = threading.Lock()
+
+
+def get_runtime_client(region: Optional[str] = None, read_timeout: Optional[float] = None):
+    """
+    Return the process-wide sagemaker-runtime client for a region and read timeout
+
+    boto3 clients are thread-safe, so one client (and its connection pool) is
+    shared by every LoraAdapterManager instead of each creating its own.
+
+    Args:
+        region (str, optional): AWS region; the session default when omitted
+        read_timeout (float, optional): Overrides RUNTIME_CLIENT_CONFIG['read_timeout']
+
+    Returns:
+        The shared sagemaker-runtime client
+    """
+    read_timeout = read_timeout or RUNTIME_CLIENT_CONFIG['read_timeout']
+    key = ('sagemaker-runtime', region, read_timeout)
+
+    client = _clients.get(key)
+    if client is not None:
+        return client
+
+    with _clients_lock:
+        client = _clients.get(key)
+        if client is None:
+            client_config = Config(
+                max_pool_connections=RUNTIME_CLIENT_CONFIG['max_pool_connections'],
+                connect_timeout=RUNTIME_CLIENT_CONFIG['connect_timeout'],
+                read_timeout=read_timeout,
+                tcp_keepalive=RUNTIME_CLIENT_CONFIG['tcp_keepalive'],
+                retries={
+                    'mode': RUNTIME_CLIENT_CONFIG['retry_mode'],
+                    'total_max_attempts': RUNTIME_CLIENT_CONFIG['max_attempts'],
+                },
+            )
+            # The default boto3 session is not safe to share across threads during client creation
+            client = boto3.session.Session().client('sagemaker-runtime', region_name=region, config=client_config)
+            _clients[key] = client
+            logger.info(f"Created sagemaker-runtime client (region={region}, read_timeout={read_timeout}s)")
+    return client
@@ -0,0 +1,201 @@
+# File: multilingual-support/batch_transform.py
+
+import heapq
+import json
+import time
+from collections import defaultdict
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+from logger import setup_logger
+from config import BATCH_TRANSFORM_CONFIG, SAGEMAKER_CONFIG
+
+logger = setup_logger('batch_transform')
+
+
+def read_queries(query_file: str) -> Iterator[str]:
+    """Yield queries from a JSONL file with a 'query' field, or a text file with one query per line"""
+    with open(query_file, encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            yield json.loads(line)['query'] if query_file.endswith('.jsonl') else line
+
+
+class BatchTransformWorkflow:
+    def __init__(self, sm_client, s3_client, adapter_manager, bucket: str,
+                 detector: Callable[[str], Tuple[str, str]],
+                 model_name: str = SAGEMAKER_CONFIG['endpoint_name'],
+                 s3_prefix: str = BATCH_TRANSFORM_CONFIG['s3_prefix'],
+                 max_concurrent_transforms: int = SAGEMAKER_CONFIG['max_concurrent_transforms'],
+                 batch_strategy: str = BATCH_TRANSFORM_CONFIG['batch_strategy'],
+                 max_payload_mb: int = BATCH_TRANSFORM_CONFIG['max_payload_mb'],
+                 max_records_per_shard: int = BATCH_TRANSFORM_CONFIG['max_records_per_shard'],
+                 instance_type: str = BATCH_TRANSFORM_CONFIG['instance_type'],
+                 instance_count: int = BATCH_TRANSFORM_CONFIG['instance_count']):
+        """
+        Run large offline query sets through a SageMaker Batch Transform job
+
+        Queries are sharded into S3 input objects grouped by detected adapter,
+        so each transform worker mostly serves one adapter, and the outputs
+        are merged back in the original query order.
+
+        Args:
+            sm_client: boto3 sagemaker client
+            s3_client: boto3 s3 client
+            adapter_manager (LoraAdapterManager): Formats the request payload for each query
+            bucket (str): Bucket for transform inputs and outputs
+            detector (Callable): Maps a query to its (language, domain)
+            model_name (str): SageMaker model the transform job runs
+            s3_prefix (str): Key prefix for job inputs and outputs
+            max_concurrent_transforms (int): Parallel requests per transform instance
+            batch_strategy (str): 'SingleRecord' or 'MultiRecord'
+            max_payload_mb (int): Maximum request payload size
+            max_records_per_shard (int): Records per S3 input object
+            instance_type (str): Transform instance type
+            instance_count (int): Transform instance count
+        """
+        self.sm_client = sm_client
+        self.s3_client = s3_client
+        self.adapter_manager = adapter_manager
+        self.bucket = bucket
+        self.detector = detector
+        self.model_name = model_name
+        self.s3_prefix = s3_prefix
+        self.max_concurrent_transforms = max_concurrent_transforms
+        self.batch_strategy = batch_strategy
+        self.max_payload_mb = max_payload_mb
+        self.max_records_per_shard = max_records_per_shard
+        self.instance_type = instance_type
+        self.instance_count = instance_count
+
+    def _job_prefix(self, job_name: str) -> str:
+        return f"{self.s3_prefix}{job_name}/"
+
+    def shard_queries(self, queries: Iterable[str], job_name: str) -> Dict:
+        """
+        Upload queries as JSON-lines input objects grouped by adapter
+
+        Returns:
+            Dict: Manifest listing each shard's key, adapter and original query indices
+        """
+        input_prefix = f"{self._job_prefix(job_name)}input/"
+        buffers: Dict[str, List[Tuple[int, str]]] = defaultdict(list)
+        shard_counts: Dict[str, int] = defaultdict(int)
+        shards = []
+
+        def flush(adapter_name: str):
+            records = buffers.pop(adapter_name)
+            key = f"{input_prefix}{adapter_name}-{shard_counts[adapter_name]:05d}.jsonl"
+            shard_counts[adapter_name] += 1
+            body = ''.join(line for _, line in records)
+            self.s3_client.put_object(Bucket=self.bucket, Key=key, Body=body.encode('utf-8'))
+            shards.append({'key': key, 'adapter': adapter_name, 'indices': [index for index, _ in records]})
+
+        total = 0
+        for index, query in enumerate(queries):
+            language, domain = self.detector(query)
+            payload = self.adapter_manager._format_prompt(query, language, domain)
+            adapter_name = payload['parameters']['adapter_name']
+            buffers[adapter_name].append((index, json.dumps(payload, ensure_ascii=False) + '\n'))
+            if len(buffers[adapter_name]) >= self.max_records_per_shard:
+                flush(adapter_name)
+            total = index + 1
+
+        for adapter_name in list(buffers):
+            flush(adapter_name)
+
+        manifest = {'job_name': job_name, 'input_prefix': input_prefix, 'total': total, 'shards': shards}
+        self.s3_client.put_object(
+            Bucket=self.bucket,
+            Key=f"{self._job_prefix(job_name)}manifest.json",
+            Body=json.dumps(manifest).encode('utf-8')
+        )
+        logger.info(f"Uploaded {total} queries as {len(shards)} shards under s3://{self.bucket}/{input_prefix}")
+        return manifest
+
+    def start_transform_job(self, manifest: Dict) -> str:
+        """Launch the transform job over the manifest's input prefix"""
+        job_name = manifest['job_name']
+        self.sm_client.create_transform_job(
+            TransformJobName=job_name,
+            ModelName=self.model_name,
+            MaxConcurrentTransforms=self.max_concurrent_transforms,
+            MaxPayloadInMB=self.max_payload_mb,
+            BatchStrategy=self.batch_strategy,
+            TransformInput={
+                'DataSource': {
+                    'S3DataSource': {
+                        'S3DataType': 'S3Prefix',
+                        'S3Uri': f"s3://{self.bucket}/{manifest['input_prefix']}",
+                    }
+                },
+                'ContentType': 'application/json',
+                'SplitType': 'Line',
+            },
+            TransformOutput={
+                'S3OutputPath': f"s3://{self.bucket}/{self._job_prefix(job_name)}output/",
+                'Accept': 'application/json',
+                'AssembleWith': 'Line',
+            },
+            TransformResources={
+                'InstanceType': self.instance_type,
+                'InstanceCount': self.instance_count,
+            },
+        )
+        logger.info(f"Started transform job {job_name} with {self.max_concurrent_transforms} concurrent transforms")
+        return job_name
+
+    def wait_for_job(self, job_name: str, delay: int = 60, max_attempts: int = 240):
+        """Wait for the transform job and raise if it did not complete"""
+        waiter = self.sm_client.get_waiter('transform_job_completed_or_stopped')
+        waiter.wait(TransformJobName=job_name, WaiterConfig={'Delay': delay, 'MaxAttempts': max_attempts})
+        description = self.sm_client.describe_transform_job(TransformJobName=job_name)
+        status = description['TransformJobStatus']
+        if status != 'Completed':
+            raise RuntimeError(f"Transform job {job_name} ended with status {status}: "
+                               f"{description.get('FailureReason', 'no reason given')}")
+        logger.info(f"Transform job {job_name} completed")
+
+    def _shard_results(self, job_name: str, shard: Dict) -> Iterator[Tuple[int, str]]:
+        """Yield (original index, generated text) for one shard's output object"""
+        output_key = f"{self._job_prefix(job_name)}output/{shard['key'].rsplit('/', 1)[-1]}.out"
+        body = self.s3_client.get_object(Bucket=self.bucket, Key=output_key)['Body']
+        indices = iter(shard['indices'])
+        for line in body.iter_lines():
+            if not line.strip():
+                continue
+            result = json.loads(line)
+            if isinstance(result, list):
+                result = result[0]
+            yield next(indices), result['generated_text']
+
+    def merge_outputs(self, manifest: Dict) -> Iterator[Tuple[int, str]]:
+        """
+        Yield (original index, generated text) across all shards in original order
+
+        Each shard's indices are ascending, so a k-way merge streams the
+        outputs without loading them all into memory
+        """
+        job_name = manifest['job_name']
+        return heapq.merge(*(self._shard_results(job_name, shard) for shard in manifest['shards']))
+
+    def run(self, query_file: str, output_file: str, job_name: Optional[str] = None,
+            delay: int = 60) -> Dict:
+        """Shard, transform and merge a query file; writes one JSON result per line in input order"""
+        job_name = job_name or f"{self.model_name}-batch-{time.strftime('%Y%m%d-%H%M%S')}"
+        manifest = self.shard_queries(read_queries(query_file), job_name)
+        self.start_transform_job(manifest)
+        self.wait_for_job(job_name, delay=delay)
+
+        written = 0
+        with open(output_file, 'w', encoding='utf-8') as out:
+            for (index, generated_text), query in zip(self.merge_outputs(manifest), read_queries(query_file)):
+                if index != written:
+                    raise RuntimeError(f"Transform output is missing record {written}")
+                out.write(json.dumps({'query': query, 'response': generated_text}, ensure_ascii=False) + '\n')
+                written += 1
+
+        if written != manifest['total']:
+            raise RuntimeError(f"Transform produced {written} results for {manifest['total']} queries")
+        logger.info(f"Wrote {written} results to {output_file}")
+        return {'job_name': job_name, 'records': written, 'shards': len(manifest['shards'])}
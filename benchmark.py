@@ -0,0 +1,231 @@
+# File: multilingual-support/benchmark.py
+
+import argparse
+import json
+import math
+import sys
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional
+from adapter_manager import LoraAdapterManager
+from config import SAGEMAKER_CONFIG
+from fake_runtime import FakeSageMakerRuntime
+from inference_handler import CustomerSupportInference
+from logger import setup_logger
+from metrics import get_registry
+
+logger = setup_logger('benchmark')
+
+# Same mix as test_inference.py
+DEFAULT_CORPUS = [
+    "Hola, mi producto no está funcionando correctamente",
+    "Necesito información sobre mi última factura",
+    "Bonjour, je ne peux pas accéder à mon compte",
+    "Quelles sont les caractéristiques du produit?",
+    "Привет, мой продукт сломался",
+    "Сколько стоит подписка?",
+]
+
+
+def load_corpus(path: str) -> List[str]:
+    """Load queries from a JSONL file with a 'query' field, or a plain text file with one query per line"""
+    queries = []
+    with open(path, encoding='utf-8') as corpus_file:
+        for line in corpus_file:
+            line = line.strip()
+            if not line:
+                continue
+            if path.endswith('.jsonl'):
+                line = json.loads(line)['query']
+            queries.append(line)
+    return queries
+
+
+def percentile(sorted_values: List[float], q: float) -> Optional[float]:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return None
+    rank = max(0, min(len(sorted_values) - 1, math.ceil(q * len(sorted_values)) - 1))
+    return sorted_values[rank]
+
+
+def summarize(latencies_ms: List[float], errors: int, elapsed_seconds: float) -> Dict:
+    """Latency percentiles, throughput and error rate for one group of requests"""
+    ordered = sorted(latencies_ms)
+    total = len(ordered)
+    return {
+        'requests': total,
+        'errors': errors,
+        'error_rate': errors / total if total else 0.0,
+        'throughput_rps': total / elapsed_seconds if elapsed_seconds > 0 else 0.0,
+        'latency_ms': {
+            'mean': sum(ordered) / total if total else None,
+            'p50': percentile(ordered, 0.50),
+            'p95': percentile(ordered, 0.95),
+            'p99': percentile(ordered, 0.99),
+            'max': ordered[-1] if ordered else None,
+        },
+    }
+
+
+def format_ms(value: Optional[float]) -> str:
+    """A latency for the log; 'n/a' when there were no requests to measure"""
+    return f"{value:.0f}ms" if value is not None else 'n/a'
+
+
+def build_handler(backend: str, endpoint_name: str = SAGEMAKER_CONFIG['endpoint_name'],
+                  fake_options: Optional[Dict] = None) -> CustomerSupportInference:
+    """Create a handler against the local fake runtime ('fake') or the real endpoint ('endpoint')"""
+    if backend == 'fake':
+        manager = LoraAdapterManager(endpoint_name=endpoint_name, runtime=FakeSageMakerRuntime(**(fake_options or {})))
+    elif backend == 'endpoint':
+        manager = LoraAdapterManager(endpoint_name=endpoint_name)
+    else:
+        raise ValueError(f"Unknown backend: {backend}")
+    return CustomerSupportInference(adapter_manager=manager)
+
+
+def run_benchmark(handler: CustomerSupportInference, corpus: List[str], num_requests: int,
+                  concurrency: int = 8, target_qps: Optional[float] = None) -> Dict:
+    """
+    Replay a query corpus through process_query and measure latency
+
+    Args:
+        handler (CustomerSupportInference): Handler under test
+        corpus (List[str]): Queries, replayed round-robin
+        num_requests (int): Total requests to send
+        concurrency (int): Maximum requests in flight (closed loop when target_qps is None;
+            latency is then timed from when a worker picks the request up)
+        target_qps (float, optional): Open-loop arrival rate; requests are paced at this rate
+            and latency includes any wait for a free worker
+
+    Returns:
+        Dict: Overall and per-adapter results
+    """
+    records = []
+    records_lock = threading.Lock()
+
+    def _timed_query(index: int, start: Optional[float]):
+        query = corpus[index % len(corpus)]
+        if start is None:
+            start = time.perf_counter()
+        result = handler.process_query(query)
+        latency_ms = (time.perf_counter() - start) * 1000
+        # Failed results carry the language and domain too, once detection got that far
+        if result.get('language') and result.get('domain'):
+            adapter = handler.adapter_manager._adapter_name(result['language'], result['domain'])
+        else:
+            adapter = 'unknown'
+        with records_lock:
+            records.append((adapter, latency_ms, result.get('status') != 'success'))
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        for index in range(num_requests):
+            if target_qps:
+                # Open loop: pace submissions on a fixed schedule, independent of completions
+                delay = start + index / target_qps - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                # Latency is measured from submission, so client-side queueing counts
+                executor.submit(_timed_query, index, time.perf_counter())
+            else:
+                # Closed loop: every request is queued up front, so time only the service, not the wait
+                executor.submit(_timed_query, index, None)
+    elapsed = time.perf_counter() - start
+
+    per_adapter = defaultdict(list)
+    for adapter, latency_ms, failed in records:
+        per_adapter[adapter].append((latency_ms, failed))
+
+    return {
+        'config': {
+            'num_requests': num_requests,
+            'concurrency': concurrency,
+            'target_qps': target_qps,
+            'corpus_size': len(corpus),
+        },
+        'elapsed_seconds': elapsed,
+        'overall': summarize([r[1] for r in records], sum(r[2] for r in records), elapsed),
+        'per_adapter': {
+            adapter: summarize([r[0] for r in rows], sum(r[1] for r in rows), elapsed)
+            for adapter, rows in sorted(per_adapter.items())
+        },
+    }
+
+
+def compare_results(current: Dict, baseline: Dict, tolerance: float = 0.10) -> List[str]:
+    """
+    Compare two benchmark results
+
+    Returns:
+        List[str]: One message per metric that regressed by more than tolerance
+    """
+    regressions = []
+    for quantile in ('p50', 'p95', 'p99'):
+        before = baseline['overall']['latency_ms'][quantile]
+        after = current['overall']['latency_ms'][quantile]
+        if before and after and after > before * (1 + tolerance):
+            regressions.append(f"{quantile} latency {before:.0f}ms -> {after:.0f}ms")
+
+    before = baseline['overall']['throughput_rps']
+    after = current['overall']['throughput_rps']
+    if before and after < before * (1 - tolerance):
+        regressions.append(f"throughput {before:.1f} -> {after:.1f} req/s")
+
+    before = baseline['overall']['error_rate']
+    after = current['overall']['error_rate']
+    if after > before + tolerance / 10:
+        regressions.append(f"error rate {before:.2%} -> {after:.2%}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test the customer support inference path")
+    parser.add_argument('--backend', choices=['fake', 'endpoint'], default='fake')
+    parser.add_argument('--endpoint-name', default=SAGEMAKER_CONFIG['endpoint_name'])
+    parser.add_argument('--corpus', help="JSONL ('query' field) or text file; defaults to a built-in mix")
+    parser.add_argument('--requests', type=int, default=200)
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--qps', type=float, help="Open-loop target rate; closed loop when omitted")
+    parser.add_argument('--fake-time-scale', type=float, default=1.0,
+                        help="Scale the fake runtime's simulated delays")
+    parser.add_argument('--stage-metrics', action='store_true',
+                        help="Record per-stage histograms and include them in the results")
+    parser.add_argument('--output', default='benchmark_results.json')
+    parser.add_argument('--baseline', help="Previous results JSON; exits non-zero on regression")
+    parser.add_argument('--tolerance', type=float, default=0.10)
+    args = parser.parse_args()
+
+    corpus = load_corpus(args.corpus) if args.corpus else DEFAULT_CORPUS
+    if args.stage_metrics:
+        get_registry().enabled = True
+    handler = build_handler(args.backend, args.endpoint_name, {'time_scale': args.fake_time_scale})
+    results = run_benchmark(handler, corpus, args.requests, args.concurrency, args.qps)
+    results['config']['backend'] = args.backend
+    results['timestamp'] = time.strftime('%Y-%m-%dT%H:%M:%S%z')
+    if args.stage_metrics:
+        results['stage_metrics'] = get_registry().snapshot()
+
+    Path(args.output).write_text(json.dumps(results, indent=2))
+    overall = results['overall']
+    logger.info(
+        f"{overall['requests']} requests, {overall['throughput_rps']:.1f} req/s, "
+        f"p50={format_ms(overall['latency_ms']['p50'])} p95={format_ms(overall['latency_ms']['p95'])} "
+        f"p99={format_ms(overall['latency_ms']['p99'])}, error rate {overall['error_rate']:.2%}"
+    )
+    logger.info(f"Results written to {args.output}")
+
+    if args.baseline:
+        regressions = compare_results(results, json.loads(Path(args.baseline).read_text()), args.tolerance)
+        for regression in regressions:
+            logger.error(f"Regression: {regression}")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+# File: multilingual-support/bulk.py
+
+import argparse
+import json
+import os
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Optional
+from config import SAGEMAKER_CONFIG
+from inference_handler import CustomerSupportInference
+from logger import setup_logger
+
+logger = setup_logger('bulk')
+
+
+def _load_checkpoint(checkpoint_path: Path) -> Dict:
+    if checkpoint_path.exists():
+        return json.loads(checkpoint_path.read_text())
+    return {'input_offset': 0, 'output_offset': 0, 'lines_done': 0}
+
+
+def _save_checkpoint(checkpoint_path: Path, checkpoint: Dict):
+    """Write the checkpoint atomically so a crash never leaves it half-written"""
+    tmp_path = checkpoint_path.with_name(checkpoint_path.name + '.tmp')
+    tmp_path.write_text(json.dumps(checkpoint))
+    os.replace(tmp_path, checkpoint_path)
+
+
+def process_jsonl(input_path: str, output_path: str, checkpoint_path: Optional[str] = None,
+                  handler: Optional[CustomerSupportInference] = None,
+                  concurrency: int = SAGEMAKER_CONFIG['max_concurrent_invocations'],
+                  checkpoint_every: int = 100) -> Dict:
+    """
+    Process a JSONL file of queries and append results to a JSONL output
+
+    Each input line is a JSON object with a 'query' field; it is written back
+    with a 'result' field holding the process_query result. Lines are read
+    lazily and at most 2 * concurrency are in flight, so memory stays flat
+    regardless of file size. Results are written in input order, and the
+    checkpoint records the input and output byte offsets of the last written
+    line, so a rerun resumes from there.
+
+    Args:
+        input_path (str): JSONL file with one query object per line
+        output_path (str): JSONL file results are appended to
+        checkpoint_path (str, optional): Defaults to output_path + '.checkpoint'
+        handler (CustomerSupportInference, optional): Handler used for detection and invocation
+        concurrency (int): Queries processed at once
+        checkpoint_every (int): Lines written between checkpoints
+
+    Returns:
+        Dict: Counts of lines processed in this run, failures and the total done
+    """
+    handler = handler or CustomerSupportInference()
+    checkpoint_path = Path(checkpoint_path or f"{output_path}.checkpoint")
+    checkpoint = _load_checkpoint(checkpoint_path)
+    if checkpoint['lines_done']:
+        logger.info(f"Resuming {input_path} after {checkpoint['lines_done']} lines")
+
+    def _process_line(raw_line: bytes):
+        try:
+            record = json.loads(raw_line)
+            result = handler.process_query(record['query'])
+        except (ValueError, KeyError, TypeError) as e:
+            record = {'raw': raw_line.decode('utf-8', errors='replace').rstrip('\n')}
+            result = {'status': 'error', 'error_message': f"Invalid input line: {str(e)}"}
+        record['result'] = result
+        return (json.dumps(record, ensure_ascii=False) + '\n').encode('utf-8'), result.get('status') == 'success'
+
+    processed = failed = since_checkpoint = 0
+    output_file_path = Path(output_path)
+    output_file_path.touch()
+
+    with open(input_path, 'rb') as input_file, open(output_file_path, 'r+b') as output_file, \
+            ThreadPoolExecutor(max_workers=concurrency) as executor:
+        # Drop anything written after the last checkpoint; those lines are redone
+        output_file.truncate(checkpoint['output_offset'])
+        output_file.seek(checkpoint['output_offset'])
+        input_file.seek(checkpoint['input_offset'])
+
+        window = deque()
+        input_offset = checkpoint['input_offset']
+
+        def _write_oldest():
+            nonlocal processed, failed, since_checkpoint
+            future, end_offset = window.popleft()
+            line, succeeded = future.result()
+            output_file.write(line)
+            processed += 1
+            since_checkpoint += 1
+            if not succeeded:
+                failed += 1
+            checkpoint['input_offset'] = end_offset
+            checkpoint['lines_done'] += 1
+            if since_checkpoint >= checkpoint_every:
+                _flush_checkpoint()
+
+        def _flush_checkpoint():
+            nonlocal since_checkpoint
+            output_file.flush()
+            os.fsync(output_file.fileno())
+            checkpoint['output_offset'] = output_file.tell()
+            _save_checkpoint(checkpoint_path, checkpoint)
+            since_checkpoint = 0
+
+        for raw_line in input_file:
+            input_offset += len(raw_line)
+            if not raw_line.strip():
+                continue
+            window.append((executor.submit(_process_line, raw_line), input_offset))
+            if len(window) >= concurrency * 2:
+                _write_oldest()
+
+        while window:
+            _write_oldest()
+        _flush_checkpoint()
+
+    logger.info(f"Processed {processed} lines ({failed} failed); {checkpoint['lines_done']} done in total")
+    return {'processed': processed, 'failed': failed, 'lines_done': checkpoint['lines_done']}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Process a JSONL file of customer queries")
+    parser.add_argument('input', help="JSONL file with a 'query' field per line")
+    parser.add_argument('output', help="JSONL file results are appended to")
+    parser.add_argument('--checkpoint', help="Checkpoint file (default: <output>.checkpoint)")
+    parser.add_argument('--concurrency', type=int, default=SAGEMAKER_CONFIG['max_concurrent_invocations'])
+    parser.add_argument('--checkpoint-every', type=int, default=100)
+    args = parser.parse_args()
+
+    process_jsonl(args.input, args.output, args.checkpoint,
+                  concurrency=args.concurrency, checkpoint_every=args.checkpoint_every)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,79 +1,186 @@
 # File: multilingual-support/cleanup.py
 
+import argparse
 import boto3
 import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Dict, Iterator, List, Tuple
+from botocore.config import Config
 from logger import setup_logger
-from config import SAGEMAKER_CONFIG, S3_CONFIG
+from config import CLEANUP_CONFIG, SAGEMAKER_CONFIG, S3_CONFIG
 
 logger = setup_logger('cleanup')
 
 class ResourceCleaner:
-    def __init__(self):
-        """Initialize AWS clients"""
-        self.sm_client = boto3.client('sagemaker')
-        self.s3_client = boto3.client('s3')
-        
-    def delete_endpoint(self):
-        """Delete SageMaker endpoint and associated resources"""
+    def __init__(self, sm_client=None, s3_client=None, dry_run: bool = False,
+                 delete_workers: int = CLEANUP_CONFIG['delete_workers'],
+                 delete_batch_size: int = CLEANUP_CONFIG['delete_batch_size']):
+        """
+        Initialize AWS clients
+
+        Args:
+            sm_client (optional): boto3 sagemaker client
+            s3_client (optional): boto3 s3 client, or a FakeS3Client for local runs
+            dry_run (bool): Only report what would be deleted
+            delete_workers (int): delete_objects calls in flight per bucket
+            delete_batch_size (int): Keys per delete_objects call, at most 1000
+        """
+        self.sm_client = sm_client or boto3.client('sagemaker')
+        self.s3_client = s3_client or boto3.client('s3', config=Config(max_pool_connections=delete_workers + 1))
+        self.dry_run = dry_run
+        self.delete_workers = delete_workers
+        self.delete_batch_size = min(delete_batch_size, 1000)
+
+    def _delete_resource(self, kind: str, name: str, delete, missing_message: str) -> bool:
+        """Delete one SageMaker resource; False when it does not exist"""
+        if self.dry_run:
+            logger.info(f"[dry run] Would delete {kind}: {name}")
+            return False
+        logger.info(f"Attempting to delete {kind}: {name}")
         try:
-            # Delete endpoint
-            logger.info(f"Attempting to delete endpoint: {SAGEMAKER_CONFIG['endpoint_name']}")
-            try:
-                self.sm_client.delete_endpoint(
-                    EndpointName=SAGEMAKER_CONFIG['endpoint_name']
-                )
-                logger.info(f"Successfully deleted endpoint: {SAGEMAKER_CONFIG['endpoint_name']}")
-            except self.sm_client.exceptions.ClientError as e:
-                if 'Could not find endpoint' in str(e):
-                    logger.info(f"Endpoint {SAGEMAKER_CONFIG['endpoint_name']} does not exist")
-                else:
-                    raise
-
-            # Delete endpoint config
-            logger.info(f"Attempting to delete endpoint config: {SAGEMAKER_CONFIG['endpoint_name']}-config")
-            try:
-                self.sm_client.delete_endpoint_config(
-                    EndpointConfigName=f"{SAGEMAKER_CONFIG['endpoint_name']}-config"
-                )
-                logger.info(f"Successfully deleted endpoint config: {SAGEMAKER_CONFIG['endpoint_name']}-config")
-            except self.sm_client.exceptions.ClientError as e:
-                if 'Could not find endpoint configuration' in str(e):
-                    logger.info(f"Endpoint config {SAGEMAKER_CONFIG['endpoint_name']}-config does not exist")
-                else:
-                    raise
-
-            # Delete model
-            logger.info(f"Attempting to delete model: {SAGEMAKER_CONFIG['endpoint_name']}")
-            try:
-                self.sm_client.delete_model(
-                    ModelName=SAGEMAKER_CONFIG['endpoint_name']
+            delete()
+            logger.info(f"Successfully deleted {kind}: {name}")
+            return True
+        except self.sm_client.exceptions.ClientError as e:
+            if missing_message in str(e):
+                logger.info(f"{kind.capitalize()} {name} does not exist")
+                return False
+            raise
+
+    def delete_endpoint(self) -> Dict[str, bool]:
+        """
+        Delete SageMaker endpoint and associated resources
+
+        The endpoint, endpoint config and model are deleted concurrently: a
+        running endpoint does not need its config or model. Endpoint deletion
+        is asynchronous, so it is awaited with the endpoint_deleted waiter;
+        the other two are deleted by the time their calls return.
+
+        Returns:
+            Dict[str, bool]: Whether each resource was deleted
+        """
+        endpoint_name = SAGEMAKER_CONFIG['endpoint_name']
+        config_name = f"{endpoint_name}-config"
+        try:
+            with ThreadPoolExecutor(max_workers=3, thread_name_prefix='sagemaker-delete') as executor:
+                futures = {
+                    'endpoint': executor.submit(
+                        self._delete_resource, 'endpoint', endpoint_name,
+                        lambda: self.sm_client.delete_endpoint(EndpointName=endpoint_name),
+                        'Could not find endpoint'
+                    ),
+                    'endpoint_config': executor.submit(
+                        self._delete_resource, 'endpoint config', config_name,
+                        lambda: self.sm_client.delete_endpoint_config(EndpointConfigName=config_name),
+                        'Could not find endpoint configuration'
+                    ),
+                    'model': executor.submit(
+                        self._delete_resource, 'model', endpoint_name,
+                        lambda: self.sm_client.delete_model(ModelName=endpoint_name),
+                        'Could not find model'
+                    ),
+                }
+                deleted = {kind: future.result() for kind, future in futures.items()}
+
+            if deleted['endpoint']:
+                waiter = self.sm_client.get_waiter('endpoint_deleted')
+                waiter.wait(
+                    EndpointName=endpoint_name,
+                    WaiterConfig={
+                        'Delay': CLEANUP_CONFIG['waiter_delay_seconds'],
+                        'MaxAttempts': CLEANUP_CONFIG['waiter_max_attempts'],
+                    }
                 )
-                logger.info(f"Successfully deleted model: {SAGEMAKER_CONFIG['endpoint_name']}")
-            except self.sm_client.exceptions.ClientError as e:
-                if 'Could not find model' in str(e):
-                    logger.info(f"Model {SAGEMAKER_CONFIG['endpoint_name']} does not exist")
-                else:
-                    raise
+                logger.info(f"Endpoint {endpoint_name} is gone")
+            return deleted
 
         except Exception as e:
             logger.error(f"Error during endpoint cleanup: {str(e)}")
             raise
 
-    def empty_and_delete_bucket(self, bucket_name):
-        """Empty and delete an S3 bucket"""
+    def _version_batches(self, bucket_name: str, counts: Dict) -> Iterator[List[Dict]]:
+        """Every object version and delete marker in the bucket, in delete_objects batches"""
+        paginator = self.s3_client.get_paginator('list_object_versions')
+        batch = []
+        for page in paginator.paginate(Bucket=bucket_name):
+            for version in page.get('Versions', []):
+                counts['versions'] += 1
+                counts['objects'] += int(version.get('IsLatest', False))
+                counts['bytes'] += version.get('Size', 0)
+                batch.append({'Key': version['Key'], 'VersionId': version['VersionId']})
+            for marker in page.get('DeleteMarkers', []):
+                counts['delete_markers'] += 1
+                batch.append({'Key': marker['Key'], 'VersionId': marker['VersionId']})
+            while len(batch) >= self.delete_batch_size:
+                yield batch[:self.delete_batch_size]
+                batch = batch[self.delete_batch_size:]
+        if batch:
+            yield batch
+
+    def _delete_batch(self, bucket_name: str, batch: List[Dict]) -> Tuple[int, List[Dict]]:
+        """Delete one batch of versions; returns the number deleted and the per-key errors"""
+        response = self.s3_client.delete_objects(
+            Bucket=bucket_name,
+            Delete={'Objects': batch, 'Quiet': True}
+        )
+        errors = response.get('Errors', [])
+        return len(batch) - len(errors), errors
+
+    def empty_and_delete_bucket(self, bucket_name) -> Dict:
+        """
+        Empty and delete an S3 bucket
+
+        Object versions and delete markers are listed and deleted by
+        VersionId, so versioned buckets end up empty too. Listing feeds a pool
+        of delete_objects workers, with at most twice as many batches queued
+        as there are workers.
+
+        Returns:
+            Dict: Current objects, versions, delete markers and bytes found,
+            keys deleted and the time taken
+        """
         try:
             logger.info(f"Attempting to empty and delete bucket: {bucket_name}")
-            
-            # List and delete all objects in the bucket
-            paginator = self.s3_client.get_paginator('list_objects_v2')
-            for page in paginator.paginate(Bucket=bucket_name):
-                if 'Contents' in page:
-                    objects = [{'Key': obj['Key']} for obj in page['Contents']]
-                    self.s3_client.delete_objects(
-                        Bucket=bucket_name,
-                        Delete={'Objects': objects}
-                    )
-                    logger.info(f"Deleted {len(objects)} objects from {bucket_name}")
+            started_at = time.monotonic()
+            counts = {'objects': 0, 'versions': 0, 'delete_markers': 0, 'bytes': 0, 'deleted': 0}
+            errors = []
+
+            def collect(done):
+                for future in done:
+                    deleted, batch_errors = future.result()
+                    counts['deleted'] += deleted
+                    errors.extend(batch_errors)
+
+            try:
+                with ThreadPoolExecutor(max_workers=self.delete_workers,
+                                        thread_name_prefix='bucket-purge') as executor:
+                    in_flight = set()
+                    for batch in self._version_batches(bucket_name, counts):
+                        if self.dry_run:
+                            continue
+                        if len(in_flight) >= 2 * self.delete_workers:
+                            done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                            collect(done)
+                        in_flight.add(executor.submit(self._delete_batch, bucket_name, batch))
+                    collect(wait(in_flight).done)
+            except self.s3_client.exceptions.NoSuchBucket:
+                logger.info(f"Bucket {bucket_name} does not exist")
+                return {'bucket': bucket_name, **counts, 'seconds': 0.0, 'dry_run': self.dry_run}
+
+            report = {'bucket': bucket_name, **counts, 'seconds': time.monotonic() - started_at,
+                      'dry_run': self.dry_run}
+            if self.dry_run:
+                logger.info(f"[dry run] {bucket_name}: {counts['objects']} objects, {counts['versions']} versions "
+                            f"and {counts['delete_markers']} delete markers ({counts['bytes'] / 1024 ** 2:.1f} MB) "
+                            f"would be deleted")
+                return report
+
+            if errors:
+                first = errors[0]
+                raise RuntimeError(f"{len(errors)} versions could not be deleted from {bucket_name}, e.g. "
+                                   f"{first.get('Key')}: {first.get('Code')} {first.get('Message')}")
+            logger.info(f"Deleted {counts['deleted']} versions and delete markers from {bucket_name} "
+                        f"in {report['seconds']:.1f}s")
 
             # Delete the bucket itself
             try:
@@ -81,37 +188,45 @@ class ResourceCleaner:
                 logger.info(f"Successfully deleted bucket: {bucket_name}")
             except self.s3_client.exceptions.NoSuchBucket:
                 logger.info(f"Bucket {bucket_name} does not exist")
-                
+            return report
+
         except Exception as e:
             logger.error(f"Error during bucket cleanup: {str(e)}")
             raise
 
     def cleanup_all(self):
-        """Clean up all resources"""
+        """Clean up all resources; the endpoint and the bucket are torn down concurrently"""
         try:
             logger.info("Starting cleanup process...")
-            
-            # Delete SageMaker resources
-            self.delete_endpoint()
-            
-            # Delete S3 buckets (only the LORA bucket, not the default SageMaker bucket)
-            if S3_CONFIG.get('lora_bucket'):
-                self.empty_and_delete_bucket(S3_CONFIG['lora_bucket'])
-            
-            logger.info("Cleanup completed successfully!")
-            
+
+            with ThreadPoolExecutor(max_workers=2, thread_name_prefix='cleanup') as executor:
+                # Delete SageMaker resources
+                futures = [executor.submit(self.delete_endpoint)]
+
+                # Delete S3 buckets (only the LORA bucket, not the default SageMaker bucket)
+                if S3_CONFIG.get('lora_bucket'):
+                    futures.append(executor.submit(self.empty_and_delete_bucket, S3_CONFIG['lora_bucket']))
+                for future in futures:
+                    future.result()
+
+            logger.info("Dry run completed" if self.dry_run else "Cleanup completed successfully!")
+
         except Exception as e:
             logger.error(f"Cleanup failed: {str(e)}")
             raise
 
 def main():
     """Main function to run cleanup"""
+    parser = argparse.ArgumentParser(description="Delete the endpoint, its config and model, and the LORA bucket")
+    parser.add_argument('--dry-run', action='store_true', help="Report what would be deleted without deleting")
+    parser.add_argument('--workers', type=int, default=CLEANUP_CONFIG['delete_workers'])
+    args = parser.parse_args()
     try:
-        cleaner = ResourceCleaner()
+        cleaner = ResourceCleaner(dry_run=args.dry_run, delete_workers=args.workers)
         cleaner.cleanup_all()
     except Exception as e:
         logger.error(f"Main cleanup process failed: {str(e)}")
         exit(1)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
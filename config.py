@@ -38,6 +38,32 @@ ADAPTER_CONFIGS = {
     }
 }
 
+# Language and domain detection markers, as {marker: weight}
+DETECTION_CONFIG = {
+    'default_language': 'spanish',
+    'default_domain': 'technical',
+    'language_markers': {
+        'spanish': {'hola': 1.0, 'gracias': 1.0, 'por favor': 1.0},
+        'french': {'bonjour': 1.0, 'merci': 1.0, 'sil vous plait': 1.0},
+        'russian': {'привет': 1.0, 'спасибо': 1.0, 'пожалуйста': 1.0},
+    },
+    'domain_markers': {
+        'technical': {'error': 1.0, 'broken': 1.0, 'not working': 1.0, 'failed': 1.0},
+        'billing': {'payment': 1.0, 'charge': 1.0, 'invoice': 1.0, 'cost': 1.0},
+        'product': {'features': 1.0, 'specifications': 1.0, 'compatibility': 1.0},
+    },
+}
+
+# Statistical language identification; used as the language detector once trained
+LANGUAGE_ID_CONFIG = {
+    'weights_path': os.getenv('LANGUAGE_ID_WEIGHTS', 'models/language_id.bin'),
+    'seed_samples_path': os.path.join(os.path.dirname(os.path.abspath(__file__)), 'language_seed.jsonl'),  # Trained from at startup when there are no weights
+    'ngram_range': (1, 4),    # Character n-gram lengths
+    'n_features': 2 ** 18,    # Hashed feature buckets; must be a power of two
+    'alpha': 0.1,             # Naive Bayes smoothing
+    'min_confidence': 0.6,    # Below this the keyword markers decide the language
+}
+
 # SageMaker Deployment Configuration
 
 SAGEMAKER_CONFIG = {
@@ -47,6 +73,7 @@ SAGEMAKER_CONFIG = {
     'enable_unmerged_lora': True,
     'max_lora_rank': 64,  # From video recommendation
     'max_cpu_lora': 4,    # Number of LORA adapters to cache in CPU
+    'max_concurrent_invocations': 32,  # Client-side cap, matches MAX_ROLLING_BATCH_SIZE
     'environment': {
         'TENSOR_PARALLEL_DEGREE': 'max',
         'ROLLING_BATCH': 'auto',
@@ -58,6 +85,63 @@ SAGEMAKER_CONFIG = {
     }
 }
 
+# Prompt shaping against the container's MAX_INPUT_LENGTH / MAX_TOTAL_TOKENS
+PROMPT_CONFIG = {
+    'tokenizer': 'auto',          # 'auto' loads BASE_MODEL's tokenizer if transformers is installed; 'approximate' never does
+    'approx_chars_per_token': 3.5,
+    'approx_safety_margin': 0.9,  # Share of MAX_INPUT_LENGTH used when token counts are approximate
+    'default_max_new_tokens': 512,
+    'max_new_tokens': {           # Generation budget per domain
+        'technical': 512,
+        'billing': 256,
+        'product': 384,
+    },
+    'min_new_tokens': 64,
+    'truncation_head_ratio': 0.6, # Share of the kept input taken from the start; the rest from the end
+    'truncation_marker': '\n[...]\n',
+}
+
+# Routing across several endpoints / production variants (see router.py)
+ROUTER_CONFIG = {
+    'targets': [
+        # e.g. {'endpoint_name': 'multilingual-support', 'variant': 'g5-2xl', 'region': 'us-east-2'}
+        {'endpoint_name': SAGEMAKER_CONFIG['endpoint_name'], 'variant': None, 'region': None},
+    ],
+    'ewma_alpha': 0.2,                  # Weight of the newest latency sample
+    'initial_latency_seconds': 1.0,     # Assumed latency of a target with no samples yet
+    'affinity_window': SAGEMAKER_CONFIG['max_cpu_lora'],  # Recent adapters remembered per target
+    'affinity_discount': 0.5,           # Score multiplier for targets that recently served the adapter
+    'failure_threshold': 3,             # Consecutive failures before a target is ejected
+    'ejection_seconds': 30,             # Time before an ejected target gets a probe request
+}
+
+# Adapter warm-up after deployment and on a schedule (see adapter_warmup.py)
+WARMUP_CONFIG = {
+    'after_deploy': True,
+    'interval_seconds': 300,
+    'traffic_window_intervals': 3, # Log lines older than this many intervals don't count as recent traffic
+    'probe_text': 'Hola',          # Probes generate a single token
+}
+
+# Offline composition of a language and a domain adapter into one (see lora_compose.py)
+COMPOSITION_CONFIG = {
+    'language_weight': 1.0,
+    'domain_weight': 1.0,
+    'rank': SAGEMAKER_CONFIG['max_lora_rank'],  # Rank of the combined adapter
+    'output_dtype': None,          # 'F16', 'BF16' or 'F32'; None keeps the language adapter's dtype
+    'adapters_dir': 'lora-adapters',  # Local mirror of S3_CONFIG['adapter_prefix']
+}
+
+# Batch Transform Configuration (offline jobs without a hot real-time endpoint)
+BATCH_TRANSFORM_CONFIG = {
+    'instance_type': BASE_MODEL['instance_type'],
+    'instance_count': 1,
+    'batch_strategy': 'SingleRecord',   # The LMI handler expects one JSON request per invocation
+    'max_payload_mb': 6,
+    'max_records_per_shard': 5000,      # Input objects are split per adapter, then by size
+    's3_prefix': 'batch-transform/',
+}
+
 # Update the S3_CONFIG section:
 S3_CONFIG = {
     'default_bucket': None,  # Will be populated with SageMaker default bucket
@@ -65,6 +149,134 @@ S3_CONFIG = {
     'adapter_prefix': 'lora-adapters/'
 }
 
+# Adapter artifact upload to S3_CONFIG['adapter_prefix'] (see adapter_upload.py)
+UPLOAD_CONFIG = {
+    'part_size_mb': 64,            # Multipart part size; S3 needs at least 5 MB
+    'max_workers': 8,              # Parts transferred at once per file
+    'max_concurrent_files': 4,     # Files uploaded at once
+    'hash_chunk_mb': 8,            # Read size when hashing local files
+    'manifest_name': 'manifest.json',
+    'delete_removed': False,       # Delete the objects of files removed locally, not just their manifest entries
+}
+
+# Resource teardown (see cleanup.py)
+CLEANUP_CONFIG = {
+    'delete_workers': 8,           # delete_objects calls in flight per bucket
+    'delete_batch_size': 1000,     # Keys per delete_objects call; S3 allows at most 1000
+    'waiter_delay_seconds': 15,    # endpoint_deleted polling interval
+    'waiter_max_attempts': 40,
+}
+
+# sagemaker-runtime client shared by the process
+RUNTIME_CLIENT_CONFIG = {
+    'max_pool_connections': 64,    # Should cover max_concurrent_invocations plus hedges
+    'connect_timeout': 2,
+    'read_timeout': 60,
+    'tcp_keepalive': True,
+    'retry_mode': 'adaptive',      # botocore client-side rate limiting on throttles
+    'max_attempts': 1,             # Retries are handled by RETRY_CONFIG instead
+}
+
+# Retries around invoke_endpoint
+RETRY_CONFIG = {
+    'max_attempts': 3,
+    'base_delay_seconds': 0.1,
+    'max_delay_seconds': 2.0,
+    'throttle_base_delay_seconds': 0.5,
+    'throttle_max_delay_seconds': 8.0,
+    'budget_ratio': 0.2,           # Retries allowed per request, on average
+    'budget_min_per_second': 1.0,  # Retries always allowed at low traffic
+}
+
+CIRCUIT_BREAKER_CONFIG = {
+    'failure_threshold': 5,        # Consecutive failures before failing fast
+    'reset_timeout_seconds': 30,   # Time before a probe request is let through
+}
+
+# Per-request deadlines (process_query(..., deadline=seconds))
+DEADLINE_CONFIG = {
+    'read_timeout_steps': [0.25, 0.5, 1, 1.5, 2, 3, 5, 8, 13, 20, 30, 60],  # One runtime client per step
+    'overhead_seconds': 0.15,     # Estimated fixed cost of one endpoint call
+    'seconds_per_token': 0.02,    # Estimated generation time per token
+    'min_new_tokens': 16,         # Give up rather than request fewer tokens than this
+}
+
+# Hedged requests (duplicate a slow call and take the first response)
+HEDGING_CONFIG = {
+    'enabled': False,
+    'quantile': 0.95,              # Hedge once a call outlives this latency quantile for its adapter
+    'min_delay_seconds': 0.05,
+    'min_samples': 20,             # Observed calls per adapter before hedging starts
+    'window': 500,                 # Recent latencies kept per adapter
+    'max_hedge_ratio': 0.1,        # Hedges allowed per request, per adapter manager
+    'max_workers': 64,
+}
+
+# Response Cache Configuration
+CACHE_CONFIG = {
+    'enabled': False,
+    'max_entries': 10000,          # In-memory LRU capacity
+    'ttl_seconds': 3600,
+    'disk_path': None,             # e.g. 'cache/responses.sqlite3' to survive restarts
+    'max_disk_entries': 100000,
+    'cache_sampled_responses': False,  # Opt in to caching do_sample=True generations
+}
+
+# Near-duplicate answer cache in front of process_query (reuses answers to paraphrased queries)
+SEMANTIC_CACHE_CONFIG = {
+    'enabled': False,
+    'threshold': 0.85,             # Cosine similarity needed to reuse an answer
+    'capacity_per_adapter': 10000,
+    'dim': 1024,                   # Hashed embedding size; must be a power of two
+    'ngram_range': (2, 4),
+    'ttl_seconds': 3600,
+    'cache_sampled_responses': CACHE_CONFIG['cache_sampled_responses'],
+    'index_dir': 'cache/semantic', # Per-instance memory-mapped scratch files; None keeps the vectors on the heap
+    'similarity_buckets': [0.5, 0.6, 0.7, 0.8, 0.85, 0.9, 0.95, 0.99, 1.0],
+}
+
+# In-flight request coalescing (independent of the response cache)
+COALESCING_CONFIG = {
+    'enabled': True,
+}
+
+# Client-side micro-batching of concurrent requests into multi-input payloads
+BATCHING_CONFIG = {
+    'enabled': False,
+    'max_batch_size': 8,           # Inputs per batched payload
+    'max_wait_ms': 5,              # How long the first request waits for others to join
+    'size_buckets': [1, 2, 4, 8, 16, 32],
+}
+
+# Adapter-affinity scheduling (groups requests by adapter to limit LORA swaps)
+SCHEDULER_CONFIG = {
+    'enabled': False,
+    'wave_size': 32,               # Requests dispatched together for one adapter
+    'max_wait_seconds': 2.0,       # A request queued this long is served next
+    'max_consecutive_waves': 4,    # Waves for one adapter before others get a turn
+}
+
+# Admission control in front of CustomerSupportInference (see admission.py)
+ADMISSION_CONFIG = {
+    'max_queue_size': 256,
+    'rate_per_second': 12.0,       # Sustained endpoint capacity, e.g. MAX_ROLLING_BATCH_SIZE / typical latency
+    'burst': 32,                   # Requests let through at once after an idle period
+    'max_concurrency': 32,         # Requests being processed at once
+    'domain_priorities': {         # Lower is served first
+        'billing': 0,
+        'technical': 1,
+        'product': 2,
+    },
+    'default_priority': 1,
+}
+
+# Hot-path instrumentation
+METRICS_CONFIG = {
+    'enabled': False,
+    'namespace': 'multilingual_support',
+    'buckets_ms': [1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000],
+}
+
 # Logging Configuration
 LOGGING_CONFIG = {
     'level': 'INFO',
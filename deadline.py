@@ -0,0 +1,78 @@
+# File: multilingual-support/deadline.py
+
+import time
+from typing import Callable, Optional, Union
+from config import DEADLINE_CONFIG
+
+
+class DeadlineExceeded(Exception):
+    """Raised when a request's latency budget runs out"""
+
+    def __init__(self, message: str, stage: str = ''):
+        super().__init__(message)
+        self.stage = stage
+
+
+class Deadline:
+    def __init__(self, budget_seconds: float, clock: Callable[[], float] = time.monotonic):
+        """
+        Latency budget for one request, started when it is created
+
+        tokens_reduced is set once max_new_tokens has been shrunk to fit the
+        budget, so callers know the response is shorter than a full one.
+
+        Args:
+            budget_seconds (float): Seconds the caller is willing to wait
+            clock (Callable): Monotonic time source
+        """
+        self.budget_seconds = budget_seconds
+        self._clock = clock
+        self._expires_at = clock() + budget_seconds
+        self.tokens_reduced = False
+
+    @classmethod
+    def coerce(cls, deadline: Optional[Union[float, 'Deadline']]) -> Optional['Deadline']:
+        """Accept a Deadline, a budget in seconds, or None"""
+        if deadline is None or isinstance(deadline, Deadline):
+            return deadline
+        return cls(float(deadline))
+
+    def remaining(self) -> float:
+        """Seconds left, never negative"""
+        return max(0.0, self._expires_at - self._clock())
+
+    def elapsed(self) -> float:
+        return self.budget_seconds - (self._expires_at - self._clock())
+
+    def expired(self) -> bool:
+        return self._clock() >= self._expires_at
+
+    def check(self, stage: str):
+        """Raise DeadlineExceeded if the budget ran out before stage"""
+        if self.expired():
+            raise DeadlineExceeded(
+                f"Deadline of {self.budget_seconds:.3f}s exceeded before {stage}", stage=stage
+            )
+
+
+def read_timeout_for(remaining: float) -> Optional[float]:
+    """
+    Largest configured read timeout step that fits in the remaining budget
+
+    Steps are fixed so only a handful of runtime clients are ever created.
+
+    Returns:
+        float: The read timeout, or None when even the smallest step does not fit
+    """
+    fitting = [step for step in DEADLINE_CONFIG['read_timeout_steps'] if step <= remaining]
+    return max(fitting) if fitting else None
+
+
+def max_tokens_within(remaining: float, requested: int) -> int:
+    """
+    max_new_tokens that can be generated in the remaining budget
+
+    Uses the configured per-request overhead and per-token generation time.
+    """
+    affordable = int((remaining - DEADLINE_CONFIG['overhead_seconds']) / DEADLINE_CONFIG['seconds_per_token'])
+    return max(0, min(requested, affordable))
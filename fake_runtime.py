@@ -0,0 +1,237 @@
+# File: multilingual-support/fake_runtime.py
+
+import io
+import json
+import random
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterator, Optional
+from botocore.exceptions import ClientError
+from botocore.response import StreamingBody
+from config import SAGEMAKER_CONFIG
+
+
+class ModelError(ClientError):
+    pass
+
+
+class ThrottlingException(ClientError):
+    pass
+
+
+class ValidationError(ClientError):
+    pass
+
+
+class _Exceptions:
+    """Mirrors the client.exceptions namespace of a boto3 sagemaker-runtime client"""
+    ClientError = ClientError
+    ModelError = ModelError
+    ThrottlingException = ThrottlingException
+    ValidationError = ValidationError
+
+
+class FakeSageMakerRuntime:
+    def __init__(self,
+                 max_rolling_batch_size: int = int(SAGEMAKER_CONFIG['environment']['MAX_ROLLING_BATCH_SIZE']),
+                 max_cpu_lora: int = SAGEMAKER_CONFIG['max_cpu_lora'],
+                 base_latency_seconds: float = 0.05,
+                 per_token_seconds: float = 0.02,
+                 cold_load_seconds: float = 0.5,
+                 response_tokens: int = 64,
+                 batch_slowdown: float = 0.0,
+                 model_error_rate: float = 0.0,
+                 throttle_rate: float = 0.0,
+                 time_scale: float = 1.0,
+                 seed: Optional[int] = None,
+                 responder: Optional[Callable[[str, str], str]] = None):
+        """
+        Local stand-in for the sagemaker-runtime client of an LMI endpoint
+
+        Simulates per-token generation cost, rolling-batch concurrency, an LRU
+        cache of resident LORA adapters with a cold-load penalty, and injected
+        ModelError / throttling failures, so client features can be exercised
+        without AWS.
+
+        Args:
+            max_rolling_batch_size (int): Requests generated concurrently; the rest queue
+            max_cpu_lora (int): Adapters kept resident before the least recently used is evicted
+            base_latency_seconds (float): Fixed per-request overhead
+            per_token_seconds (float): Generation cost of one token
+            cold_load_seconds (float): Penalty for loading an adapter that is not resident
+            response_tokens (int): Tokens generated when max_new_tokens allows
+            batch_slowdown (float): Extra per-token cost, as a fraction, when the batch is full
+            model_error_rate (float): Probability that a request fails with ModelError
+            throttle_rate (float): Probability that a request fails with ThrottlingException
+            time_scale (float): Multiplier applied to every simulated delay
+            seed (int, optional): Seed for the failure injection
+            responder (Callable, optional): Builds the response text from (inputs, adapter_name)
+        """
+        self.max_rolling_batch_size = max_rolling_batch_size
+        self.max_cpu_lora = max_cpu_lora
+        self.base_latency_seconds = base_latency_seconds
+        self.per_token_seconds = per_token_seconds
+        self.cold_load_seconds = cold_load_seconds
+        self.response_tokens = response_tokens
+        self.batch_slowdown = batch_slowdown
+        self.model_error_rate = model_error_rate
+        self.throttle_rate = throttle_rate
+        self.time_scale = time_scale
+        self.responder = responder or self._default_responder
+        self.exceptions = _Exceptions
+
+        self._random = random.Random(seed)
+        self._batch_slots = threading.Semaphore(max_rolling_batch_size)
+        self._adapters: 'OrderedDict[str, None]' = OrderedDict()
+        self._adapter_lock = threading.Lock()
+        self._lock = threading.Lock()
+        self._active = 0
+        self._counters = {
+            'requests': 0,
+            'model_errors': 0,
+            'throttled': 0,
+            'adapter_hits': 0,
+            'adapter_loads': 0,
+            'adapter_evictions': 0,
+            'max_active': 0,
+            'tokens_generated': 0,
+            'batched_inputs': 0,
+        }
+
+    @staticmethod
+    def _default_responder(inputs: str, adapter_name: str) -> str:
+        return f"[{adapter_name}] Gracias por contactarnos sobre: {inputs}"
+
+    def _sleep(self, seconds: float):
+        if seconds > 0 and self.time_scale > 0:
+            time.sleep(seconds * self.time_scale)
+
+    def _client_error(self, exception_class, code: str, message: str, status: int):
+        return exception_class(
+            {'Error': {'Code': code, 'Message': message}, 'ResponseMetadata': {'HTTPStatusCode': status}},
+            'InvokeEndpoint'
+        )
+
+    def _admit(self, body) -> Dict:
+        """Parse the request and apply failure injection"""
+        payload = json.loads(body.decode('utf-8') if isinstance(body, bytes) else body)
+        with self._lock:
+            self._counters['requests'] += 1
+            roll = self._random.random()
+            if roll < self.throttle_rate:
+                self._counters['throttled'] += 1
+                raise self._client_error(ThrottlingException, 'ThrottlingException', 'Rate exceeded', 400)
+            if roll < self.throttle_rate + self.model_error_rate:
+                self._counters['model_errors'] += 1
+                raise self._client_error(
+                    ModelError, 'ModelError',
+                    'Received server error (500) from primary with message "CUDA out of memory"', 424
+                )
+        return payload
+
+    def _load_adapter(self, adapter_name: Optional[str]):
+        """Make an adapter resident, paying the cold-load penalty on a miss"""
+        if not adapter_name:
+            return
+        with self._adapter_lock:
+            if adapter_name in self._adapters:
+                self._adapters.move_to_end(adapter_name)
+                with self._lock:
+                    self._counters['adapter_hits'] += 1
+                return
+            # Loads are serialized, like swapping weights onto the GPU
+            self._sleep(self.cold_load_seconds)
+            self._adapters[adapter_name] = None
+            with self._lock:
+                self._counters['adapter_loads'] += 1
+                if len(self._adapters) > self.max_cpu_lora:
+                    self._adapters.popitem(last=False)
+                    self._counters['adapter_evictions'] += 1
+
+    def _generate_tokens(self, payload: Dict) -> Iterator[str]:
+        """Hold a rolling-batch slot and yield tokens at the simulated generation rate"""
+        parameters = payload.get('parameters', {})
+        adapter_name = parameters.get('adapter_name')
+        max_new_tokens = parameters.get('max_new_tokens', self.response_tokens)
+
+        words = self.responder(payload['inputs'], adapter_name or 'base').split(' ')
+        num_tokens = max(1, min(max_new_tokens, self.response_tokens))
+        tokens = [(' ' if i else '') + words[i % len(words)] for i in range(num_tokens)]
+
+        with self._batch_slots:
+            with self._lock:
+                self._active += 1
+                self._counters['max_active'] = max(self._counters['max_active'], self._active)
+            try:
+                self._load_adapter(adapter_name)
+                self._sleep(self.base_latency_seconds)
+                for token in tokens:
+                    occupancy = self._active / self.max_rolling_batch_size
+                    self._sleep(self.per_token_seconds * (1 + self.batch_slowdown * occupancy))
+                    yield token
+                with self._lock:
+                    self._counters['tokens_generated'] += len(tokens)
+            finally:
+                with self._lock:
+                    self._active -= 1
+
+    def invoke_endpoint(self, EndpointName: str, Body, ContentType: str = 'application/json', **kwargs) -> Dict:
+        """Same call shape as sagemaker-runtime invoke_endpoint"""
+        payload = self._admit(Body)
+        if isinstance(payload['inputs'], list):
+            # Like LMI, each input of a batched payload joins the rolling batch and results come back as a list
+            inputs = payload['inputs']
+            with self._lock:
+                self._counters['batched_inputs'] += len(inputs)
+            with ThreadPoolExecutor(max_workers=max(1, len(inputs))) as executor:
+                texts = list(executor.map(
+                    lambda text: ''.join(self._generate_tokens({**payload, 'inputs': text})), inputs
+                ))
+            result = [{'generated_text': text} for text in texts]
+        else:
+            result = {'generated_text': ''.join(self._generate_tokens(payload))}
+        data = json.dumps(result, ensure_ascii=False).encode('utf-8')
+        return {
+            'ContentType': 'application/json',
+            'InvokedProductionVariant': kwargs.get('TargetVariant', 'AllTraffic'),
+            'Body': StreamingBody(io.BytesIO(data), len(data)),
+        }
+
+    def invoke_endpoint_with_response_stream(self, EndpointName: str, Body,
+                                             ContentType: str = 'application/json',
+                                             chunk_size: int = 16, **kwargs) -> Dict:
+        """
+        Same call shape as invoke_endpoint_with_response_stream
+
+        Token lines are re-chunked every chunk_size bytes so that payload parts
+        split JSON lines and multi-byte characters like the real stream can
+        """
+        payload = self._admit(Body)
+
+        def events():
+            pending = b''
+            for token in self._generate_tokens(payload):
+                pending += json.dumps({'token': {'text': token}}, ensure_ascii=False).encode('utf-8') + b'\n'
+                while len(pending) >= chunk_size:
+                    yield {'PayloadPart': {'Bytes': pending[:chunk_size]}}
+                    pending = pending[chunk_size:]
+            if pending:
+                yield {'PayloadPart': {'Bytes': pending}}
+
+        return {
+            'ContentType': 'application/jsonlines',
+            'InvokedProductionVariant': kwargs.get('TargetVariant', 'AllTraffic'),
+            'Body': events(),
+        }
+
+    def resident_adapters(self):
+        """Adapters currently resident, least recently used first"""
+        with self._adapter_lock:
+            return list(self._adapters)
+
+    def stats(self) -> Dict:
+        """Return request, failure and adapter-cache counters"""
+        with self._lock:
+            return dict(self._counters)
@@ -0,0 +1,270 @@
+# File: multilingual-support/fake_s3.py
+
+import hashlib
+import io
+import itertools
+import threading
+from typing import Callable, Dict, List, Optional
+from botocore.exceptions import ClientError
+from botocore.response import StreamingBody
+
+
+class NoSuchBucket(ClientError):
+    pass
+
+
+class NoSuchKey(ClientError):
+    pass
+
+
+class _Exceptions:
+    """Mirrors the client.exceptions namespace of a boto3 s3 client"""
+    ClientError = ClientError
+    NoSuchBucket = NoSuchBucket
+    NoSuchKey = NoSuchKey
+
+
+class _Paginator:
+    def __init__(self, method):
+        self._method = method
+
+    def paginate(self, **kwargs):
+        kwargs = dict(kwargs)
+        while True:
+            page = self._method(**kwargs)
+            yield page
+            if not page.get('IsTruncated'):
+                return
+            if 'NextContinuationToken' in page:
+                kwargs['ContinuationToken'] = page['NextContinuationToken']
+            else:
+                kwargs['KeyMarker'] = page['NextKeyMarker']
+                kwargs['VersionIdMarker'] = page['NextVersionIdMarker']
+
+
+class FakeS3Client:
+    def __init__(self, page_size: int = 1000):
+        """
+        In-memory stand-in for the subset of the boto3 s3 client used by this project
+
+        Buckets can be versioned with put_bucket_versioning; overwritten
+        objects and delete markers are then kept until deleted by VersionId.
+
+        Args:
+            page_size (int): Objects per list_objects_v2 / list_object_versions page
+        """
+        self.page_size = page_size
+        self.exceptions = _Exceptions
+        self._buckets: Dict[str, Dict[str, Dict]] = {}
+        # Noncurrent versions and delete markers per bucket and key, oldest first
+        self._history: Dict[str, Dict[str, List[Dict]]] = {}
+        self._versioned: Dict[str, bool] = {}
+        self._version_ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self.calls: Dict[str, int] = {}
+
+    def _count(self, operation: str):
+        with self._lock:
+            self.calls[operation] = self.calls.get(operation, 0) + 1
+
+    def _error(self, exception_class, code: str, message: str, operation: str):
+        return exception_class({'Error': {'Code': code, 'Message': message}}, operation)
+
+    def _bucket(self, bucket: str, operation: str) -> Dict[str, Dict]:
+        if bucket not in self._buckets:
+            raise self._error(NoSuchBucket, 'NoSuchBucket', f"Bucket {bucket} does not exist", operation)
+        return self._buckets[bucket]
+
+    def _new_version_id(self, bucket: str) -> str:
+        return str(next(self._version_ids)) if self._versioned.get(bucket) else 'null'
+
+    def _store(self, bucket: str, key: str, data: bytes, metadata: Optional[Dict], operation: str):
+        """Make data the current version of key; caller must hold the lock"""
+        objects = self._bucket(bucket, operation)
+        if self._versioned.get(bucket) and key in objects:
+            self._history[bucket].setdefault(key, []).append(objects[key])
+        objects[key] = {'Body': bytes(data), 'Metadata': dict(metadata or {}),
+                        'VersionId': self._new_version_id(bucket)}
+
+    def _delete_version(self, bucket: str, key: str, version_id: str):
+        """Remove one version or delete marker; caller must hold the lock"""
+        objects = self._buckets[bucket]
+        history = self._history[bucket].get(key, [])
+        if key in objects and objects[key]['VersionId'] == version_id:
+            del objects[key]
+        else:
+            history[:] = [entry for entry in history if entry['VersionId'] != version_id]
+        if key not in objects and history and not history[-1].get('IsDeleteMarker'):
+            objects[key] = history.pop()
+        if not history:
+            self._history[bucket].pop(key, None)
+
+    def create_bucket(self, Bucket: str, **kwargs) -> Dict:
+        self._count('CreateBucket')
+        with self._lock:
+            self._buckets.setdefault(Bucket, {})
+            self._history.setdefault(Bucket, {})
+        return {'Location': f"/{Bucket}"}
+
+    def put_bucket_versioning(self, Bucket: str, VersioningConfiguration: Dict, **kwargs) -> Dict:
+        self._count('PutBucketVersioning')
+        with self._lock:
+            self._bucket(Bucket, 'PutBucketVersioning')
+            self._versioned[Bucket] = VersioningConfiguration.get('Status') == 'Enabled'
+        return {}
+
+    def put_object(self, Bucket: str, Key: str, Body=b'', Metadata: Optional[Dict] = None, **kwargs) -> Dict:
+        self._count('PutObject')
+        data = Body.encode('utf-8') if isinstance(Body, str) else (Body.read() if hasattr(Body, 'read') else Body)
+        with self._lock:
+            self._store(Bucket, Key, data, Metadata, 'PutObject')
+        return {'ETag': f'"{hashlib.md5(bytes(data)).hexdigest()}"'}
+
+    def upload_file(self, Filename: str, Bucket: str, Key: str, ExtraArgs: Optional[Dict] = None,
+                    Callback: Optional[Callable[[int], None]] = None, Config=None) -> None:
+        """Managed transfer: multipart in Config.multipart_chunksize parts above Config.multipart_threshold"""
+        threshold = Config.multipart_threshold if Config else 8 * 1024 * 1024
+        part_size = Config.multipart_chunksize if Config else 8 * 1024 * 1024
+        extra_args = ExtraArgs or {}
+        with open(Filename, 'rb') as f:
+            data = f.read()
+        if len(data) < threshold:
+            self.put_object(Bucket=Bucket, Key=Key, Body=data, Metadata=extra_args.get('Metadata'))
+            if Callback:
+                Callback(len(data))
+            return
+
+        self._count('CreateMultipartUpload')
+        with self._lock:
+            self._bucket(Bucket, 'CreateMultipartUpload')
+        for start in range(0, len(data), part_size):
+            self._count('UploadPart')
+            if Callback:
+                Callback(len(data[start:start + part_size]))
+        self._count('CompleteMultipartUpload')
+        with self._lock:
+            self._store(Bucket, Key, data, extra_args.get('Metadata'), 'CompleteMultipartUpload')
+
+    def get_object(self, Bucket: str, Key: str, **kwargs) -> Dict:
+        self._count('GetObject')
+        with self._lock:
+            obj = self._bucket(Bucket, 'GetObject').get(Key)
+        if obj is None:
+            raise self._error(NoSuchKey, 'NoSuchKey', f"Key {Key} does not exist", 'GetObject')
+        return {
+            'Body': StreamingBody(io.BytesIO(obj['Body']), len(obj['Body'])),
+            'ContentLength': len(obj['Body']),
+            'Metadata': dict(obj['Metadata']),
+        }
+
+    def head_object(self, Bucket: str, Key: str, **kwargs) -> Dict:
+        self._count('HeadObject')
+        with self._lock:
+            obj = self._bucket(Bucket, 'HeadObject').get(Key)
+        if obj is None:
+            raise self._error(ClientError, '404', 'Not Found', 'HeadObject')
+        return {'ContentLength': len(obj['Body']), 'Metadata': dict(obj['Metadata'])}
+
+    def list_objects_v2(self, Bucket: str, Prefix: str = '', ContinuationToken: Optional[str] = None,
+                        MaxKeys: Optional[int] = None, **kwargs) -> Dict:
+        self._count('ListObjectsV2')
+        with self._lock:
+            keys = sorted(key for key in self._bucket(Bucket, 'ListObjectsV2') if key.startswith(Prefix))
+            objects = self._buckets[Bucket]
+            start = int(ContinuationToken or 0)
+            limit = MaxKeys or self.page_size
+            page_keys = keys[start:start + limit]
+            page = {
+                'KeyCount': len(page_keys),
+                'IsTruncated': start + limit < len(keys),
+            }
+            if page_keys:
+                page['Contents'] = [{'Key': key, 'Size': len(objects[key]['Body'])} for key in page_keys]
+            if page['IsTruncated']:
+                page['NextContinuationToken'] = str(start + limit)
+        return page
+
+    def list_object_versions(self, Bucket: str, Prefix: str = '', KeyMarker: Optional[str] = None,
+                             VersionIdMarker: Optional[str] = None, MaxKeys: Optional[int] = None,
+                             **kwargs) -> Dict:
+        self._count('ListObjectVersions')
+
+        def order(entry_key: str, version_id: str):
+            # Keys ascending, newest version first; 'null' versions predate versioning
+            return entry_key, -int(version_id) if version_id != 'null' else 0
+
+        with self._lock:
+            objects = self._bucket(Bucket, 'ListObjectVersions')
+            history = self._history[Bucket]
+            entries = []
+            for key in sorted(set(objects) | set(history)):
+                if not key.startswith(Prefix):
+                    continue
+                chain = history.get(key, []) + ([objects[key]] if key in objects else [])
+                for position, entry in enumerate(reversed(chain)):
+                    entries.append((key, entry, position == 0))
+            if KeyMarker is not None and VersionIdMarker is not None:
+                marker = order(KeyMarker, VersionIdMarker)
+                entries = [item for item in entries if order(item[0], item[1]['VersionId']) > marker]
+            elif KeyMarker is not None:
+                entries = [item for item in entries if item[0] > KeyMarker]
+
+            limit = MaxKeys or self.page_size
+            page_entries = entries[:limit]
+            versions = [
+                {'Key': key, 'VersionId': entry['VersionId'], 'IsLatest': latest, 'Size': len(entry['Body'])}
+                for key, entry, latest in page_entries if not entry.get('IsDeleteMarker')
+            ]
+            markers = [
+                {'Key': key, 'VersionId': entry['VersionId'], 'IsLatest': latest}
+                for key, entry, latest in page_entries if entry.get('IsDeleteMarker')
+            ]
+        page = {'IsTruncated': len(entries) > limit}
+        if versions:
+            page['Versions'] = versions
+        if markers:
+            page['DeleteMarkers'] = markers
+        if page['IsTruncated']:
+            last_key, last_entry, _ = page_entries[-1]
+            page['NextKeyMarker'] = last_key
+            page['NextVersionIdMarker'] = last_entry['VersionId']
+        return page
+
+    def get_paginator(self, operation_name: str) -> _Paginator:
+        return _Paginator(getattr(self, operation_name))
+
+    def delete_objects(self, Bucket: str, Delete: Dict, **kwargs) -> Dict:
+        self._count('DeleteObjects')
+        if len(Delete['Objects']) > 1000:
+            raise self._error(ClientError, 'MalformedXML', 'At most 1000 keys can be deleted per request',
+                              'DeleteObjects')
+        with self._lock:
+            objects = self._bucket(Bucket, 'DeleteObjects')
+            deleted = []
+            for item in Delete['Objects']:
+                key = item['Key']
+                if item.get('VersionId') is not None:
+                    self._delete_version(Bucket, key, item['VersionId'])
+                    deleted.append({'Key': key, 'VersionId': item['VersionId']})
+                elif self._versioned.get(Bucket):
+                    if key in objects:
+                        self._history[Bucket].setdefault(key, []).append(objects.pop(key))
+                    marker_id = self._new_version_id(Bucket)
+                    self._history[Bucket].setdefault(key, []).append({'VersionId': marker_id, 'IsDeleteMarker': True})
+                    deleted.append({'Key': key, 'DeleteMarker': True, 'DeleteMarkerVersionId': marker_id})
+                else:
+                    objects.pop(key, None)
+                    deleted.append({'Key': key})
+        # Quiet mode only reports errors
+        return {} if Delete.get('Quiet') else {'Deleted': deleted}
+
+    def delete_bucket(self, Bucket: str, **kwargs) -> Dict:
+        self._count('DeleteBucket')
+        with self._lock:
+            if self._bucket(Bucket, 'DeleteBucket') or self._history[Bucket]:
+                raise self._error(ClientError, 'BucketNotEmpty', 'The bucket you tried to delete is not empty',
+                                  'DeleteBucket')
+            del self._buckets[Bucket]
+            del self._history[Bucket]
+            self._versioned.pop(Bucket, None)
+        return {}
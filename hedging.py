@@ -0,0 +1,139 @@
+# File: multilingual-support/hedging.py
+
+import threading
+import time
+from collections import defaultdict, deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, Optional
+from config import HEDGING_CONFIG
+from resilience import TokenBucket
+
+
+class LatencyTracker:
+    def __init__(self, window: int = HEDGING_CONFIG['window']):
+        """Recent successful call latencies per key, e.g. per adapter"""
+        self.window = window
+        self._samples: Dict[str, deque] = defaultdict(lambda: deque(maxlen=self.window))
+        self._lock = threading.Lock()
+
+    def record(self, key: str, seconds: float):
+        with self._lock:
+            self._samples[key].append(seconds)
+
+    def count(self, key: str) -> int:
+        with self._lock:
+            return len(self._samples.get(key, ()))
+
+    def quantile(self, key: str, q: float) -> Optional[float]:
+        """Latency quantile for key in seconds, or None without samples"""
+        with self._lock:
+            samples = sorted(self._samples.get(key, ()))
+        if not samples:
+            return None
+        return samples[min(len(samples) - 1, int(q * len(samples)))]
+
+
+class HedgedInvoker:
+    def __init__(self,
+                 quantile: float = HEDGING_CONFIG['quantile'],
+                 min_delay: float = HEDGING_CONFIG['min_delay_seconds'],
+                 min_samples: int = HEDGING_CONFIG['min_samples'],
+                 max_hedge_ratio: float = HEDGING_CONFIG['max_hedge_ratio'],
+                 max_workers: int = HEDGING_CONFIG['max_workers'],
+                 tracker: Optional[LatencyTracker] = None):
+        """
+        Sends a duplicate call when the first one is slower than usual
+
+        The hedge delay is the observed latency quantile for the call's key.
+        Whichever call succeeds first wins; the other keeps running in the
+        background and its result is dropped. Hedges draw from a budget that
+        gains max_hedge_ratio tokens per call, so they can never exceed that
+        fraction of the calls made through this invoker.
+
+        Args:
+            quantile (float): Latency quantile used as the hedge delay
+            min_delay (float): Lower bound on the hedge delay, in seconds
+            min_samples (int): Samples needed for a key before it is hedged
+            max_hedge_ratio (float): Maximum hedges per call made through this invoker; each
+                LoraAdapterManager has its own
+            max_workers (int): Threads running primary and hedge calls
+            tracker (LatencyTracker, optional): Shared latency history
+        """
+        self.quantile = quantile
+        self.min_delay = min_delay
+        self.min_samples = min_samples
+        self.max_hedge_ratio = max_hedge_ratio
+        self.tracker = tracker or LatencyTracker()
+        self._budget = TokenBucket(rate=0, capacity=max(1.0, max_hedge_ratio * 10))
+        self._budget.try_acquire(self._budget.capacity)  # Start empty; hedges are earned by traffic
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='hedge')
+        self._lock = threading.Lock()
+        self._counters = {
+            'calls': 0,
+            'hedges_sent': 0,
+            'hedge_wins': 0,
+            'primary_wins': 0,
+            'budget_denied': 0,
+        }
+
+    def _count(self, counter: str):
+        with self._lock:
+            self._counters[counter] += 1
+
+    def hedge_delay(self, key: str) -> Optional[float]:
+        """Seconds to wait before hedging a call for key, or None when there is too little history"""
+        if self.tracker.count(key) < self.min_samples:
+            return None
+        return max(self.min_delay, self.tracker.quantile(key, self.quantile))
+
+    def _timed(self, key: str, fn: Callable[[], Any]) -> Any:
+        start = time.monotonic()
+        result = fn()
+        self.tracker.record(key, time.monotonic() - start)
+        return result
+
+    def call(self, key: str, fn: Callable[[], Any]) -> Any:
+        """
+        Run fn, hedging it with a second call if it is slow
+
+        Args:
+            key (str): Latency history to use, e.g. the adapter name
+            fn (Callable): The call to run; must be safe to run twice
+
+        Returns:
+            Any: The first successful result; if every attempt fails, the primary's exception
+        """
+        self._count('calls')
+        self._budget.deposit(self.max_hedge_ratio)
+
+        delay = self.hedge_delay(key)
+        if delay is None:
+            return self._timed(key, fn)
+
+        primary = self._executor.submit(self._timed, key, fn)
+        done, _ = wait([primary], timeout=delay)
+        if done or not self._budget.try_acquire():
+            if not done:
+                self._count('budget_denied')
+            result = primary.result()
+            self._count('primary_wins')
+            return result
+
+        hedge = self._executor.submit(self._timed, key, fn)
+        self._count('hedges_sent')
+
+        pending = {primary, hedge}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    self._count('hedge_wins' if future is hedge else 'primary_wins')
+                    return future.result()
+        return primary.result()
+
+    def stats(self) -> Dict:
+        """Hedge counters; hedge_wins / hedges_sent shows whether the delay is well tuned"""
+        with self._lock:
+            counters = dict(self._counters)
+        counters['hedge_rate'] = counters['hedges_sent'] / counters['calls'] if counters['calls'] else 0.0
+        return counters
@@ -1,69 +1,92 @@
 # File: multilingual-support/inference_handler.py
 
-from typing import Dict, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterator, List, Optional, Tuple, Union
 from adapter_manager import LoraAdapterManager
+from adapter_scheduler import AdapterAffinityScheduler
+from config import SAGEMAKER_CONFIG, SCHEDULER_CONFIG, SEMANTIC_CACHE_CONFIG
+from deadline import Deadline, DeadlineExceeded
+from language_id import get_default_detector
 from logger import setup_logger
+from semantic_cache import SemanticCache
 import json
 
 logger = setup_logger('inference_handler')
 
 class CustomerSupportInference:
-    def __init__(self):
-        """Initialize the customer support inference handler"""
-        self.adapter_manager = LoraAdapterManager()
+    def __init__(self, adapter_manager: Optional[LoraAdapterManager] = None,
+                 semantic_cache: Optional[SemanticCache] = None):
+        """
+        Initialize the customer support inference handler
+
+        Responses are served from adapter_manager.response_cache when caching is
+        enabled, since the cache key needs the detected adapter. The semantic
+        cache, when given or enabled in SEMANTIC_CACHE_CONFIG, is checked first
+        and also answers paraphrases of earlier queries.
+        """
+        self.adapter_manager = adapter_manager or LoraAdapterManager()
+        self.detector = get_default_detector()
+        self.metrics = self.adapter_manager.metrics
+        if semantic_cache is None and SEMANTIC_CACHE_CONFIG['enabled']:
+            semantic_cache = SemanticCache(metrics=self.metrics)
+        self.semantic_cache = semantic_cache
+        self.scheduler = AdapterAffinityScheduler(self.adapter_manager) if SCHEDULER_CONFIG['enabled'] else None
         
     def _detect_language_and_domain(self, query: str) -> Tuple[str, str]:
         """
-        Simple language and domain detection
-        In a production system, you'd want to use a proper language detection model
+        Language from the n-gram language model when one is trained, domain
+        from weighted keyword markers
         """
-        # Simplified language detection based on common words
-        language_markers = {
-            'spanish': ['hola', 'gracias', 'por favor'],
-            'french': ['bonjour', 'merci', 'sil vous plait'],
-            'russian': ['привет', 'спасибо', 'пожалуйста']
-        }
-        
-        # Simplified domain detection based on keywords
-        domain_markers = {
-            'technical': ['error', 'broken', 'not working', 'failed'],
-            'billing': ['payment', 'charge', 'invoice', 'cost'],
-            'product': ['features', 'specifications', 'compatibility']
-        }
-        
-        # Detect language (defaulting to Spanish if uncertain)
-        query_lower = query.lower()
-        detected_language = 'spanish'
-        detected_domain = 'technical'
-        
-        for lang, markers in language_markers.items():
-            if any(marker in query_lower for marker in markers):
-                detected_language = lang
-                break
-                
-        for domain, markers in domain_markers.items():
-            if any(marker in query_lower for marker in markers):
-                detected_domain = domain
-                break
-                
-        return detected_language, detected_domain
+        detection = self.detector.detect(query)
+        return detection['language'], detection['domain']
 
-    def process_query(self, customer_query: str) -> Dict:
+    def process_query(self, customer_query: str, deadline: Optional[Union[float, Deadline]] = None) -> Dict:
         """
         Process a customer query and return the response
+
+        Args:
+            customer_query (str): The customer's message
+            deadline (float or Deadline, optional): Seconds the caller can wait, or a
+                Deadline shared with other work; when it runs out the result has
+                status 'deadline_exceeded'
         """
+        deadline = Deadline.coerce(deadline)
+        language = domain = None
         try:
-            # Detect language and domain
-            language, domain = self._detect_language_and_domain(customer_query)
-            logger.info(f"Detected language: {language}, domain: {domain}")
-            
-            # Get response using appropriate adapters
-            response = self.adapter_manager.invoke_model(
-                input_text=customer_query,
-                language=language,
-                domain=domain
-            )
-            
+            with self.metrics.stage('process_query') as request_timer:
+                if deadline is not None:
+                    deadline.check('detect')
+                # Detect language and domain
+                with self.metrics.stage('detect') as timer:
+                    language, domain = self._detect_language_and_domain(customer_query)
+                    timer.tag(language=language, domain=domain)
+                request_timer.tag(language=language, domain=domain)
+                logger.info("Detected language: %s, domain: %s", language, domain, extra={'per_request': True})
+
+                cached = None
+                if self.semantic_cache is not None:
+                    adapter_name = self.adapter_manager._adapter_name(language, domain)
+                    with self.metrics.stage('semantic_cache_lookup'):
+                        cached = self.semantic_cache.get(adapter_name, customer_query)
+
+                if cached is not None:
+                    response, similarity = cached
+                    logger.info("Semantic cache hit (similarity %.3f)", similarity, extra={'per_request': True})
+                else:
+                    # Get response using appropriate adapters
+                    invoke = self.scheduler.invoke if self.scheduler is not None else self.adapter_manager.invoke_model
+                    response = invoke(
+                        input_text=customer_query,
+                        language=language,
+                        domain=domain,
+                        deadline=deadline
+                    )
+                    # Same rules as the response cache: no sampled or deadline-shortened answers
+                    if (self.semantic_cache is not None
+                            and self.semantic_cache.should_cache(self.adapter_manager.GENERATION_PARAMETERS)
+                            and not (deadline is not None and deadline.tokens_reduced)):
+                        self.semantic_cache.put(adapter_name, customer_query, response)
+
             return {
                 'status': 'success',
                 'language': language,
@@ -72,9 +95,50 @@ class CustomerSupportInference:
                 'response': response
             }
             
+        except DeadlineExceeded as e:
+            logger.warning(f"Deadline exceeded processing query: {str(e)}")
+            return {
+                'status': 'deadline_exceeded',
+                'language': language,
+                'domain': domain,
+                'error_message': str(e),
+                'stage': e.stage,
+                'budget_seconds': deadline.budget_seconds if deadline is not None else None,
+                'elapsed_seconds': deadline.elapsed() if deadline is not None else None
+            }
+
         except Exception as e:
             logger.error(f"Error processing query: {str(e)}")
             return {
                 'status': 'error',
+                'language': language,
+                'domain': domain,
                 'error_message': str(e)
-            }
\ No newline at end of file
+            }
+
+    def process_query_stream(self, customer_query: str) -> Iterator[str]:
+        """
+        Process a customer query and yield the response tokens as they are generated
+        """
+        language, domain = self._detect_language_and_domain(customer_query)
+        logger.info("Detected language: %s, domain: %s", language, domain, extra={'per_request': True})
+
+        yield from self.adapter_manager.invoke_model_stream(
+            input_text=customer_query,
+            language=language,
+            domain=domain
+        )
+
+    def process_queries(self, customer_queries: List[str], max_workers: Optional[int] = None) -> List[Dict]:
+        """
+        Process many customer queries concurrently
+
+        Results are returned in input order; each one has the same shape as
+        process_query, so a failed query does not affect the others
+        """
+        if not customer_queries:
+            return []
+
+        max_workers = max_workers or SAGEMAKER_CONFIG['max_concurrent_invocations']
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(customer_queries))) as executor:
+            return list(executor.map(self.process_query, customer_queries))
@@ -0,0 +1,125 @@
+# File: multilingual-support/keyword_matcher.py
+
+import re
+from functools import lru_cache
+from typing import Dict, Iterable, List, Mapping, Tuple
+from config import DETECTION_CONFIG
+
+
+def _trie_pattern(markers: Iterable[str]) -> str:
+    """
+    Regex matching any of markers, with shared prefixes factored out
+
+    Optional suffixes are greedy, so the longest marker at a position wins,
+    e.g. 'not working' over 'not'.
+    """
+    trie: Dict = {}
+    for marker in markers:
+        node = trie
+        for char in marker:
+            node = node.setdefault(char, {})
+        node[''] = True
+
+    def emit(node: Dict) -> str:
+        terminal = '' in node
+        branches = [re.escape(char) + emit(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ''
+        body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+        if terminal:
+            return ('(?:' + body + ')?') if len(branches) == 1 else body + '?'
+        return body
+
+    return emit(trie)
+
+
+class KeywordMatcher:
+    def __init__(self,
+                 language_markers: Mapping[str, Mapping[str, float]],
+                 domain_markers: Mapping[str, Mapping[str, float]],
+                 default_language: str,
+                 default_domain: str):
+        """
+        Language and domain detection from weighted keyword markers
+
+        All markers are compiled once into a single regex whose alternation is
+        factored as a prefix trie, so a query is scanned in one pass and each
+        position only tries the markers sharing its next characters. Every
+        match adds its weight to its language or domain; the best score wins
+        and ties go to the label listed first.
+
+        Args:
+            language_markers (Mapping): {language: {marker: weight}}
+            domain_markers (Mapping): {domain: {marker: weight}}
+            default_language (str): Used when no language marker matches
+            default_domain (str): Used when no domain marker matches
+        """
+        self.default_language = default_language
+        self.default_domain = default_domain
+        self._languages = list(language_markers)
+        self._domains = list(domain_markers)
+
+        # marker -> list of (is_language, label, weight); a marker may count for several labels
+        self._marker_targets: Dict[str, List[Tuple[bool, str, float]]] = {}
+        for is_language, groups in ((True, language_markers), (False, domain_markers)):
+            for label, markers in groups.items():
+                for marker, weight in markers.items():
+                    self._marker_targets.setdefault(marker.casefold(), []).append((is_language, label, weight))
+
+        self._pattern = re.compile(_trie_pattern(self._marker_targets)) if self._marker_targets else None
+
+    @classmethod
+    def from_config(cls, config: Mapping = DETECTION_CONFIG) -> 'KeywordMatcher':
+        return cls(config['language_markers'], config['domain_markers'],
+                   config['default_language'], config['default_domain'])
+
+    def scores(self, text: str) -> Tuple[Dict[str, float], Dict[str, float]]:
+        """Weighted marker scores per language and per domain"""
+        language_scores = dict.fromkeys(self._languages, 0.0)
+        domain_scores = dict.fromkeys(self._domains, 0.0)
+        if self._pattern is not None:
+            for match in self._pattern.finditer(text.casefold()):
+                for is_language, label, weight in self._marker_targets[match.group()]:
+                    if is_language:
+                        language_scores[label] += weight
+                    else:
+                        domain_scores[label] += weight
+        return language_scores, domain_scores
+
+    @staticmethod
+    def _best(scores: Dict[str, float], default: str) -> Tuple[str, float]:
+        total = sum(scores.values())
+        if total <= 0:
+            return default, 0.0
+        best = max(scores, key=scores.get)  # first label wins ties
+        return best, scores[best] / total
+
+    def detect(self, text: str) -> Dict:
+        """
+        Detect language and domain for one query
+
+        Returns:
+            Dict: language, domain, their confidences (share of the matched
+            weight, 0.0 when falling back to the default) and the raw scores
+        """
+        language_scores, domain_scores = self.scores(text)
+        language, language_confidence = self._best(language_scores, self.default_language)
+        domain, domain_confidence = self._best(domain_scores, self.default_domain)
+        return {
+            'language': language,
+            'domain': domain,
+            'language_confidence': language_confidence,
+            'domain_confidence': domain_confidence,
+            'language_scores': language_scores,
+            'domain_scores': domain_scores,
+        }
+
+    def detect_many(self, texts: Iterable[str]) -> List[Dict]:
+        """Detect language and domain for a batch of queries"""
+        return [self.detect(text) for text in texts]
+
+
+@lru_cache(maxsize=1)
+def get_default_matcher() -> KeywordMatcher:
+    """Matcher built from DETECTION_CONFIG, shared by the process"""
+    return KeywordMatcher.from_config()
@@ -0,0 +1,327 @@
+# File: multilingual-support/language_id.py
+
+import argparse
+import json
+import os
+import struct
+from collections import Counter
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+import numpy as np
+from config import ADAPTER_CONFIGS, LANGUAGE_ID_CONFIG
+from keyword_matcher import KeywordMatcher, get_default_matcher
+from logger import setup_logger
+
+logger = setup_logger('language_id')
+
+_MAGIC = b'NGLID\x00\x01\x00'
+_ALIGNMENT = 64
+_FNV_OFFSET = np.uint64(0xCBF29CE484222325)
+_FNV_PRIME = np.uint64(0x100000001B3)
+_MIX = np.uint64(0x9E3779B97F4A7C15)
+
+
+def hashed_ngrams(texts: Sequence[str], ngram_range: Tuple[int, int],
+                  n_features: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Hashed character n-grams for a batch of texts
+
+    The texts are casefolded, padded with a space on each side and hashed as
+    one array of code points, so no per-n-gram Python work is done. Windows
+    that straddle two texts are dropped.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: Row (text index) and feature bucket of every n-gram
+    """
+    if n_features < 2 or n_features & (n_features - 1):
+        raise ValueError(f"n_features must be a power of two, got {n_features}")
+    padded = [f" {text.casefold()} " for text in texts]
+    if not padded:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+
+    lengths = np.fromiter((len(text) for text in padded), dtype=np.int64, count=len(padded))
+    codes = np.frombuffer(''.join(padded).encode('utf-32-le'), dtype='<u4').astype(np.uint64)
+    row_of = np.repeat(np.arange(len(padded), dtype=np.int64), lengths)
+    shift = np.uint64(64 - (n_features.bit_length() - 1))
+
+    rows, buckets = [], []
+    min_n, max_n = ngram_range
+    for n in range(min_n, max_n + 1):
+        windows = codes.size - n + 1
+        if windows <= 0:
+            break
+        # FNV-1a over the window, seeded by n so equal strings of different lengths differ
+        h = np.full(windows, _FNV_OFFSET ^ np.uint64(n), dtype=np.uint64)
+        for k in range(n):
+            h = (h ^ codes[k:k + windows]) * _FNV_PRIME
+        within_text = row_of[:windows] == row_of[n - 1:n - 1 + windows]
+        rows.append(row_of[:windows][within_text])
+        buckets.append(((h[within_text] * _MIX) >> shift).astype(np.int64))
+    return np.concatenate(rows), np.concatenate(buckets)
+
+
+class NgramLanguageIdentifier:
+    def __init__(self, labels: List[str], weights: np.ndarray, log_priors: np.ndarray,
+                 ngram_range: Tuple[int, int] = LANGUAGE_ID_CONFIG['ngram_range']):
+        """
+        Multinomial naive Bayes over hashed character n-grams
+
+        Args:
+            labels (List[str]): Language of each weight column
+            weights (np.ndarray): (n_features, n_labels) log P(n-gram | language),
+                usually memory-mapped from a weights file
+            log_priors (np.ndarray): log P(language)
+            ngram_range (Tuple[int, int]): Smallest and largest n-gram length
+        """
+        self.labels = list(labels)
+        self.weights = weights
+        self.log_priors = np.asarray(log_priors, dtype=np.float64)
+        self.ngram_range = tuple(ngram_range)
+        self.n_features = weights.shape[0]
+
+    @classmethod
+    def train(cls, samples: Iterable[Tuple[str, str]], labels: Optional[List[str]] = None,
+              ngram_range: Tuple[int, int] = LANGUAGE_ID_CONFIG['ngram_range'],
+              n_features: int = LANGUAGE_ID_CONFIG['n_features'],
+              alpha: float = LANGUAGE_ID_CONFIG['alpha'],
+              chunk_size: int = 10000) -> 'NgramLanguageIdentifier':
+        """
+        Fit the model from (text, language) samples
+
+        Samples whose language is not in labels are skipped.
+
+        Args:
+            samples (Iterable): (text, language) pairs
+            labels (List[str], optional): Defaults to the languages in ADAPTER_CONFIGS
+            ngram_range (Tuple[int, int]): Smallest and largest n-gram length
+            n_features (int): Hashed feature buckets, a power of two
+            alpha (float): Additive smoothing
+            chunk_size (int): Samples hashed at once
+
+        Returns:
+            NgramLanguageIdentifier: The trained model
+        """
+        labels = list(labels or ADAPTER_CONFIGS['languages'])
+        label_index = {label: i for i, label in enumerate(labels)}
+        counts = np.zeros(n_features * len(labels), dtype=np.float64)
+        documents = np.zeros(len(labels), dtype=np.float64)
+        skipped = Counter()
+
+        def add_chunk(texts: List[str], targets: List[int]):
+            rows, buckets = hashed_ngrams(texts, ngram_range, n_features)
+            target_of_row = np.asarray(targets, dtype=np.int64)
+            counts[:] += np.bincount(buckets * len(labels) + target_of_row[rows], minlength=counts.size)
+            documents[:] += np.bincount(target_of_row, minlength=len(labels))
+
+        texts, targets = [], []
+        for text, language in samples:
+            if language not in label_index:
+                skipped[language] += 1
+                continue
+            texts.append(text)
+            targets.append(label_index[language])
+            if len(texts) >= chunk_size:
+                add_chunk(texts, targets)
+                texts, targets = [], []
+        if texts:
+            add_chunk(texts, targets)
+
+        if skipped:
+            logger.warning(f"Skipped samples with unknown languages: {dict(skipped)}")
+        missing = [label for label, count in zip(labels, documents) if count == 0]
+        if missing:
+            raise ValueError(f"No training samples for: {', '.join(missing)}")
+
+        counts = counts.reshape(n_features, len(labels))
+        weights = np.log((counts + alpha) / (counts.sum(axis=0) + alpha * n_features)).astype(np.float32)
+        log_priors = np.log(documents / documents.sum())
+        logger.info(f"Trained language model on {int(documents.sum())} samples for {', '.join(labels)}")
+        return cls(labels, weights, log_priors, ngram_range)
+
+    def log_scores(self, texts: Sequence[str]) -> np.ndarray:
+        """Unnormalized log posterior per text and language, shape (len(texts), len(labels))"""
+        rows, buckets = hashed_ngrams(texts, self.ngram_range, self.n_features)
+        gathered = np.asarray(self.weights[buckets], dtype=np.float64)
+        scores = np.tile(self.log_priors, (len(texts), 1))
+        for column in range(len(self.labels)):
+            scores[:, column] += np.bincount(rows, weights=gathered[:, column], minlength=len(texts))
+        return scores
+
+    def predict_proba(self, texts: Sequence[str]) -> np.ndarray:
+        """Posterior probability per text and language"""
+        scores = self.log_scores(texts)
+        scores -= scores.max(axis=1, keepdims=True)
+        probabilities = np.exp(scores)
+        return probabilities / probabilities.sum(axis=1, keepdims=True)
+
+    def predict(self, texts: Sequence[str]) -> List[Tuple[str, float]]:
+        """Most likely language and its probability for each text"""
+        probabilities = self.predict_proba(texts)
+        best = probabilities.argmax(axis=1)
+        return [(self.labels[i], float(row[i])) for i, row in zip(best, probabilities)]
+
+    def save(self, path: str):
+        """
+        Write the model as a JSON header followed by the raw float32 weights
+
+        The weights start on an aligned offset so load() can memory-map them.
+        """
+        header = json.dumps({
+            'labels': self.labels,
+            'ngram_range': list(self.ngram_range),
+            'n_features': self.n_features,
+            'log_priors': self.log_priors.tolist(),
+        }).encode('utf-8')
+        prefix_length = len(_MAGIC) + 4 + len(header)
+        padding = -prefix_length % _ALIGNMENT
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(_MAGIC)
+            f.write(struct.pack('<I', len(header)))
+            f.write(header)
+            f.write(b'\x00' * padding)
+            f.write(np.ascontiguousarray(self.weights, dtype='<f4').tobytes())
+        os.replace(tmp_path, path)
+        logger.info(f"Saved language model to {path}")
+
+    @classmethod
+    def load(cls, path: str, allowed_labels: Optional[Iterable[str]] = None) -> 'NgramLanguageIdentifier':
+        """
+        Open a saved model, memory-mapping its weights read-only
+
+        Every label must be a language with adapters, since detected languages
+        become part of the adapter name.
+
+        Args:
+            path (str): Model file written by save()
+            allowed_labels (Iterable[str], optional): Defaults to the languages in ADAPTER_CONFIGS
+        """
+        with open(path, 'rb') as f:
+            if f.read(len(_MAGIC)) != _MAGIC:
+                raise ValueError(f"{path} is not a language model file")
+            header_length, = struct.unpack('<I', f.read(4))
+            header = json.loads(f.read(header_length))
+        allowed = set(allowed_labels or ADAPTER_CONFIGS['languages'])
+        unknown = [label for label in header['labels'] if label not in allowed]
+        if unknown:
+            raise ValueError(f"{path} has languages without adapters: {', '.join(unknown)}")
+        prefix_length = len(_MAGIC) + 4 + header_length
+        offset = prefix_length + (-prefix_length % _ALIGNMENT)
+        weights = np.memmap(path, dtype='<f4', mode='r', offset=offset,
+                            shape=(header['n_features'], len(header['labels'])))
+        return cls(header['labels'], weights, np.array(header['log_priors']), tuple(header['ngram_range']))
+
+
+class LanguageDetector:
+    def __init__(self, language_model: NgramLanguageIdentifier, keyword_matcher: KeywordMatcher,
+                 min_confidence: float = LANGUAGE_ID_CONFIG['min_confidence']):
+        """
+        Language from the n-gram model, domain from the keyword markers
+
+        When the model is unsure (probability below min_confidence) the keyword
+        markers decide the language, as before. detect() returns the same
+        fields as KeywordMatcher.detect, plus language_source.
+
+        Args:
+            language_model (NgramLanguageIdentifier): Trained language model
+            keyword_matcher (KeywordMatcher): Domain detection and language fallback
+            min_confidence (float): Model probability needed to override the markers
+        """
+        self.language_model = language_model
+        self.keyword_matcher = keyword_matcher
+        self.min_confidence = min_confidence
+
+    def detect(self, text: str) -> Dict:
+        return self.detect_many([text])[0]
+
+    def detect_many(self, texts: Iterable[str]) -> List[Dict]:
+        """Detect language and domain for a batch, scoring all languages in one vectorized pass"""
+        texts = list(texts)
+        if not texts:
+            return []
+        results = []
+        for detection, (language, probability) in zip(self.keyword_matcher.detect_many(texts),
+                                                      self.language_model.predict(texts)):
+            if probability >= self.min_confidence:
+                detection['language'] = language
+                detection['language_confidence'] = probability
+                detection['language_source'] = 'model'
+            else:
+                detection['language_source'] = 'keywords'
+            results.append(detection)
+        return results
+
+
+@lru_cache(maxsize=1)
+def get_default_detector():
+    """
+    Detector used by CustomerSupportInference
+
+    Uses the model at LANGUAGE_ID_CONFIG['weights_path'] when it exists.
+    Otherwise a model is trained in memory from the bundled seed corpus at
+    LANGUAGE_ID_CONFIG['seed_samples_path'], and only when that is missing
+    too does language detection fall back to the keyword markers alone.
+    """
+    weights_path = LANGUAGE_ID_CONFIG['weights_path']
+    if os.path.exists(weights_path):
+        logger.info(f"Loading language model from {weights_path}")
+        return LanguageDetector(NgramLanguageIdentifier.load(weights_path), get_default_matcher())
+
+    seed_path = LANGUAGE_ID_CONFIG['seed_samples_path']
+    train_command = f"python language_id.py train <samples.jsonl> --output {weights_path}"
+    if os.path.exists(seed_path):
+        logger.warning(f"No language model at {weights_path}; training one from the seed corpus {seed_path}. "
+                       f"For better accuracy run: {train_command}")
+        return LanguageDetector(NgramLanguageIdentifier.train(_read_samples(seed_path)), get_default_matcher())
+
+    logger.error(f"No language model at {weights_path} and no seed corpus at {seed_path}; "
+                 f"LANGUAGE DETECTION USES KEYWORD MARKERS ONLY and misroutes queries without them. "
+                 f"Run: {train_command}")
+    return get_default_matcher()
+
+
+def _read_samples(path: str) -> Iterable[Tuple[str, str]]:
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                record = json.loads(line)
+                yield record['text'], record['language']
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Train or evaluate the n-gram language identifier")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    train_parser = subparsers.add_parser('train', help="Train from a JSONL file with 'text' and 'language' fields")
+    train_parser.add_argument('samples')
+    train_parser.add_argument('--output', default=LANGUAGE_ID_CONFIG['weights_path'])
+    train_parser.add_argument('--n-features', type=int, default=LANGUAGE_ID_CONFIG['n_features'])
+    train_parser.add_argument('--alpha', type=float, default=LANGUAGE_ID_CONFIG['alpha'])
+
+    evaluate_parser = subparsers.add_parser('evaluate', help="Report accuracy on a labelled JSONL file")
+    evaluate_parser.add_argument('samples')
+    evaluate_parser.add_argument('--model', default=LANGUAGE_ID_CONFIG['weights_path'])
+    args = parser.parse_args()
+
+    if args.command == 'train':
+        model = NgramLanguageIdentifier.train(_read_samples(args.samples), n_features=args.n_features,
+                                              alpha=args.alpha)
+        model.save(args.output)
+        return
+
+    model = NgramLanguageIdentifier.load(args.model)
+    texts, expected = zip(*_read_samples(args.samples))
+    predicted = [language for language, _ in model.predict(texts)]
+    correct = Counter(e for e, p in zip(expected, predicted) if e == p)
+    totals = Counter(expected)
+    report = {label: correct[label] / totals[label] for label in totals}
+    report['overall'] = sum(correct.values()) / len(expected)
+    logger.info(f"Accuracy on {args.samples}: {json.dumps(report, indent=2)}")
+
+
+if __name__ == "__main__":
+    main()
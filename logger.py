@@ -1,43 +1,182 @@
 # File: multilingual-support/logger.py
 
+import atexit
+import json
 import logging
+import logging.handlers
+import queue
+import random
 import sys
+import threading
 from pathlib import Path
 
 # Define logging config here instead of importing from config
 LOGGING_CONFIG = {
     'level': 'INFO',
     'format': '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    'file_path': 'logs/application.log'
+    'file_path': 'logs/application.log',
+    'json': False,                  # One JSON object per line instead of the text format
+    'rotation': 'size',             # 'size', 'time' or None
+    'max_bytes': 50 * 1024 * 1024,  # Used with size rotation
+    'when': 'midnight',             # Used with time rotation
+    'backup_count': 5,
+    'queue_size': 10000,            # Records beyond this are dropped rather than blocking callers
+    'request_sample_rate': 1.0,     # Fraction of per-request INFO lines kept
 }
 
+_STANDARD_RECORD_ATTRS = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime'}
+
+_setup_lock = threading.Lock()
+_log_queue = None
+_listener = None
+# The listener's handlers once it has stopped; records then bypass the queue
+_direct_handlers = None
+
+
+class JsonFormatter(logging.Formatter):
+    """Formats records as single-line JSON, including any fields passed via extra"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            'timestamp': self.formatTime(record),
+            'logger': record.name,
+            'level': record.levelname,
+            'message': record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _STANDARD_RECORD_ATTRS and key not in entry:
+                entry[key] = value
+        if record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class RequestSampleFilter(logging.Filter):
+    """Keeps a fraction of INFO records logged with extra={'per_request': True}"""
+
+    def __init__(self, rate: float):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if self.rate >= 1.0 or record.levelno != logging.INFO or not getattr(record, 'per_request', False):
+            return True
+        return random.random() < self.rate
+
+
+class _NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """Hands records to the listener thread without formatting them or blocking"""
+
+    dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Formatting happens on the listener thread; the stock prepare() would
+        # render the message here, on the caller's thread
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        handlers = _direct_handlers
+        if handlers is not None:
+            # Nobody reads the queue after shutdown, e.g. from later atexit hooks
+            for handler in handlers:
+                if record.levelno >= handler.level:
+                    handler.handle(record)
+            return
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            _NonBlockingQueueHandler.dropped += 1
+
+
+def _build_output_handlers():
+    if LOGGING_CONFIG['json']:
+        formatter = JsonFormatter()
+    else:
+        formatter = logging.Formatter(LOGGING_CONFIG['format'])
+
+    # Create console handler
+    console_handler = logging.StreamHandler(sys.stdout)
+    console_handler.setFormatter(formatter)
+
+    # Create file handler
+    log_file_path = Path(LOGGING_CONFIG['file_path'])
+    log_file_path.parent.mkdir(parents=True, exist_ok=True)
+
+    if LOGGING_CONFIG['rotation'] == 'size':
+        file_handler = logging.handlers.RotatingFileHandler(
+            log_file_path,
+            maxBytes=LOGGING_CONFIG['max_bytes'],
+            backupCount=LOGGING_CONFIG['backup_count'],
+            encoding='utf-8'
+        )
+    elif LOGGING_CONFIG['rotation'] == 'time':
+        file_handler = logging.handlers.TimedRotatingFileHandler(
+            log_file_path,
+            when=LOGGING_CONFIG['when'],
+            backupCount=LOGGING_CONFIG['backup_count'],
+            encoding='utf-8'
+        )
+    else:
+        file_handler = logging.FileHandler(log_file_path, encoding='utf-8')
+    file_handler.setFormatter(formatter)
+
+    return console_handler, file_handler
+
+
+def _ensure_listener():
+    """Start the shared background listener once per process; caller must hold _setup_lock"""
+    global _log_queue, _listener
+    if _listener is None and _direct_handlers is None:
+        _log_queue = queue.Queue(maxsize=LOGGING_CONFIG['queue_size'])
+        _listener = logging.handlers.QueueListener(_log_queue, *_build_output_handlers(), respect_handler_level=True)
+        _listener.start()
+        atexit.register(shutdown_logging)
+
+
+def shutdown_logging():
+    """
+    Flush queued records and stop the background listener
+
+    Records logged afterwards are written directly by the caller's thread.
+    The handlers stay open; logging's own atexit hook closes them.
+    """
+    global _listener, _direct_handlers
+    with _setup_lock:
+        if _listener is not None:
+            # Switch first, so nothing lands in the queue after the listener drained it
+            _direct_handlers = _listener.handlers
+            _listener.stop()
+            _listener = None
+
+
 def setup_logger(name: str) -> logging.Logger:
     """
     Sets up a logger with the specified configuration
-    
+
+    Records go through a bounded queue to one background thread that does the
+    formatting and I/O, so logging on the request path does not touch the
+    file. Calling this again for the same name returns the same logger
+    without adding handlers.
+
     Args:
         name (str): Name of the logger
-        
+
     Returns:
         logging.Logger: Configured logger instance
     """
     logger = logging.getLogger(name)
-    logger.setLevel(LOGGING_CONFIG['level'])
 
-    # Create formatter
-    formatter = logging.Formatter(LOGGING_CONFIG['format'])
+    with _setup_lock:
+        if getattr(logger, '_queue_configured', False):
+            return logger
 
-    # Create console handler
-    console_handler = logging.StreamHandler(sys.stdout)
-    console_handler.setFormatter(formatter)
-    logger.addHandler(console_handler)
+        _ensure_listener()
+        logger.setLevel(LOGGING_CONFIG['level'])
 
-    # Create file handler
-    log_file_path = Path(LOGGING_CONFIG['file_path'])
-    log_file_path.parent.mkdir(parents=True, exist_ok=True)
-    
-    file_handler = logging.FileHandler(log_file_path)
-    file_handler.setFormatter(formatter)
-    logger.addHandler(file_handler)
+        queue_handler = _NonBlockingQueueHandler(_log_queue)
+        if LOGGING_CONFIG['request_sample_rate'] < 1.0:
+            queue_handler.addFilter(RequestSampleFilter(LOGGING_CONFIG['request_sample_rate']))
+        logger.addHandler(queue_handler)
+        logger._queue_configured = True
 
-    return logger
\ No newline at end of file
+    return logger
@@ -0,0 +1,406 @@
+# File: multilingual-support/lora_compose.py
+
+import argparse
+import json
+import math
+import os
+import re
+import struct
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from config import ADAPTER_CONFIGS, COMPOSITION_CONFIG
+from logger import setup_logger
+
+logger = setup_logger('lora_compose')
+
+ADAPTER_CONFIG_FILE = 'adapter_config.json'
+ADAPTER_WEIGHTS_FILE = 'adapter_model.safetensors'
+REPORT_FILE = 'composition_report.json'
+
+# safetensors dtype -> little-endian numpy storage type; BF16 is kept as raw 16-bit words
+_DTYPES = {'F64': '<f8', 'F32': '<f4', 'F16': '<f2', 'BF16': '<u2'}
+_LORA_KEY = re.compile(r"^(?P<module>.+)\.lora_(?P<part>[AB])(?:\.[\w-]+)?\.weight$")
+
+
+def _bf16_to_float32(words: np.ndarray) -> np.ndarray:
+    return (words.astype(np.uint32) << 16).view(np.float32)
+
+
+def _float32_to_bf16(values: np.ndarray) -> np.ndarray:
+    """Round float32 to the nearest bfloat16, ties to even"""
+    bits = np.ascontiguousarray(values, dtype=np.float32).view(np.uint32)
+    rounded = bits + np.uint32(0x7FFF) + ((bits >> 16) & np.uint32(1))
+    return (rounded >> 16).astype('<u2')
+
+
+class SafetensorsReader:
+    def __init__(self, path: str):
+        """
+        Reads tensors from a .safetensors file on demand
+
+        Only the JSON header is parsed up front. Tensors are views of a
+        read-only memory map, so a layer is paged in when it is used and
+        released once it is no longer referenced.
+
+        Args:
+            path (str): The .safetensors file
+        """
+        with open(path, 'rb') as f:
+            (header_size,) = struct.unpack('<Q', f.read(8))
+            header = json.loads(f.read(header_size))
+        self.path = path
+        self.metadata = header.pop('__metadata__', None) or {}
+        self.entries: Dict[str, Dict] = header
+        data_start = 8 + header_size
+        if os.path.getsize(path) > data_start:
+            self._data = np.memmap(path, dtype=np.uint8, mode='r', offset=data_start)
+        else:
+            self._data = np.empty(0, dtype=np.uint8)
+
+    def dtype(self, name: str) -> str:
+        return self.entries[name]['dtype']
+
+    def shape(self, name: str) -> Tuple[int, ...]:
+        return tuple(self.entries[name]['shape'])
+
+    def get(self, name: str) -> np.ndarray:
+        """A tensor as a float32 array"""
+        entry = self.entries[name]
+        if entry['dtype'] not in _DTYPES:
+            raise ValueError(f"Unsupported dtype {entry['dtype']} for tensor {name}")
+        start, end = entry['data_offsets']
+        stored = self._data[start:end].view(_DTYPES[entry['dtype']]).reshape(entry['shape'])
+        if entry['dtype'] == 'BF16':
+            return _bf16_to_float32(stored)
+        return stored.astype(np.float32)
+
+
+class SafetensorsWriter:
+    def __init__(self, path: str, layout: Dict[str, Tuple[str, Tuple[int, ...]]],
+                 metadata: Optional[Dict[str, str]] = None):
+        """
+        Writes a .safetensors file one tensor at a time
+
+        The header holds every tensor's offset, so the layout is given up
+        front and the tensors are then written in that order; only one tensor
+        is ever held in memory.
+
+        Args:
+            path (str): The .safetensors file to create
+            layout (Dict[str, Tuple[str, Tuple[int, ...]]]): Tensor name -> (dtype, shape), in write order
+            metadata (Dict[str, str], optional): Stored as __metadata__
+        """
+        header = {'__metadata__': metadata} if metadata else {}
+        offset = 0
+        for name, (dtype, shape) in layout.items():
+            if dtype not in _DTYPES:
+                raise ValueError(f"Unsupported dtype {dtype} for tensor {name}")
+            size = math.prod(shape) * np.dtype(_DTYPES[dtype]).itemsize
+            header[name] = {'dtype': dtype, 'shape': list(shape), 'data_offsets': [offset, offset + size]}
+            offset += size
+        encoded = json.dumps(header, separators=(',', ':')).encode('utf-8')
+        # Pad with spaces so the data starts 8-byte aligned
+        encoded += b' ' * (-len(encoded) % 8)
+
+        self._pending = list(layout.items())
+        self._written = 0
+        self._file = open(path, 'wb')
+        self._file.write(struct.pack('<Q', len(encoded)))
+        self._file.write(encoded)
+
+    def write(self, name: str, values: np.ndarray):
+        """Write the next tensor of the layout"""
+        if self._written >= len(self._pending):
+            raise ValueError(f"Tensor {name} is not in the layout")
+        expected, (dtype, shape) = self._pending[self._written]
+        if name != expected or tuple(values.shape) != tuple(shape):
+            raise ValueError(f"Expected tensor {expected} {tuple(shape)}, got {name} {tuple(values.shape)}")
+        if dtype == 'BF16':
+            stored = _float32_to_bf16(values)
+        else:
+            stored = np.ascontiguousarray(values, dtype=_DTYPES[dtype])
+        self._file.write(stored.tobytes())
+        self._written += 1
+
+    def close(self):
+        self._file.close()
+        if self._written != len(self._pending):
+            raise ValueError(f"Only {self._written} of {len(self._pending)} tensors were written")
+
+    def __enter__(self) -> 'SafetensorsWriter':
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self._file.close()
+
+
+def _pattern_value(patterns: Dict, module: str, default):
+    """Value of PEFT's rank_pattern / alpha_pattern for a module"""
+    for key, value in patterns.items():
+        if re.match(rf"(.*\.)?{key}$", module):
+            return value
+    return default
+
+
+class LoraAdapter:
+    def __init__(self, path: str):
+        """
+        A PEFT LoRA adapter directory (adapter_config.json and adapter_model.safetensors)
+
+        Args:
+            path (str): The adapter directory
+        """
+        self.path = path
+        with open(os.path.join(path, ADAPTER_CONFIG_FILE), encoding='utf-8') as f:
+            self.config = json.load(f)
+        self.tensors = SafetensorsReader(os.path.join(path, ADAPTER_WEIGHTS_FILE))
+
+        self.modules: Dict[str, Dict[str, str]] = {}
+        self.other_tensors: List[str] = []
+        for name in self.tensors.entries:
+            match = _LORA_KEY.match(name)
+            if match:
+                self.modules.setdefault(match.group('module'), {})[match.group('part')] = name
+            else:
+                self.other_tensors.append(name)
+        incomplete = sorted(module for module, parts in self.modules.items() if len(parts) != 2)
+        if incomplete:
+            raise ValueError(f"{path}: modules without both lora_A and lora_B: {', '.join(incomplete)}")
+
+    def rank(self, module: str) -> int:
+        return self.tensors.shape(self.modules[module]['A'])[0]
+
+    def features(self, module: str) -> Tuple[int, int]:
+        """(out_features, in_features) of a module"""
+        return self.tensors.shape(self.modules[module]['B'])[0], self.tensors.shape(self.modules[module]['A'])[1]
+
+    def scaling(self, module: str) -> float:
+        """Factor PEFT applies to B @ A for a module"""
+        rank = self.rank(module)
+        alpha = _pattern_value(self.config.get('alpha_pattern') or {}, module,
+                               self.config.get('lora_alpha', rank))
+        if self.config.get('use_rslora'):
+            return alpha / math.sqrt(rank)
+        return alpha / rank
+
+    def factors(self, module: str) -> Tuple[np.ndarray, np.ndarray]:
+        """lora_A (rank x in) and lora_B (out x rank) of a module, as float32"""
+        parts = self.modules[module]
+        return self.tensors.get(parts['A']), self.tensors.get(parts['B'])
+
+
+def compose_module(terms: List[Tuple[np.ndarray, np.ndarray, float]],
+                   rank: int) -> Tuple[np.ndarray, np.ndarray, float]:
+    """
+    Re-factor sum(weight * B @ A) at a lower rank without forming the full update
+
+    The terms are stacked into one B (out x k) and A (k x in). QR of both
+    leaves a k x k core whose SVD gives the best rank-r approximation, so the
+    cost is linear in the layer size. The singular values are split evenly
+    between the new factors to keep both in fp16 range.
+
+    Args:
+        terms (List[Tuple[np.ndarray, np.ndarray, float]]): (lora_A, lora_B, weight) per adapter
+        rank (int): Rank of the result; padded with zeros where the update has a lower rank
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray, float]: New lora_A, lora_B and the relative
+        Frobenius error of the approximation
+    """
+    stacked_b = np.concatenate([weight * lora_b for _, lora_b, weight in terms], axis=1)
+    stacked_a = np.concatenate([lora_a for lora_a, _, _ in terms], axis=0)
+    q_b, r_b = np.linalg.qr(stacked_b)
+    q_a, r_a = np.linalg.qr(stacked_a.T)
+    u, s, vt = np.linalg.svd(r_b @ r_a.T, full_matrices=False)
+
+    kept = min(rank, len(s))
+    root = np.sqrt(s[:kept])
+    lora_b = np.zeros((stacked_b.shape[0], rank), dtype=np.float32)
+    lora_a = np.zeros((rank, stacked_a.shape[1]), dtype=np.float32)
+    lora_b[:, :kept] = q_b @ (u[:, :kept] * root)
+    lora_a[:kept] = (root[:, None] * vt[:kept]) @ q_a.T
+
+    energy = np.square(s.astype(np.float64))
+    total = float(energy.sum())
+    error = math.sqrt(float(energy[kept:].sum()) / total) if total > 0 else 0.0
+    return lora_a, lora_b, error
+
+
+def compose_adapters(language_dir: str, domain_dir: str, output_dir: str,
+                     language_weight: float = COMPOSITION_CONFIG['language_weight'],
+                     domain_weight: float = COMPOSITION_CONFIG['domain_weight'],
+                     rank: int = COMPOSITION_CONFIG['rank'],
+                     output_dtype: Optional[str] = COMPOSITION_CONFIG['output_dtype']) -> Dict:
+    """
+    Merge a language adapter and a domain adapter into one PEFT adapter
+
+    Each module's update is language_weight * language update + domain_weight
+    * domain update, truncated to rank with an SVD. Modules are processed one
+    at a time, so memory is bounded by the largest layer rather than the
+    adapters. The combined adapter carries lora_alpha = r, i.e. a scaling of 1.
+
+    Args:
+        language_dir (str): Language adapter directory
+        domain_dir (str): Domain adapter directory
+        output_dir (str): Where to write the combined adapter and its report
+        language_weight (float): Weight of the language adapter
+        domain_weight (float): Weight of the domain adapter
+        rank (int): Maximum rank of the combined adapter (the endpoint's max_lora_rank)
+        output_dtype (str, optional): 'F16', 'BF16' or 'F32'; the language adapter's dtype by default
+
+    Returns:
+        Dict: The composition report, also written to composition_report.json;
+        errors are measured before the cast to output_dtype
+    """
+    try:
+        language = LoraAdapter(language_dir)
+        domain = LoraAdapter(domain_dir)
+        base_models = {adapter.config.get('base_model_name_or_path') for adapter in (language, domain)} - {None}
+        if len(base_models) > 1:
+            raise ValueError(f"Adapters were trained on different base models: {', '.join(sorted(base_models))}")
+
+        sources = [(language, language_weight), (domain, domain_weight)]
+        modules = list(dict.fromkeys([*language.modules, *domain.modules]))
+        for module in modules:
+            shapes = {adapter.features(module) for adapter, _ in sources if module in adapter.modules}
+            if len(shapes) > 1:
+                raise ValueError(f"Module {module} has different shapes in the two adapters: {sorted(shapes)}")
+        if not modules:
+            raise ValueError("Neither adapter has LoRA weights")
+
+        def holders(module: str) -> List[LoraAdapter]:
+            return [adapter for adapter, _ in sources if module in adapter.modules]
+
+        def update_rank(module: str) -> int:
+            stacked = sum(adapter.rank(module) for adapter in holders(module))
+            return min(stacked, *holders(module)[0].features(module))
+
+        output_rank = min(rank, max(update_rank(module) for module in modules))
+        reference = holders(modules[0])[0]
+        dtype = output_dtype or reference.tensors.dtype(reference.modules[modules[0]]['A'])
+
+        layout = {}
+        for module in modules:
+            out_features, in_features = holders(module)[0].features(module)
+            layout[f"{module}.lora_A.weight"] = (dtype, (output_rank, in_features))
+            layout[f"{module}.lora_B.weight"] = (dtype, (out_features, output_rank))
+
+        skipped = language.other_tensors + domain.other_tensors
+        if skipped:
+            logger.warning(f"Skipping {len(skipped)} non-LoRA tensors: {', '.join(skipped)}")
+
+        os.makedirs(output_dir, exist_ok=True)
+        weights_path = os.path.join(output_dir, ADAPTER_WEIGHTS_FILE)
+        layers = []
+        with SafetensorsWriter(weights_path + '.tmp', layout, metadata={'format': 'pt'}) as writer:
+            for module in modules:
+                terms = []
+                for adapter, weight in sources:
+                    if module in adapter.modules:
+                        lora_a, lora_b = adapter.factors(module)
+                        terms.append((lora_a, lora_b, weight * adapter.scaling(module)))
+                lora_a, lora_b, error = compose_module(terms, output_rank)
+                writer.write(f"{module}.lora_A.weight", lora_a)
+                writer.write(f"{module}.lora_B.weight", lora_b)
+                layers.append({
+                    'module': module,
+                    'input_rank': sum(lora_a.shape[0] for lora_a, _, _ in terms),
+                    'relative_error': error,
+                })
+        os.replace(weights_path + '.tmp', weights_path)
+
+        config = dict(language.config)
+        config.update({
+            'peft_type': config.get('peft_type', 'LORA'),
+            'r': output_rank,
+            'lora_alpha': output_rank,
+            'use_rslora': False,
+            'rank_pattern': {},
+            'alpha_pattern': {},
+            'target_modules': sorted({module.rsplit('.', 1)[-1] for module in modules}),
+            'layers_to_transform': None,
+            'modules_to_save': None,
+        })
+        with open(os.path.join(output_dir, ADAPTER_CONFIG_FILE), 'w', encoding='utf-8') as f:
+            json.dump(config, f, indent=2)
+
+        errors = [layer['relative_error'] for layer in layers]
+        report = {
+            'language_adapter': language_dir,
+            'domain_adapter': domain_dir,
+            'output': output_dir,
+            'weights': {'language': language_weight, 'domain': domain_weight},
+            'rank': output_rank,
+            'dtype': dtype,
+            'max_relative_error': max(errors),
+            'mean_relative_error': sum(errors) / len(errors),
+            'skipped_tensors': skipped,
+            'layers': layers,
+        }
+        with open(os.path.join(output_dir, REPORT_FILE), 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+
+        logger.info(f"Composed {output_dir} at rank {output_rank}: "
+                    f"max relative error {report['max_relative_error']:.4f} over {len(layers)} modules")
+        return report
+
+    except Exception as e:
+        logger.error(f"Error composing {language_dir} and {domain_dir}: {str(e)}")
+        raise
+
+
+def compose_all(adapters_dir: str = COMPOSITION_CONFIG['adapters_dir'], **kwargs) -> List[Dict]:
+    """
+    Compose every language-domain pair found under the adapter layout of setup_s3.py
+
+    <adapters_dir>/spanish and <adapters_dir>/technical become
+    <adapters_dir>/es-technical-support, the adapter name _format_prompt uses.
+    """
+    reports = []
+    for language_key, language in ADAPTER_CONFIGS['languages'].items():
+        for domain_key, domain in ADAPTER_CONFIGS['domains'].items():
+            language_dir = os.path.join(adapters_dir, language_key)
+            domain_dir = os.path.join(adapters_dir, domain_key)
+            if not (os.path.isdir(language_dir) and os.path.isdir(domain_dir)):
+                logger.warning(f"Skipping {language['name']}-{domain}: {language_dir} or {domain_dir} is missing")
+                continue
+            output_dir = os.path.join(adapters_dir, f"{language['name']}-{domain}")
+            reports.append(compose_adapters(language_dir, domain_dir, output_dir, **kwargs))
+    return reports
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Merge a language and a domain LORA adapter into one adapter")
+    parser.add_argument('--language', help="Language adapter directory")
+    parser.add_argument('--domain', help="Domain adapter directory")
+    parser.add_argument('--output', help="Combined adapter directory")
+    parser.add_argument('--all', action='store_true',
+                        help="Compose every language-domain pair under --adapters-dir")
+    parser.add_argument('--adapters-dir', default=COMPOSITION_CONFIG['adapters_dir'])
+    parser.add_argument('--language-weight', type=float, default=COMPOSITION_CONFIG['language_weight'])
+    parser.add_argument('--domain-weight', type=float, default=COMPOSITION_CONFIG['domain_weight'])
+    parser.add_argument('--rank', type=int, default=COMPOSITION_CONFIG['rank'])
+    parser.add_argument('--dtype', choices=sorted(_DTYPES), default=COMPOSITION_CONFIG['output_dtype'])
+    args = parser.parse_args()
+
+    options = {
+        'language_weight': args.language_weight,
+        'domain_weight': args.domain_weight,
+        'rank': args.rank,
+        'output_dtype': args.dtype,
+    }
+    if args.all:
+        reports = compose_all(args.adapters_dir, **options)
+    elif args.language and args.domain and args.output:
+        reports = [compose_adapters(args.language, args.domain, args.output, **options)]
+    else:
+        parser.error("Pass --language, --domain and --output, or --all")
+    summary = [{key: value for key, value in report.items() if key != 'layers'} for report in reports]
+    logger.info(f"Composed adapters: {json.dumps(summary, indent=2)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,243 @@
+# File: multilingual-support/metrics.py
+
+import bisect
+import json
+import threading
+import time
+from typing import Dict, Iterable, Optional, Tuple
+from config import METRICS_CONFIG
+
+TagKey = Tuple[Tuple[str, str], ...]
+
+
+def _tag_key(tags: Dict) -> TagKey:
+    return tuple(sorted((key, str(value)) for key, value in tags.items()))
+
+
+class Histogram:
+    def __init__(self, bounds: Iterable[float]):
+        """Fixed-bucket histogram; bounds are inclusive upper limits, plus an implicit +Inf bucket"""
+        self.bounds = tuple(sorted(bounds))
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        index = bisect.bisect_left(self.bounds, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.count += 1
+            self.sum += value
+
+    def cumulative(self) -> Dict[str, int]:
+        """Cumulative counts keyed by upper bound, Prometheus style"""
+        with self._lock:
+            counts = list(self.counts)
+        result, running = {}, 0
+        for bound, bucket_count in zip(self.bounds + (float('inf'),), counts):
+            running += bucket_count
+            result['+Inf' if bound == float('inf') else _format_number(bound)] = running
+        return result
+
+
+class _StageTimer:
+    def __init__(self, registry: 'MetricsRegistry', name: str, tags: Dict):
+        self._registry = registry
+        self._name = name
+        self._tags = tags
+        self._start = 0.0
+
+    def tag(self, **tags):
+        """Add tags that are only known once the stage has run"""
+        self._tags.update(tags)
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._registry.observe(self._name, (time.perf_counter() - self._start) * 1000, **self._tags)
+        return False
+
+
+class _NullTimer:
+    """Shared no-op timer handed out while metrics are disabled"""
+
+    def tag(self, **tags):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class MetricsRegistry:
+    def __init__(self, enabled: bool = METRICS_CONFIG['enabled'],
+                 buckets_ms: Iterable[float] = METRICS_CONFIG['buckets_ms'],
+                 namespace: str = METRICS_CONFIG['namespace']):
+        """
+        In-process histograms and counters for the request path
+
+        Args:
+            enabled (bool): When False, timers are shared no-ops and nothing is recorded
+            buckets_ms (Iterable[float]): Histogram bucket upper bounds, in milliseconds
+            namespace (str): Prefix for exported Prometheus metric names
+        """
+        self.enabled = enabled
+        self.buckets_ms = tuple(buckets_ms)
+        self.namespace = namespace
+        self._histograms: Dict[Tuple[str, TagKey], Histogram] = {}
+        self._counters: Dict[Tuple[str, TagKey], float] = {}
+        self._gauges: Dict[Tuple[str, TagKey], float] = {}
+        self._lock = threading.Lock()
+
+    def timer(self, name: str, **tags):
+        """Context manager that records its elapsed time, in milliseconds, into histogram name"""
+        if not self.enabled:
+            return _NULL_TIMER
+        return _StageTimer(self, name, tags)
+
+    def stage(self, stage: str, **tags):
+        """Timer for one stage of the request path"""
+        if not self.enabled:
+            return _NULL_TIMER
+        return _StageTimer(self, 'stage_latency_ms', {'stage': stage, **tags})
+
+    def observe(self, name: str, value: float, **tags):
+        """Record a value into histogram name"""
+        if not self.enabled:
+            return
+        key = (name, _tag_key(tags))
+        histogram = self._histograms.get(key)
+        if histogram is None:
+            with self._lock:
+                histogram = self._histograms.setdefault(key, Histogram(self.buckets_ms))
+        histogram.observe(value)
+
+    def observe_with_buckets(self, name: str, value: float, buckets: Iterable[float], **tags):
+        """Record a value into a histogram that uses its own bucket bounds, e.g. batch sizes"""
+        if not self.enabled:
+            return
+        key = (name, _tag_key(tags))
+        histogram = self._histograms.get(key)
+        if histogram is None:
+            with self._lock:
+                histogram = self._histograms.setdefault(key, Histogram(buckets))
+        histogram.observe(value)
+
+    def increment(self, name: str, amount: float = 1, **tags):
+        """Add to counter name"""
+        if not self.enabled:
+            return
+        key = (name, _tag_key(tags))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    def set_gauge(self, name: str, value: float, **tags):
+        """Set gauge name to value"""
+        if not self.enabled:
+            return
+        with self._lock:
+            self._gauges[(name, _tag_key(tags))] = value
+
+    def counter_value(self, name: str, **tags) -> float:
+        with self._lock:
+            return self._counters.get((name, _tag_key(tags)), 0)
+
+    def counters(self, name: str) -> Dict[TagKey, float]:
+        """Every tag combination recorded for counter name"""
+        with self._lock:
+            return {tags: value for (metric, tags), value in self._counters.items() if metric == name}
+
+    def histogram(self, name: str, **tags) -> Optional[Histogram]:
+        return self._histograms.get((name, _tag_key(tags)))
+
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+            self._gauges.clear()
+
+    def snapshot(self) -> Dict:
+        """JSON-serializable view of every histogram, counter and gauge"""
+        with self._lock:
+            histograms = list(self._histograms.items())
+            counters = list(self._counters.items())
+            gauges = list(self._gauges.items())
+        return {
+            'histograms': [
+                {
+                    'name': name,
+                    'tags': dict(tags),
+                    'count': histogram.count,
+                    'sum': histogram.sum,
+                    'buckets': histogram.cumulative(),
+                }
+                for (name, tags), histogram in histograms
+            ],
+            'counters': [{'name': name, 'tags': dict(tags), 'value': value} for (name, tags), value in counters],
+            'gauges': [{'name': name, 'tags': dict(tags), 'value': value} for (name, tags), value in gauges],
+        }
+
+    def to_json(self) -> str:
+        return json.dumps(self.snapshot(), ensure_ascii=False)
+
+    def to_prometheus(self) -> str:
+        """Prometheus text exposition format"""
+        snapshot = self.snapshot()
+        lines = []
+        declared = set()
+
+        def declare(metric: str, metric_type: str):
+            if metric not in declared:
+                declared.add(metric)
+                lines.append(f"# TYPE {metric} {metric_type}")
+
+        for histogram in sorted(snapshot['histograms'], key=lambda h: h['name']):
+            metric = f"{self.namespace}_{histogram['name']}"
+            declare(metric, 'histogram')
+            for bound, count in histogram['buckets'].items():
+                lines.append(f"{metric}_bucket{_labels(histogram['tags'], le=bound)} {count}")
+            lines.append(f"{metric}_sum{_labels(histogram['tags'])} {_format_number(histogram['sum'])}")
+            lines.append(f"{metric}_count{_labels(histogram['tags'])} {histogram['count']}")
+
+        for counter in sorted(snapshot['counters'], key=lambda c: c['name']):
+            metric = f"{self.namespace}_{counter['name']}_total"
+            declare(metric, 'counter')
+            lines.append(f"{metric}{_labels(counter['tags'])} {_format_number(counter['value'])}")
+
+        for gauge in sorted(snapshot['gauges'], key=lambda g: g['name']):
+            metric = f"{self.namespace}_{gauge['name']}"
+            declare(metric, 'gauge')
+            lines.append(f"{metric}{_labels(gauge['tags'])} {_format_number(gauge['value'])}")
+
+        return '\n'.join(lines) + '\n'
+
+
+def _format_number(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+def _labels(tags: Dict, **extra) -> str:
+    merged = {**tags, **extra}
+    if not merged:
+        return ''
+    pairs = []
+    for key, value in sorted(merged.items()):
+        value = str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+        pairs.append(f'{key}="{value}"')
+    return '{' + ','.join(pairs) + '}'
+
+
+_REGISTRY = MetricsRegistry()
+
+
+def get_registry() -> MetricsRegistry:
+    """Process-wide registry shared by the request path"""
+    return _REGISTRY
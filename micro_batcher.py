@@ -0,0 +1,109 @@
+# File: multilingual-support/micro_batcher.py
+
+import json
+import threading
+from typing import Callable, Dict, List, Optional
+from config import BATCHING_CONFIG
+from metrics import Histogram, MetricsRegistry, get_registry
+
+
+class _Batch:
+    def __init__(self, parameters: Dict):
+        self.parameters = parameters
+        self.inputs: List[str] = []
+        self.full = threading.Event()
+        self.done = threading.Event()
+        self.results: Optional[List[str]] = None
+        self.error: Optional[BaseException] = None
+
+
+class MicroBatcher:
+    def __init__(self, send: Callable[[Dict], object],
+                 max_batch_size: int = BATCHING_CONFIG['max_batch_size'],
+                 max_wait_ms: float = BATCHING_CONFIG['max_wait_ms'],
+                 metrics: Optional[MetricsRegistry] = None):
+        """
+        Merge concurrent payloads with identical parameters into one multi-input payload
+
+        The first payload for a set of parameters (adapter included) opens a
+        batch and waits up to max_wait_ms, or until max_batch_size payloads
+        have joined, then sends it for everyone. A batch of one is sent as a
+        plain payload. No thread is needed besides the callers'.
+
+        Args:
+            send (Callable): Sends a payload and returns its generated text, or
+                one text per input when 'inputs' is a list
+            max_batch_size (int): Inputs per batched payload
+            max_wait_ms (float): How long the first caller waits for others to join
+            metrics (MetricsRegistry, optional): Receives the batch size histogram
+        """
+        self.send = send
+        self.max_batch_size = max_batch_size
+        self.max_wait_seconds = max_wait_ms / 1000
+        self.metrics = metrics or get_registry()
+        self._open: Dict[str, _Batch] = {}
+        self._lock = threading.Lock()
+        self._sizes = Histogram(BATCHING_CONFIG['size_buckets'])
+
+    def submit(self, payload: Dict) -> str:
+        """
+        Send a payload as part of a batch and return its own generated text
+
+        Args:
+            payload (Dict): Single-input payload with 'inputs' and 'parameters'
+
+        Returns:
+            str: The generated text for this payload's input
+        """
+        key = json.dumps(payload['parameters'], sort_keys=True)
+        with self._lock:
+            batch = self._open.get(key)
+            is_leader = batch is None
+            if is_leader:
+                batch = self._open[key] = _Batch(payload['parameters'])
+            index = len(batch.inputs)
+            batch.inputs.append(payload['inputs'])
+            if len(batch.inputs) >= self.max_batch_size:
+                del self._open[key]
+                batch.full.set()
+
+        if is_leader:
+            batch.full.wait(self.max_wait_seconds)
+            with self._lock:
+                if self._open.get(key) is batch:
+                    del self._open[key]
+            self._send(batch)
+        else:
+            batch.done.wait()
+
+        if batch.error is not None:
+            raise batch.error
+        return batch.results[index]
+
+    def _send(self, batch: _Batch):
+        size = len(batch.inputs)
+        self._sizes.observe(size)
+        self.metrics.observe_with_buckets('micro_batch_size', size, BATCHING_CONFIG['size_buckets'],
+                                          adapter=batch.parameters.get('adapter_name', ''))
+        try:
+            if size == 1:
+                batch.results = [self.send({'inputs': batch.inputs[0], 'parameters': batch.parameters})]
+            else:
+                results = self.send({'inputs': list(batch.inputs), 'parameters': batch.parameters})
+                if len(results) != size:
+                    raise ValueError(f"Batched payload of {size} inputs returned {len(results)} results")
+                batch.results = list(results)
+        except BaseException as e:
+            batch.error = e
+        finally:
+            batch.done.set()
+
+    def stats(self) -> Dict:
+        """Batches sent, inputs carried, mean batch size and the batch size distribution"""
+        batches = self._sizes.count
+        return {
+            'batches': batches,
+            'inputs': int(self._sizes.sum),
+            'mean_batch_size': self._sizes.sum / batches if batches else 0.0,
+            'batch_sizes': self._sizes.cumulative(),
+        }
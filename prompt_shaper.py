@@ -0,0 +1,211 @@
+# File: multilingual-support/prompt_shaper.py
+
+import re
+import threading
+from functools import lru_cache
+from typing import Dict, List, Optional
+from config import BASE_MODEL, PROMPT_CONFIG, SAGEMAKER_CONFIG
+from logger import setup_logger
+from metrics import MetricsRegistry, get_registry
+
+logger = setup_logger('prompt_shaper')
+
+
+class ApproximateTokenizer:
+    """
+    Regex tokenizer that approximates subword counts without loading a vocabulary
+
+    Words are split into chunks of about chars_per_token characters and every
+    punctuation mark is its own token; leading whitespace stays attached, so
+    decode(encode(text)) == text.
+    """
+    exact = False
+
+    def __init__(self, chars_per_token: float = PROMPT_CONFIG['approx_chars_per_token']):
+        chunk = max(1, round(chars_per_token))
+        self._pattern = re.compile(rf"\s*(?:\w{{1,{chunk}}}|[^\w\s])|\s+")
+
+    def encode(self, text: str) -> List[str]:
+        return self._pattern.findall(text)
+
+    def decode(self, tokens: List[str]) -> str:
+        return ''.join(tokens)
+
+
+class HuggingFaceTokenizer:
+    """Exact token counts from the base model's tokenizer"""
+    exact = True
+
+    def __init__(self, tokenizer):
+        self._tokenizer = tokenizer
+
+    def encode(self, text: str) -> List[int]:
+        return self._tokenizer.encode(text, add_special_tokens=False)
+
+    def decode(self, tokens: List[int]) -> str:
+        return self._tokenizer.decode(tokens)
+
+
+@lru_cache(maxsize=None)
+def get_tokenizer(kind: str = PROMPT_CONFIG['tokenizer'], model_id: str = BASE_MODEL['model_id']):
+    """
+    Tokenizer shared by the process
+
+    With kind 'auto' the base model's tokenizer is loaded through transformers,
+    which keeps it in the local Hugging Face cache; if transformers is missing
+    or the tokenizer cannot be loaded, approximate counts are used instead.
+    """
+    if kind == 'auto':
+        try:
+            from transformers import AutoTokenizer
+            tokenizer = HuggingFaceTokenizer(AutoTokenizer.from_pretrained(model_id))
+            logger.info(f"Loaded tokenizer for {model_id}")
+            return tokenizer
+        except ImportError:
+            logger.info("transformers is not installed; using approximate token counts")
+        except Exception as e:
+            logger.warning(f"Could not load tokenizer for {model_id}: {str(e)}; using approximate token counts")
+    return ApproximateTokenizer()
+
+
+def compact_text(text: str) -> str:
+    """
+    Shrink pasted logs without dropping content
+
+    Trailing spaces and runs of blank lines are removed, and runs of identical
+    consecutive lines are folded into one line with a repeat count.
+    """
+    lines = [line.rstrip() for line in text.strip().splitlines()]
+    compacted = []
+    i = 0
+    while i < len(lines):
+        j = i
+        while j + 1 < len(lines) and lines[j + 1] == lines[i]:
+            j += 1
+        repeats = j - i + 1
+        if not lines[i]:
+            if compacted and compacted[-1]:
+                compacted.append('')
+        elif repeats > 1:
+            compacted.append(f"{lines[i]} (repeated {repeats} times)")
+        else:
+            compacted.append(lines[i])
+        i = j + 1
+    return '\n'.join(compacted)
+
+
+class PromptShaper:
+    def __init__(self,
+                 tokenizer=None,
+                 max_input_tokens: int = int(SAGEMAKER_CONFIG['environment']['MAX_INPUT_LENGTH']),
+                 max_total_tokens: int = int(SAGEMAKER_CONFIG['environment']['MAX_TOTAL_TOKENS']),
+                 domain_budgets: Optional[Dict[str, int]] = None,
+                 default_max_new_tokens: int = PROMPT_CONFIG['default_max_new_tokens'],
+                 min_new_tokens: int = PROMPT_CONFIG['min_new_tokens'],
+                 head_ratio: float = PROMPT_CONFIG['truncation_head_ratio'],
+                 metrics: Optional[MetricsRegistry] = None):
+        """
+        Fit inputs into the container's token limits and size generations per domain
+
+        Over-long inputs are compacted and, if still too long, cut down to a
+        head and a tail joined by a truncation marker. max_new_tokens is the
+        domain's budget, capped so input plus generation fits max_total_tokens.
+        With approximate token counts only approx_safety_margin of the input
+        limit is used.
+
+        Args:
+            tokenizer (optional): Object with encode/decode and an exact flag; defaults to get_tokenizer()
+            max_input_tokens (int): Container MAX_INPUT_LENGTH
+            max_total_tokens (int): Container MAX_TOTAL_TOKENS
+            domain_budgets (Dict[str, int], optional): max_new_tokens per domain
+            default_max_new_tokens (int): Budget for unknown domains, and the baseline for tokens saved
+            min_new_tokens (int): Generation room always left after the input
+            head_ratio (float): Share of a truncated input kept from the start
+            metrics (MetricsRegistry, optional): Receives tokens-saved counters
+        """
+        self.tokenizer = tokenizer or get_tokenizer()
+        self.max_total_tokens = max_total_tokens
+        self.domain_budgets = domain_budgets or PROMPT_CONFIG['max_new_tokens']
+        self.default_max_new_tokens = default_max_new_tokens
+        self.min_new_tokens = min_new_tokens
+        self.head_ratio = head_ratio
+        self.metrics = metrics or get_registry()
+
+        input_limit = min(max_input_tokens, max_total_tokens - min_new_tokens)
+        if not self.tokenizer.exact:
+            input_limit = int(input_limit * PROMPT_CONFIG['approx_safety_margin'])
+        self.input_limit = input_limit
+        self._marker_tokens = self.tokenizer.encode(PROMPT_CONFIG['truncation_marker'])
+
+        self._lock = threading.Lock()
+        self._counters = {
+            'requests': 0,
+            'compacted': 0,
+            'truncated': 0,
+            'input_tokens_saved': 0,
+            'generation_tokens_saved': 0,
+        }
+
+    def count_tokens(self, text: str) -> int:
+        return len(self.tokenizer.encode(text))
+
+    def _truncate(self, tokens: List) -> str:
+        keep = max(0, self.input_limit - len(self._marker_tokens))
+        head = int(keep * self.head_ratio)
+        tail = keep - head
+        return (self.tokenizer.decode(tokens[:head]) + PROMPT_CONFIG['truncation_marker']
+                + (self.tokenizer.decode(tokens[-tail:]) if tail else ''))
+
+    def shape(self, text: str, domain: str) -> Dict:
+        """
+        Shape one input for the given domain
+
+        Returns:
+            Dict: inputs, max_new_tokens, input_tokens, original_input_tokens,
+            compacted, truncated and the tokens saved on input and generation
+        """
+        tokens = self.tokenizer.encode(text)
+        original_tokens = len(tokens)
+        inputs, compacted, truncated = text, False, False
+
+        if original_tokens > self.input_limit:
+            inputs = compact_text(text)
+            tokens = self.tokenizer.encode(inputs)
+            compacted = len(tokens) < original_tokens
+            if len(tokens) > self.input_limit:
+                inputs = self._truncate(tokens)
+                tokens = self.tokenizer.encode(inputs)
+                truncated = True
+
+        budget = self.domain_budgets.get(domain, self.default_max_new_tokens)
+        max_new_tokens = max(1, min(budget, self.max_total_tokens - len(tokens)))
+        input_saved = original_tokens - len(tokens)
+        generation_saved = max(0, self.default_max_new_tokens - max_new_tokens)
+
+        with self._lock:
+            self._counters['requests'] += 1
+            self._counters['compacted'] += compacted
+            self._counters['truncated'] += truncated
+            self._counters['input_tokens_saved'] += input_saved
+            self._counters['generation_tokens_saved'] += generation_saved
+        self.metrics.increment('prompt_tokens_saved', input_saved, domain=domain, kind='input')
+        self.metrics.increment('prompt_tokens_saved', generation_saved, domain=domain, kind='generation')
+        if truncated:
+            logger.warning(f"Truncated a {original_tokens}-token input to {len(tokens)} tokens")
+
+        return {
+            'inputs': inputs,
+            'max_new_tokens': max_new_tokens,
+            'input_tokens': len(tokens),
+            'original_input_tokens': original_tokens,
+            'compacted': compacted,
+            'truncated': truncated,
+            'input_tokens_saved': input_saved,
+            'generation_tokens_saved': generation_saved,
+            'tokens_saved': input_saved + generation_saved,
+        }
+
+    def stats(self) -> Dict:
+        """Totals across all shaped requests"""
+        with self._lock:
+            return dict(self._counters)
@@ -0,0 +1,217 @@
+# File: multilingual-support/resilience.py
+
+import random
+import threading
+import time
+from typing import Callable, Optional
+from botocore.exceptions import ClientError, ConnectionError as BotocoreConnectionError, ReadTimeoutError
+from config import CIRCUIT_BREAKER_CONFIG, RETRY_CONFIG
+
+THROTTLE_CODES = {'ThrottlingException', 'Throttling', 'TooManyRequestsException', 'RequestLimitExceeded'}
+TRANSIENT_CODES = {'ServiceUnavailable', 'InternalFailure', 'ModelNotReadyException', 'InternalServerError'}
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling the endpoint while the circuit breaker is open"""
+
+
+class TokenBucket:
+    def __init__(self, rate: float, capacity: float, clock: Callable[[], float] = time.monotonic):
+        """
+        Token bucket refilled continuously at rate tokens per second
+
+        Args:
+            rate (float): Tokens added per second
+            capacity (float): Maximum tokens held; also the initial fill
+            clock (Callable): Monotonic time source
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self._clock = clock
+        self._tokens = capacity
+        self._updated_at = clock()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = self._clock()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.rate)
+        self._updated_at = now
+
+    def deposit(self, tokens: float):
+        """Add tokens outside of the time-based refill"""
+        with self._lock:
+            self._refill()
+            self._tokens = min(self.capacity, self._tokens + tokens)
+
+    def try_acquire(self, tokens: float = 1.0) -> bool:
+        """Take tokens if available, without waiting"""
+        with self._lock:
+            self._refill()
+            if self._tokens >= tokens:
+                self._tokens -= tokens
+                return True
+            return False
+
+    def time_until_available(self, tokens: float = 1.0) -> float:
+        """Seconds until tokens could be acquired, assuming no other consumers"""
+        with self._lock:
+            self._refill()
+            missing = tokens - self._tokens
+            if missing <= 0:
+                return 0.0
+            return missing / self.rate if self.rate > 0 else float('inf')
+
+    @property
+    def available(self) -> float:
+        with self._lock:
+            self._refill()
+            return self._tokens
+
+
+class RetryBudget:
+    def __init__(self, ratio: float = RETRY_CONFIG['budget_ratio'],
+                 min_per_second: float = RETRY_CONFIG['budget_min_per_second'],
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        Limits retries to a fraction of request volume
+
+        Each request deposits ratio tokens and each retry spends one, with a
+        small time-based allowance so retries still work at low traffic.
+        During an outage this caps extra load at roughly ratio times the
+        normal request rate.
+        """
+        self.ratio = ratio
+        self._bucket = TokenBucket(rate=min_per_second, capacity=max(10.0, min_per_second * 10), clock=clock)
+
+    def record_request(self):
+        self._bucket.deposit(self.ratio)
+
+    def try_spend(self) -> bool:
+        return self._bucket.try_acquire(1.0)
+
+
+class RetryPolicy:
+    def __init__(self, max_attempts: int = RETRY_CONFIG['max_attempts'],
+                 base_delay: float = RETRY_CONFIG['base_delay_seconds'],
+                 max_delay: float = RETRY_CONFIG['max_delay_seconds'],
+                 throttle_base_delay: float = RETRY_CONFIG['throttle_base_delay_seconds'],
+                 throttle_max_delay: float = RETRY_CONFIG['throttle_max_delay_seconds'],
+                 budget: Optional[RetryBudget] = None,
+                 rng: Optional[random.Random] = None):
+        """
+        Exponential backoff with full jitter, separate for throttling and model errors
+
+        Args:
+            max_attempts (int): Attempts per request, including the first
+            base_delay (float): First backoff step for model and transient errors
+            max_delay (float): Backoff cap for model and transient errors
+            throttle_base_delay (float): First backoff step after throttling
+            throttle_max_delay (float): Backoff cap after throttling
+            budget (RetryBudget, optional): Shared retry budget
+            rng (random.Random, optional): Jitter source
+        """
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.throttle_base_delay = throttle_base_delay
+        self.throttle_max_delay = throttle_max_delay
+        self.budget = budget or RetryBudget()
+        self._rng = rng or random.Random()
+
+    @staticmethod
+    def classify(error: Exception) -> Optional[str]:
+        """
+        Classify an invocation error
+
+        Returns:
+            str: 'throttle', 'model' or 'transient' when retrying may help, otherwise None
+        """
+        if isinstance(error, ClientError):
+            code = error.response.get('Error', {}).get('Code', '')
+            if code in THROTTLE_CODES:
+                return 'throttle'
+            if code == 'ModelError':
+                # A 4xx from the container means the request itself was rejected
+                status = error.response.get('OriginalStatusCode')
+                if status is not None and 400 <= int(status) < 500:
+                    return None
+                return 'model'
+            if code in TRANSIENT_CODES:
+                return 'transient'
+            return None
+        if isinstance(error, (BotocoreConnectionError, ReadTimeoutError)):
+            return 'transient'
+        return None
+
+    def backoff(self, attempt: int, kind: str) -> float:
+        """Full-jitter delay before retry number attempt (0-based)"""
+        if kind == 'throttle':
+            ceiling = min(self.throttle_max_delay, self.throttle_base_delay * (2 ** attempt))
+        else:
+            ceiling = min(self.max_delay, self.base_delay * (2 ** attempt))
+        return self._rng.uniform(0, ceiling)
+
+
+class CircuitBreaker:
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, failure_threshold: int = CIRCUIT_BREAKER_CONFIG['failure_threshold'],
+                 reset_timeout: float = CIRCUIT_BREAKER_CONFIG['reset_timeout_seconds'],
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        Fails fast after consecutive endpoint failures
+
+        After reset_timeout one probe request is let through; its outcome
+        closes the circuit again or re-opens it.
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._clock = clock
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._state == self.OPEN and self._clock() - self._opened_at >= self.reset_timeout:
+                return self.HALF_OPEN
+            return self._state
+
+    def allow_request(self) -> bool:
+        with self._lock:
+            if self._state == self.CLOSED:
+                return True
+            if self._state == self.OPEN:
+                if self._clock() - self._opened_at < self.reset_timeout:
+                    return False
+                self._state = self.HALF_OPEN
+                self._probe_in_flight = False
+            if self._probe_in_flight:
+                return False
+            self._probe_in_flight = True
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self._state = self.CLOSED
+            self._failures = 0
+            self._probe_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                self._state = self.OPEN
+                self._opened_at = self._clock()
+                self._probe_in_flight = False
+
+    def release_probe(self):
+        """Let another probe through when the current one ended without a verdict on endpoint health"""
+        with self._lock:
+            if self._state == self.HALF_OPEN:
+                self._probe_in_flight = False
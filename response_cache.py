@@ -0,0 +1,161 @@
+# File: multilingual-support/response_cache.py
+
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable, Dict, Optional
+from logger import setup_logger
+from config import CACHE_CONFIG
+
+logger = setup_logger('response_cache')
+
+
+def normalize_query(text: str) -> str:
+    """Normalize query text so trivially different spellings share a cache key"""
+    return ' '.join(unicodedata.normalize('NFC', text).split()).casefold()
+
+
+class ResponseCache:
+    def __init__(self,
+                 max_entries: int = CACHE_CONFIG['max_entries'],
+                 ttl_seconds: float = CACHE_CONFIG['ttl_seconds'],
+                 disk_path: Optional[str] = CACHE_CONFIG['disk_path'],
+                 max_disk_entries: int = CACHE_CONFIG['max_disk_entries'],
+                 cache_sampled: bool = CACHE_CONFIG['cache_sampled_responses'],
+                 clock: Callable[[], float] = time.time):
+        """
+        Exact-match response cache with LRU eviction and a TTL
+
+        Args:
+            max_entries (int): Number of responses kept in memory
+            ttl_seconds (float): Age after which an entry is treated as a miss
+            disk_path (str, optional): SQLite file used as a backing store that survives restarts
+            max_disk_entries (int): Number of responses kept in the backing store
+            cache_sampled (bool): Cache responses generated with do_sample=True
+            clock (Callable): Wall-clock source, so entries on disk can be aged across restarts
+        """
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.max_disk_entries = max_disk_entries
+        self.cache_sampled = cache_sampled
+        self._clock = clock
+        self._entries: 'OrderedDict[str, tuple]' = OrderedDict()
+        self._lock = threading.Lock()
+        self._counters = {
+            'hits': 0,
+            'misses': 0,
+            'disk_hits': 0,
+            'evictions': 0,
+            'expirations': 0,
+            'bypassed': 0,
+        }
+
+        self._db = None
+        if disk_path:
+            Path(disk_path).parent.mkdir(parents=True, exist_ok=True)
+            self._db = sqlite3.connect(disk_path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS responses "
+                "(key TEXT PRIMARY KEY, value TEXT NOT NULL, created_at REAL NOT NULL)"
+            )
+            self._db.commit()
+            logger.info(f"Response cache backed by {disk_path}")
+
+    def should_cache(self, payload: Dict) -> bool:
+        """Check whether a payload produces responses that are safe to reuse"""
+        if payload.get('parameters', {}).get('do_sample') and not self.cache_sampled:
+            with self._lock:
+                self._counters['bypassed'] += 1
+            return False
+        return True
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached response for key, or None on a miss"""
+        now = self._clock()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, created_at = entry
+                if now - created_at <= self.ttl_seconds:
+                    self._entries.move_to_end(key)
+                    self._counters['hits'] += 1
+                    return value
+                del self._entries[key]
+                self._counters['expirations'] += 1
+
+            if self._db is not None:
+                row = self._db.execute(
+                    "SELECT value, created_at FROM responses WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None:
+                    value, created_at = row
+                    if now - created_at <= self.ttl_seconds:
+                        self._store(key, value, created_at)
+                        self._counters['hits'] += 1
+                        self._counters['disk_hits'] += 1
+                        return value
+                    self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+                    self._db.commit()
+                    self._counters['expirations'] += 1
+
+            self._counters['misses'] += 1
+            return None
+
+    def put(self, key: str, value: str):
+        """Store a response under key"""
+        created_at = self._clock()
+        with self._lock:
+            self._store(key, value, created_at)
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO responses (key, value, created_at) VALUES (?, ?, ?)",
+                    (key, value, created_at)
+                )
+                self._prune_disk()
+                self._db.commit()
+
+    def _store(self, key: str, value: str, created_at: float):
+        """Insert into the in-memory LRU; caller must hold the lock"""
+        self._entries[key] = (value, created_at)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self._counters['evictions'] += 1
+
+    def _prune_disk(self):
+        """Drop the oldest rows once the backing store exceeds its capacity"""
+        (count,) = self._db.execute("SELECT COUNT(*) FROM responses").fetchone()
+        excess = count - self.max_disk_entries
+        if excess > 0:
+            self._db.execute(
+                "DELETE FROM responses WHERE key IN "
+                "(SELECT key FROM responses ORDER BY created_at ASC LIMIT ?)",
+                (excess,)
+            )
+
+    def clear(self):
+        """Drop every entry from memory and the backing store"""
+        with self._lock:
+            self._entries.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM responses")
+                self._db.commit()
+
+    def stats(self) -> Dict:
+        """Return hit/miss counters and the current size"""
+        with self._lock:
+            lookups = self._counters['hits'] + self._counters['misses']
+            return {
+                **self._counters,
+                'size': len(self._entries),
+                'hit_rate': self._counters['hits'] / lookups if lookups else 0.0,
+            }
+
+    def close(self):
+        """Close the backing store"""
+        if self._db is not None:
+            self._db.close()
+            self._db = None
@@ -0,0 +1,262 @@
+# File: multilingual-support/router.py
+
+import copy
+import io
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Iterator, List, Optional
+from botocore.exceptions import ReadTimeoutError
+from botocore.response import StreamingBody
+from aws_clients import get_runtime_client
+from config import ROUTER_CONFIG
+from logger import setup_logger
+from resilience import CircuitBreaker, CircuitOpenError, RetryPolicy
+
+logger = setup_logger('router')
+
+
+class RouteTarget:
+    def __init__(self, endpoint_name: str, variant: Optional[str] = None, region: Optional[str] = None,
+                 runtime=None,
+                 initial_latency: float = ROUTER_CONFIG['initial_latency_seconds'],
+                 affinity_window: int = ROUTER_CONFIG['affinity_window'],
+                 failure_threshold: int = ROUTER_CONFIG['failure_threshold'],
+                 ejection_seconds: float = ROUTER_CONFIG['ejection_seconds'],
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        One endpoint, or one production variant of an endpoint, with its load and health
+
+        Args:
+            endpoint_name (str): SageMaker endpoint
+            variant (str, optional): Production variant sent as TargetVariant
+            region (str, optional): Region of the endpoint's runtime client
+            runtime (optional): sagemaker-runtime client, e.g. a FakeSageMakerRuntime; shared client by default
+            initial_latency (float): Latency assumed before the first sample
+            affinity_window (int): Recently served adapters remembered
+            failure_threshold (int): Consecutive failures before ejection
+            ejection_seconds (float): Time ejected before a probe request
+            clock (Callable): Monotonic time source
+        """
+        self.endpoint_name = endpoint_name
+        self.variant = variant
+        self.region = region
+        # Only the shared clients can be swapped for one with a shorter read timeout
+        self._shared_runtime = runtime is None
+        self.runtime = runtime or get_runtime_client(region)
+        self.name = f"{endpoint_name}/{variant}" if variant else endpoint_name
+        self.ewma_latency = initial_latency
+        self.outstanding = 0
+        self.affinity_window = affinity_window
+        self.recent_adapters: 'OrderedDict[str, None]' = OrderedDict()
+        self.health = CircuitBreaker(failure_threshold=failure_threshold, reset_timeout=ejection_seconds,
+                                     clock=clock)
+        self.counters = {'requests': 0, 'failures': 0, 'ejections': 0}
+
+    def runtime_for(self, read_timeout: Optional[float] = None):
+        """The target's client, with the given read timeout when it is a shared client"""
+        if read_timeout is None or not self._shared_runtime:
+            return self.runtime
+        return get_runtime_client(self.region, read_timeout=read_timeout)
+
+    def invoke_kwargs(self, kwargs: Dict) -> Dict:
+        """Call arguments for this target, overriding the caller's endpoint"""
+        kwargs = {**kwargs, 'EndpointName': self.endpoint_name}
+        if self.variant:
+            kwargs['TargetVariant'] = self.variant
+        return kwargs
+
+
+class EndpointRouter:
+    def __init__(self, targets: List[RouteTarget],
+                 ewma_alpha: float = ROUTER_CONFIG['ewma_alpha'],
+                 affinity_discount: float = ROUTER_CONFIG['affinity_discount']):
+        """
+        Spreads invocations across endpoints and production variants
+
+        Has the same invoke_endpoint / invoke_endpoint_with_response_stream
+        call shape as a sagemaker-runtime client, so it can be handed to
+        LoraAdapterManager as its runtime. Each request goes to the healthy
+        target with the lowest (outstanding + 1) * EWMA latency, discounted
+        when the target recently served the request's adapter and so likely
+        has it resident. A target is ejected after consecutive model or
+        transient errors and gets a single probe request once its ejection
+        period is over.
+
+        Args:
+            targets (List[RouteTarget]): The pool to route across
+            ewma_alpha (float): Weight of the newest latency sample
+            affinity_discount (float): Score multiplier for adapter-warm targets
+        """
+        if not targets:
+            raise ValueError("EndpointRouter needs at least one target")
+        self.targets = targets
+        self.ewma_alpha = ewma_alpha
+        self.affinity_discount = affinity_discount
+        self._lock = threading.Lock()
+        # Set on the views returned by with_read_timeout
+        self.read_timeout: Optional[float] = None
+        # Errors surface exactly as the target client raised them
+        self.exceptions = targets[0].runtime.exceptions
+
+    @classmethod
+    def from_config(cls, config: Dict = ROUTER_CONFIG) -> 'EndpointRouter':
+        targets = [
+            RouteTarget(target['endpoint_name'], target.get('variant'), target.get('region'),
+                        initial_latency=config['initial_latency_seconds'],
+                        affinity_window=config['affinity_window'],
+                        failure_threshold=config['failure_threshold'],
+                        ejection_seconds=config['ejection_seconds'])
+            for target in config['targets']
+        ]
+        return cls(targets, config['ewma_alpha'], config['affinity_discount'])
+
+    def with_read_timeout(self, read_timeout: float) -> 'EndpointRouter':
+        """
+        The same router, calling its targets with a shorter read timeout
+
+        The view shares the targets, their load and health, and the lock, so
+        LoraAdapterManager can bound each attempt by its deadline. A read
+        timeout on the view says nothing about the target's health.
+        """
+        view = copy.copy(self)
+        view.read_timeout = read_timeout
+        return view
+
+    def _score(self, target: RouteTarget, adapter_name: Optional[str]) -> float:
+        score = (target.outstanding + 1) * target.ewma_latency
+        if adapter_name in target.recent_adapters:
+            score *= self.affinity_discount
+        return score
+
+    def choose(self, adapter_name: Optional[str] = None) -> RouteTarget:
+        """
+        Pick the target for one request and count it as outstanding
+
+        An ejected target whose probe is due takes the request; otherwise the
+        best-scoring healthy target does.
+        """
+        with self._lock:
+            chosen = None
+            for target in self.targets:
+                if target.health.state == CircuitBreaker.HALF_OPEN and target.health.allow_request():
+                    logger.info(f"Probing ejected target {target.name}")
+                    chosen = target
+                    break
+            if chosen is None:
+                healthy = [target for target in self.targets if target.health.state == CircuitBreaker.CLOSED]
+                if not healthy:
+                    raise CircuitOpenError("Every endpoint target is ejected")
+                chosen = min(healthy, key=lambda target: self._score(target, adapter_name))
+            chosen.outstanding += 1
+            chosen.counters['requests'] += 1
+            return chosen
+
+    def _release(self, target: RouteTarget):
+        """Release the request without a latency or health sample, freeing a probe it held"""
+        with self._lock:
+            target.outstanding -= 1
+            target.health.release_probe()
+
+    def _record(self, target: RouteTarget, adapter_name: Optional[str], started_at: float,
+                error: Optional[Exception]):
+        """Release the request and update the target's latency, affinity and health"""
+        if self.read_timeout is not None and isinstance(error, ReadTimeoutError):
+            self._release(target)
+            return
+        with self._lock:
+            target.outstanding -= 1
+            if error is None:
+                latency = time.monotonic() - started_at
+                target.ewma_latency += self.ewma_alpha * (latency - target.ewma_latency)
+                if adapter_name:
+                    target.recent_adapters[adapter_name] = None
+                    target.recent_adapters.move_to_end(adapter_name)
+                    while len(target.recent_adapters) > target.affinity_window:
+                        target.recent_adapters.popitem(last=False)
+                target.health.record_success()
+                return
+            if RetryPolicy.classify(error) in ('model', 'transient'):
+                was_closed = target.health.state == CircuitBreaker.CLOSED
+                target.counters['failures'] += 1
+                target.health.record_failure()
+                if target.health.state == CircuitBreaker.OPEN:
+                    if was_closed:
+                        target.counters['ejections'] += 1
+                    logger.warning(f"Ejected endpoint target {target.name} after error: {str(error)}")
+            elif target.health.state != CircuitBreaker.CLOSED:
+                # A probe that was throttled or rejected still shows the target is reachable
+                target.health.record_success()
+
+    @staticmethod
+    def _adapter_of(body) -> Optional[str]:
+        try:
+            payload = json.loads(body.decode('utf-8') if isinstance(body, bytes) else body)
+            return payload.get('parameters', {}).get('adapter_name')
+        except (ValueError, AttributeError):
+            return None
+
+    def invoke_endpoint(self, **kwargs) -> Dict:
+        """Same call shape as sagemaker-runtime invoke_endpoint; EndpointName is chosen by the router"""
+        adapter_name = self._adapter_of(kwargs.get('Body'))
+        target = self.choose(adapter_name)
+        started_at = time.monotonic()
+        try:
+            response = target.runtime_for(self.read_timeout).invoke_endpoint(**target.invoke_kwargs(kwargs))
+            # Read the body here so the latency sample includes generation
+            body = response['Body'].read()
+        except Exception as e:
+            self._record(target, adapter_name, started_at, e)
+            raise
+        self._record(target, adapter_name, started_at, None)
+        return {**response, 'Body': StreamingBody(io.BytesIO(body), len(body))}
+
+    def invoke_endpoint_with_response_stream(self, **kwargs) -> Dict:
+        """Same call shape as invoke_endpoint_with_response_stream; the target is released when the stream ends"""
+        adapter_name = self._adapter_of(kwargs.get('Body'))
+        target = self.choose(adapter_name)
+        started_at = time.monotonic()
+        try:
+            response = target.runtime_for(self.read_timeout).invoke_endpoint_with_response_stream(
+                **target.invoke_kwargs(kwargs)
+            )
+        except Exception as e:
+            self._record(target, adapter_name, started_at, e)
+            raise
+
+        def events() -> Iterator[Dict]:
+            error = None
+            abandoned = False
+            try:
+                yield from response['Body']
+            except GeneratorExit:
+                # Closed by the consumer: a truncated stream says nothing about latency or health
+                abandoned = True
+                raise
+            except Exception as e:
+                error = e
+                raise
+            finally:
+                if abandoned:
+                    self._release(target)
+                else:
+                    self._record(target, adapter_name, started_at, error)
+
+        return {**response, 'Body': events()}
+
+    def stats(self) -> List[Dict]:
+        """Load, latency and health per target"""
+        with self._lock:
+            return [
+                {
+                    'target': target.name,
+                    'outstanding': target.outstanding,
+                    'ewma_latency_seconds': target.ewma_latency,
+                    'state': target.health.state,
+                    'recent_adapters': list(target.recent_adapters),
+                    **target.counters,
+                }
+                for target in self.targets
+            ]
+
@@ -5,7 +5,11 @@ import sagemaker
 from sagemaker import get_execution_role
 import logging
 from logger import setup_logger
-from config import AWS_CONFIG, BASE_MODEL, SAGEMAKER_CONFIG, ADAPTER_CONFIGS
+from config import AWS_CONFIG, BASE_MODEL, SAGEMAKER_CONFIG, ADAPTER_CONFIGS, WARMUP_CONFIG
+from adapter_manager import LoraAdapterManager
+from adapter_warmup import AdapterWarmer
+from batch_transform import BatchTransformWorkflow
+from inference_handler import CustomerSupportInference
 
 # Initialize logger
 logger = setup_logger('sagemaker_setup')
@@ -117,12 +121,50 @@ class MultilingualSupportDeployment:
             self.create_model()
             self.create_endpoint_config()
             self.create_endpoint()
+            if WARMUP_CONFIG['after_deploy']:
+                self.warm_adapters()
             logger.info("Deployment completed successfully!")
         except Exception as e:
             logger.error(f"Deployment failed: {str(e)}")
             self.cleanup()
             raise
 
+    def warm_adapters(self):
+        """
+        Load the busiest adapters onto the new endpoint before real traffic arrives
+
+        A failed warm-up is logged but does not fail the deployment
+        """
+        try:
+            report = AdapterWarmer(runtime=self.runtime).warm()
+            for adapter_name, latency in report['latency_ms'].items():
+                logger.info(f"{adapter_name}: first request {latency['first_probe_ms']:.0f} ms, "
+                            f"warm {latency['warm_probe_ms']:.0f} ms")
+            return report
+        except Exception as e:
+            logger.warning(f"Adapter warm-up failed: {str(e)}")
+            return None
+
+    def run_batch_transform(self, query_file: str, output_file: str, job_name: str = None):
+        """
+        Process a query file with a Batch Transform job instead of the real-time endpoint
+
+        Uses the model created by create_model; the endpoint does not need to be running
+        """
+        try:
+            manager = LoraAdapterManager(runtime=self.runtime)
+            workflow = BatchTransformWorkflow(
+                sm_client=self.sm_client,
+                s3_client=boto3.client('s3', region_name=AWS_CONFIG['region']),
+                adapter_manager=manager,
+                bucket=self.session.default_bucket(),
+                detector=CustomerSupportInference(adapter_manager=manager)._detect_language_and_domain
+            )
+            return workflow.run(query_file, output_file, job_name=job_name)
+        except Exception as e:
+            logger.error(f"Batch transform failed: {str(e)}")
+            raise
+
     def verify_setup(self):
         """Verify AWS setup and permissions"""
         try:
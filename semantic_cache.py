@@ -0,0 +1,204 @@
+# File: multilingual-support/semantic_cache.py
+
+import os
+import tempfile
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+import numpy as np
+from config import SEMANTIC_CACHE_CONFIG
+from language_id import hashed_ngrams
+from logger import setup_logger
+from metrics import Histogram, MetricsRegistry, get_registry
+from response_cache import normalize_query
+
+logger = setup_logger('semantic_cache')
+
+
+def embed_queries(texts: Sequence[str], dim: int = SEMANTIC_CACHE_CONFIG['dim'],
+                  ngram_range: Tuple[int, int] = SEMANTIC_CACHE_CONFIG['ngram_range']) -> np.ndarray:
+    """
+    Unit-length hashed character n-gram vectors, one row per text
+
+    Counts are dampened with log1p so a repeated word does not dominate.
+    """
+    texts = [normalize_query(text) for text in texts]
+    rows, buckets = hashed_ngrams(texts, ngram_range, dim)
+    counts = np.bincount(rows * dim + buckets, minlength=len(texts) * dim).reshape(len(texts), dim)
+    vectors = np.log1p(counts, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+
+class _AdapterIndex:
+    def __init__(self, capacity: int, dim: int, directory: Optional[str]):
+        """
+        Preallocated vector slots for one adapter, with responses and LRU ticks per slot
+
+        With a directory, the vectors live in an anonymous temporary file there,
+        private to this index like its responses and removed when it is closed.
+        """
+        self._file = None
+        if directory:
+            self._file = tempfile.TemporaryFile(dir=directory, suffix='.f32')
+            self.vectors = np.memmap(self._file, dtype=np.float32, mode='w+', shape=(capacity, dim))
+        else:
+            self.vectors = np.zeros((capacity, dim), dtype=np.float32)
+        self.last_used = np.zeros(capacity, dtype=np.int64)
+        self.created_at = np.zeros(capacity, dtype=np.float64)
+        self.responses: List[Optional[str]] = [None] * capacity
+        self.size = 0
+
+
+class SemanticCache:
+    def __init__(self,
+                 threshold: float = SEMANTIC_CACHE_CONFIG['threshold'],
+                 capacity_per_adapter: int = SEMANTIC_CACHE_CONFIG['capacity_per_adapter'],
+                 dim: int = SEMANTIC_CACHE_CONFIG['dim'],
+                 ngram_range: Tuple[int, int] = SEMANTIC_CACHE_CONFIG['ngram_range'],
+                 ttl_seconds: float = SEMANTIC_CACHE_CONFIG['ttl_seconds'],
+                 index_dir: Optional[str] = SEMANTIC_CACHE_CONFIG['index_dir'],
+                 cache_sampled: bool = SEMANTIC_CACHE_CONFIG['cache_sampled_responses'],
+                 metrics: Optional[MetricsRegistry] = None,
+                 clock: Callable[[], float] = time.time):
+        """
+        Near-duplicate response cache keyed by adapter and query similarity
+
+        Each adapter gets a preallocated (capacity, dim) float32 matrix of unit
+        query vectors, memory-mapped from a private temporary file in index_dir
+        when it is set, so large matrices can be paged out; entries are never
+        shared between instances or kept across restarts. A lookup
+        is one matrix-vector product over the adapter's filled slots; the best
+        match is a hit when its cosine similarity reaches threshold. When an
+        adapter is full, the least recently used slot is overwritten.
+
+        Args:
+            threshold (float): Cosine similarity needed to reuse a response
+            capacity_per_adapter (int): Vector slots per adapter
+            dim (int): Embedding size, a power of two
+            ngram_range (Tuple[int, int]): Character n-gram lengths used for embeddings
+            ttl_seconds (float): Age after which an entry is no longer served
+            index_dir (str, optional): Directory for the memory-mapped scratch files; on the heap when None
+            cache_sampled (bool): Store responses generated with do_sample=True
+            metrics (MetricsRegistry, optional): Receives hit/miss counters and similarities
+            clock (Callable): Wall-clock source for the TTL
+        """
+        self.threshold = threshold
+        self.capacity = capacity_per_adapter
+        self.dim = dim
+        self.ngram_range = tuple(ngram_range)
+        self.ttl_seconds = ttl_seconds
+        self.index_dir = index_dir
+        self.cache_sampled = cache_sampled
+        self.metrics = metrics or get_registry()
+        self._clock = clock
+        self._indexes: Dict[str, _AdapterIndex] = {}
+        self._tick = 0
+        self._lock = threading.Lock()
+        self._similarity = Histogram(SEMANTIC_CACHE_CONFIG['similarity_buckets'])
+        self._counters = {
+            'hits': 0,
+            'misses': 0,
+            'evictions': 0,
+            'expirations': 0,
+            'bypassed': 0,
+        }
+        if index_dir:
+            os.makedirs(index_dir, exist_ok=True)
+
+    def _index(self, adapter: str) -> _AdapterIndex:
+        """Get or allocate the adapter's index; caller must hold the lock"""
+        index = self._indexes.get(adapter)
+        if index is None:
+            index = self._indexes[adapter] = _AdapterIndex(self.capacity, self.dim, self.index_dir)
+            logger.info(f"Allocated semantic cache index for {adapter} ({self.capacity} x {self.dim})")
+        return index
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        return embed_queries(texts, self.dim, self.ngram_range)
+
+    def get(self, adapter: str, query: str) -> Optional[Tuple[str, float]]:
+        """
+        Find a cached response for a query similar to this one
+
+        Returns:
+            Tuple[str, float]: The cached response and its similarity, or None on a miss
+        """
+        vector = self.embed([query])[0]
+        now = self._clock()
+        with self._lock:
+            index = self._indexes.get(adapter)
+            best_slot, similarity = -1, 0.0
+            if index is not None and index.size:
+                similarities = index.vectors[:index.size] @ vector
+                best_slot = int(similarities.argmax())
+                similarity = float(similarities[best_slot])
+
+            self._similarity.observe(similarity)
+            if best_slot >= 0 and similarity >= self.threshold:
+                if now - index.created_at[best_slot] <= self.ttl_seconds:
+                    self._tick += 1
+                    index.last_used[best_slot] = self._tick
+                    self._counters['hits'] += 1
+                    response = index.responses[best_slot]
+                else:
+                    # Leave the stale slot as the eviction candidate
+                    index.last_used[best_slot] = 0
+                    self._counters['expirations'] += 1
+                    self._counters['misses'] += 1
+                    response = None
+            else:
+                self._counters['misses'] += 1
+                response = None
+
+        self.metrics.observe_with_buckets('semantic_cache_similarity', similarity,
+                                          SEMANTIC_CACHE_CONFIG['similarity_buckets'], adapter=adapter)
+        self.metrics.increment('semantic_cache_lookups', adapter=adapter,
+                               result='hit' if response is not None else 'miss')
+        return (response, similarity) if response is not None else None
+
+    def should_cache(self, parameters: Dict) -> bool:
+        """Check whether responses generated with these parameters are safe to reuse"""
+        if parameters.get('do_sample') and not self.cache_sampled:
+            with self._lock:
+                self._counters['bypassed'] += 1
+            return False
+        return True
+
+    def put(self, adapter: str, query: str, response: str):
+        """Store a response, overwriting the least recently used slot when the adapter is full"""
+        vector = self.embed([query])[0]
+        now = self._clock()
+        with self._lock:
+            index = self._index(adapter)
+            if index.size < self.capacity:
+                slot = index.size
+                index.size += 1
+            else:
+                slot = int(index.last_used.argmin())
+                self._counters['evictions'] += 1
+            self._tick += 1
+            index.vectors[slot] = vector
+            index.last_used[slot] = self._tick
+            index.created_at[slot] = now
+            index.responses[slot] = response
+
+    def clear(self):
+        """Drop every entry; the preallocated matrices are kept"""
+        with self._lock:
+            for index in self._indexes.values():
+                index.size = 0
+                index.responses = [None] * self.capacity
+                index.last_used[:] = 0
+
+    def stats(self) -> Dict:
+        """Hit/miss counters, entries per adapter and the distribution of best-match similarities"""
+        with self._lock:
+            lookups = self._counters['hits'] + self._counters['misses']
+            return {
+                **self._counters,
+                'hit_rate': self._counters['hits'] / lookups if lookups else 0.0,
+                'size': {adapter: index.size for adapter, index in self._indexes.items()},
+                'similarity': self._similarity.cumulative(),
+                'mean_similarity': self._similarity.sum / self._similarity.count if self._similarity.count else 0.0,
+            }
@@ -0,0 +1,81 @@
+# File: multilingual-support/single_flight.py
+
+import threading
+from typing import Any, Callable, Dict, Optional
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    def __init__(self):
+        """
+        Coalesce identical in-flight calls so only one of them does the work
+
+        Results are handed to the waiters of that call and then dropped;
+        nothing is kept once the in-flight call finishes
+        """
+        self._calls: Dict[str, _Call] = {}
+        self._lock = threading.Lock()
+        self._counters = {
+            'calls': 0,
+            'executed': 0,
+            'coalesced': 0,
+        }
+
+    def do(self, key: str, fn: Callable[[], Any], timeout: Optional[float] = None) -> Any:
+        """
+        Run fn for key, or wait for the identical call already in flight
+
+        Args:
+            key (str): Identity of the call, e.g. the payload hash
+            fn (Callable): Work to run when no identical call is in flight
+            timeout (float, optional): Seconds a waiter waits before raising TimeoutError;
+                the call itself keeps running for the others
+
+        Returns:
+            Any: The result of fn; waiters get the same result or exception
+        """
+        with self._lock:
+            self._counters['calls'] += 1
+            call = self._calls.get(key)
+            if call is not None:
+                self._counters['coalesced'] += 1
+                is_leader = False
+            else:
+                call = _Call()
+                self._calls[key] = call
+                self._counters['executed'] += 1
+                is_leader = True
+
+        if not is_leader:
+            if not call.done.wait(timeout):
+                raise TimeoutError(f"Timed out after {timeout}s waiting for in-flight call {key}")
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    def in_flight(self) -> int:
+        """Number of distinct calls currently running"""
+        with self._lock:
+            return len(self._calls)
+
+    def stats(self) -> Dict:
+        """Return call counters; 'coalesced' is the number of endpoint calls saved"""
+        with self._lock:
+            return {**self._counters, 'in_flight': len(self._calls)}
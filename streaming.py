@@ -0,0 +1,88 @@
+# File: multilingual-support/streaming.py
+
+import json
+import threading
+from collections import deque
+from typing import Dict, List, Optional
+
+
+class TokenStreamDecoder:
+    def __init__(self):
+        """
+        Incremental decoder for LMI response-stream payload parts
+
+        Chunks from invoke_endpoint_with_response_stream can end anywhere,
+        including inside a JSON line or a multi-byte character, so bytes are
+        buffered until a full line is available before decoding
+        """
+        self._buffer = b''
+        self.generated_text: Optional[str] = None
+
+    def feed(self, chunk: bytes) -> List[str]:
+        """Add a payload chunk and return the tokens from every completed line"""
+        self._buffer += chunk
+        *lines, self._buffer = self._buffer.split(b'\n')
+        return [token for token in map(self._decode_line, lines) if token]
+
+    def flush(self) -> List[str]:
+        """Decode whatever is left once the stream has ended"""
+        line, self._buffer = self._buffer, b''
+        token = self._decode_line(line)
+        return [token] if token else []
+
+    def _decode_line(self, line: bytes) -> Optional[str]:
+        """Extract the token text from one JSON line"""
+        line = line.strip()
+        if line.startswith(b'data:'):
+            # Server-sent events framing
+            line = line[len(b'data:'):].strip()
+        if not line:
+            return None
+
+        record = json.loads(line.decode('utf-8'))
+        if isinstance(record, dict) and record.get('generated_text') is not None:
+            # Final record carries the full text alongside the last token
+            self.generated_text = record['generated_text']
+
+        if isinstance(record, dict) and isinstance(record.get('token'), dict):
+            return record['token'].get('text', '')
+        if isinstance(record, dict) and 'outputs' in record:
+            return ''.join(record['outputs'])
+        return None
+
+
+class StreamLatencyStats:
+    def __init__(self, max_samples: int = 1000):
+        """Keep recent time-to-first-token and total latency samples for streamed calls"""
+        self._ttft = deque(maxlen=max_samples)
+        self._total = deque(maxlen=max_samples)
+        self._lock = threading.Lock()
+        self.streams = 0
+
+    def record(self, ttft_seconds: Optional[float], total_seconds: float):
+        """Record one finished stream; ttft is None when no token was produced"""
+        with self._lock:
+            self.streams += 1
+            if ttft_seconds is not None:
+                self._ttft.append(ttft_seconds)
+            self._total.append(total_seconds)
+
+    def summary(self) -> Dict:
+        """Return p50/p95 of time-to-first-token and total latency, in milliseconds"""
+        with self._lock:
+            return {
+                'streams': self.streams,
+                'ttft_ms': _percentiles(self._ttft),
+                'total_ms': _percentiles(self._total),
+            }
+
+
+def _percentiles(samples) -> Dict:
+    if not samples:
+        return {'p50': None, 'p95': None}
+    ordered = sorted(samples)
+
+    def pick(q: float) -> float:
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))] * 1000
+
+    return {'p50': pick(0.50), 'p95': pick(0.95)}
@@ -0,0 +1,60 @@
+# File: multilingual-support/test_adapter_scheduler.py
+
+import threading
+import time
+
+from adapter_scheduler import AdapterAffinityScheduler
+
+
+class RecordingManager:
+    def __init__(self):
+        self.calls = []
+        self.gate = threading.Event()
+        self._lock = threading.Lock()
+
+    def _adapter_name(self, language, domain):
+        return f"{language}-{domain}"
+
+    def invoke_model(self, input_text, language='spanish', domain='technical', deadline=None):
+        self.gate.wait(5)
+        with self._lock:
+            self.calls.append(self._adapter_name(language, domain))
+        return f"reply to {input_text}"
+
+
+def test_requests_are_grouped_by_adapter():
+    manager = RecordingManager()
+    scheduler = AdapterAffinityScheduler(manager, wave_size=4, max_wait_seconds=10, max_consecutive_waves=4)
+
+    # The first request occupies the dispatcher while the rest queue up interleaved
+    futures = [scheduler.submit('warmup', 'spanish', 'technical')]
+    time.sleep(0.05)
+    for i in range(6):
+        language = 'spanish' if i % 2 == 0 else 'french'
+        futures.append(scheduler.submit(f'q{i}', language, 'billing'))
+    manager.gate.set()
+
+    assert [f.result(5) for f in futures][1] == 'reply to q0'
+    scheduler.shutdown()
+
+    stats = scheduler.stats()
+    assert stats['fifo_adapter_switches'] == 6
+    assert stats['adapter_switches'] == 2
+    assert stats['switches_avoided'] == 4
+
+
+def test_max_wait_promotes_cold_adapter():
+    manager = RecordingManager()
+    manager.gate.set()
+    scheduler = AdapterAffinityScheduler(manager, wave_size=1, max_wait_seconds=0.0, max_consecutive_waves=100)
+    futures = [scheduler.submit(f'q{i}', 'spanish', 'technical') for i in range(3)]
+    futures.append(scheduler.submit('cold', 'russian', 'product'))
+    for f in futures:
+        f.result(5)
+    scheduler.shutdown()
+    assert 'russian-product' in manager.calls
+
+
+if __name__ == "__main__":
+    test_requests_are_grouped_by_adapter()
+    test_max_wait_promotes_cold_adapter()
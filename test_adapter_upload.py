@@ -0,0 +1,113 @@
+# File: multilingual-support/test_adapter_upload.py
+
+import json
+import os
+from adapter_upload import AdapterUploader, file_sha256
+from fake_s3 import FakeS3Client
+
+PART_SIZE_MB = 1 / 16  # 64 KB parts
+
+
+def _write(path, size, fill=b'a'):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'wb') as f:
+        f.write(fill * size)
+
+
+def _adapters(root):
+    _write(os.path.join(root, 'es-technical-support', 'adapter_model.safetensors'), 200 * 1024)
+    _write(os.path.join(root, 'es-technical-support', 'adapter_config.json'), 100, b'{')
+    _write(os.path.join(root, 'fr-billing-support', 'adapter_model.safetensors'), 150 * 1024, b'b')
+    _write(os.path.join(root, 'fr-billing-support', 'adapter_model.safetensors.tmp'), 10)
+
+
+def _uploader(s3, delete_removed=False):
+    return AdapterUploader(s3_client=s3, bucket='lora-bucket', prefix='lora-adapters/',
+                           part_size_mb=PART_SIZE_MB, max_workers=4, max_concurrent_files=2,
+                           delete_removed=delete_removed)
+
+
+def _manifest_files(s3):
+    return sorted(json.loads(s3.get_object(Bucket='lora-bucket', Key='lora-adapters/manifest.json')['Body'].read())
+                  ['files'])
+
+
+def test_only_changed_files_are_uploaded(tmp_path):
+    root = str(tmp_path)
+    _adapters(root)
+    s3 = FakeS3Client()
+    s3.create_bucket(Bucket='lora-bucket')
+    uploader = _uploader(s3)
+
+    first = uploader.upload(root)
+    assert (first['uploaded'], first['skipped']) == (3, 0)
+    assert first['bytes_uploaded'] == 350 * 1024 + 100
+    assert first['throughput_mb_per_second'] > 0
+    # 200 KB and 150 KB in 64 KB parts; the config file is below the multipart threshold
+    assert s3.calls['UploadPart'] == 4 + 3
+
+    key = 'lora-adapters/es-technical-support/adapter_model.safetensors'
+    path = os.path.join(root, 'es-technical-support', 'adapter_model.safetensors')
+    assert s3.head_object(Bucket='lora-bucket', Key=key)['Metadata'] == {'sha256': file_sha256(path)}
+    manifest = json.loads(s3.get_object(Bucket='lora-bucket', Key='lora-adapters/manifest.json')['Body'].read())
+    assert sorted(manifest['files']) == [
+        'es-technical-support/adapter_config.json',
+        'es-technical-support/adapter_model.safetensors',
+        'fr-billing-support/adapter_model.safetensors',
+    ]
+
+    second = uploader.upload(root)
+    assert (second['uploaded'], second['skipped']) == (0, 3)
+    assert s3.calls['UploadPart'] == 7
+    assert s3.calls['PutObject'] == 2  # The config file and the first manifest
+
+    _write(path, 200 * 1024, b'c')
+    third = uploader.upload(root)
+    assert (third['uploaded'], third['skipped']) == (1, 2)
+    assert s3.get_object(Bucket='lora-bucket', Key=key)['Body'].read() == b'c' * 200 * 1024
+
+
+def test_objects_uploaded_without_a_manifest_are_skipped(tmp_path):
+    root = str(tmp_path)
+    _adapters(root)
+    s3 = FakeS3Client()
+    s3.create_bucket(Bucket='lora-bucket')
+    _uploader(s3).upload(root)
+    s3.delete_objects(Bucket='lora-bucket', Delete={'Objects': [{'Key': 'lora-adapters/manifest.json'}]})
+
+    report = _uploader(s3).upload(root)
+    assert (report['uploaded'], report['skipped']) == (0, 3)
+    assert s3.head_object(Bucket='lora-bucket', Key='lora-adapters/manifest.json')['ContentLength'] > 0
+
+
+def test_files_removed_locally_are_pruned(tmp_path):
+    root = str(tmp_path)
+    _adapters(root)
+    s3 = FakeS3Client()
+    s3.create_bucket(Bucket='lora-bucket')
+    _uploader(s3).upload(root)
+    config_key = 'lora-adapters/es-technical-support/adapter_config.json'
+    model_key = 'lora-adapters/fr-billing-support/adapter_model.safetensors'
+
+    os.remove(os.path.join(root, 'es-technical-support', 'adapter_config.json'))
+    kept = _uploader(s3).upload(root)
+    assert kept['removed'] == ['es-technical-support/adapter_config.json']
+    assert kept['deleted'] == 0
+    assert 'es-technical-support/adapter_config.json' not in _manifest_files(s3)
+    assert s3.head_object(Bucket='lora-bucket', Key=config_key)['ContentLength'] == 100
+
+    os.remove(os.path.join(root, 'fr-billing-support', 'adapter_model.safetensors'))
+    pruned = _uploader(s3, delete_removed=True).upload(root)
+    assert (pruned['removed'], pruned['deleted']) == (['fr-billing-support/adapter_model.safetensors'], 1)
+    assert _manifest_files(s3) == ['es-technical-support/adapter_model.safetensors']
+    listed = s3.list_objects_v2(Bucket='lora-bucket', Prefix='lora-adapters/').get('Contents', [])
+    assert model_key not in [entry['Key'] for entry in listed]
+
+
+if __name__ == "__main__":
+    import tempfile
+    from pathlib import Path
+    for test in (test_only_changed_files_are_uploaded, test_objects_uploaded_without_a_manifest_are_skipped,
+                 test_files_removed_locally_are_pruned):
+        with tempfile.TemporaryDirectory() as tmp:
+            test(Path(tmp))
@@ -0,0 +1,95 @@
+# File: multilingual-support/test_adapter_warmup.py
+
+from datetime import datetime
+from adapter_warmup import AdapterWarmer, RecentTraffic, all_adapters, traffic_from_log, traffic_from_metrics
+from fake_runtime import FakeSageMakerRuntime
+from metrics import MetricsRegistry
+
+
+def _runtime(**kwargs):
+    options = dict(max_cpu_lora=2, base_latency_seconds=0, per_token_seconds=0, cold_load_seconds=0.05)
+    options.update(kwargs)
+    return FakeSageMakerRuntime(**options)
+
+
+def test_busiest_adapters_end_up_resident_with_busiest_last():
+    runtime = _runtime()
+    warmer = AdapterWarmer(runtime=runtime, max_resident=2)
+    traffic = {'fr-billing-support': 50, 'es-technical-support': 120, 'ru-product-support': 5}
+    report = warmer.warm(traffic)
+    assert report['adapters'] == ['es-technical-support', 'fr-billing-support']
+    assert runtime.resident_adapters() == ['fr-billing-support', 'es-technical-support']
+
+    latency = report['latency_ms']['es-technical-support']
+    assert latency['first_probe_ms'] >= 50
+    assert latency['cold_penalty_ms'] > latency['warm_probe_ms']
+
+    # Already resident: no cold load on the next round
+    again = warmer.warm(traffic)
+    assert again['latency_ms']['es-technical-support']['first_probe_ms'] < 50
+    assert runtime.stats()['adapter_loads'] == 2
+
+
+def test_without_traffic_defaults_fill_the_slots():
+    warmer = AdapterWarmer(runtime=_runtime(), max_resident=3)
+    assert warmer.select_adapters({}) == all_adapters()[:3]
+    assert warmer.select_adapters({'unknown-adapter': 10, 'ru-billing-support': 1})[0] == 'ru-billing-support'
+
+
+def test_traffic_sources(tmp_path):
+    registry = MetricsRegistry(enabled=True)
+    for _ in range(3):
+        with registry.stage('invoke_model', adapter='fr-billing-support'):
+            pass
+    with registry.stage('invoke_model', adapter='es-technical-support'):
+        pass
+    assert traffic_from_metrics(registry) == {'fr-billing-support': 3, 'es-technical-support': 1}
+
+    log_path = tmp_path / 'application.log'
+    log_path.write_text(
+        "2024-01-01 - adapter_manager - INFO - Prompt for ru-product-support: 5 input tokens\n"
+        "2024-01-01 - inference_handler - INFO - Detected language: russian, domain: product\n"
+        '{"message": "Prompt for ru-product-support: 7 input tokens"}\n',
+        encoding='utf-8'
+    )
+    assert traffic_from_log(str(log_path)) == {'ru-product-support': 2}
+
+
+def test_recent_traffic_follows_shifts(tmp_path):
+    registry = MetricsRegistry(enabled=True)
+    recent = RecentTraffic(registry=registry)
+    for _ in range(5):
+        with registry.stage('invoke_model', adapter='fr-billing-support'):
+            pass
+    assert recent() == {'fr-billing-support': 5}
+    for _ in range(2):
+        with registry.stage('invoke_model', adapter='es-technical-support'):
+            pass
+    assert recent() == {'es-technical-support': 2}
+
+    now = datetime(2024, 1, 1, 12, 0, 0).timestamp()
+    log_path = tmp_path / 'application.log'
+    log_path.write_text(
+        "2024-01-01 10:00:00,000 - adapter_manager - INFO - Prompt for ru-product-support: 5 input tokens\n"
+        "2024-01-01 11:50:00,000 - adapter_manager - INFO - Prompt for fr-billing-support: 5 input tokens\n",
+        encoding='utf-8'
+    )
+    from_log = RecentTraffic(registry=MetricsRegistry(enabled=True), log_path=str(log_path),
+                             window_seconds=900, clock=lambda: now)
+    assert from_log() == {'fr-billing-support': 1}
+
+    # A round without traffic keeps the adapters that are already warm
+    warmer = AdapterWarmer(runtime=_runtime(), max_resident=1, traffic_source=lambda: {})
+    assert warmer.warm({'ru-billing-support': 3})['adapters'] == ['ru-billing-support']
+    assert warmer.warm()['adapters'] == ['ru-billing-support']
+
+
+if __name__ == "__main__":
+    import tempfile
+    from pathlib import Path
+    test_busiest_adapters_end_up_resident_with_busiest_last()
+    test_without_traffic_defaults_fill_the_slots()
+    with tempfile.TemporaryDirectory() as tmp:
+        test_traffic_sources(Path(tmp))
+    with tempfile.TemporaryDirectory() as tmp:
+        test_recent_traffic_follows_shifts(Path(tmp))
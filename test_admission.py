@@ -0,0 +1,98 @@
+# File: multilingual-support/test_admission.py
+
+import threading
+import time
+from admission import AdmissionController
+from metrics import MetricsRegistry
+
+
+class StubHandler:
+    """Records the order queries are processed in; blocks while the gate is closed"""
+
+    def __init__(self):
+        self.metrics = MetricsRegistry(enabled=True)
+        self.gate = threading.Event()
+        self.processed = []
+        self._lock = threading.Lock()
+
+    def _detect_language_and_domain(self, query):
+        return 'spanish', query.split(':')[0]
+
+    def process_query(self, query, deadline=None):
+        self.gate.wait(5)
+        with self._lock:
+            self.processed.append(query)
+        return {'status': 'success', 'query': query}
+
+
+def _controller(handler, **kwargs):
+    options = dict(rate_per_second=1000, burst=1000, max_concurrency=1, metrics=handler.metrics)
+    options.update(kwargs)
+    return AdmissionController(handler, **options)
+
+
+def test_billing_is_served_before_queued_product_questions():
+    handler = StubHandler()
+    controller = _controller(handler)
+    first = controller.submit("product: first")
+    time.sleep(0.05)  # first is now in progress and holds the only slot
+    futures = [controller.submit(q) for q in ("product: second", "technical: third", "billing: fourth")]
+    handler.gate.set()
+    for future in [first] + futures:
+        assert future.result(timeout=5)['status'] == 'success'
+    assert handler.processed == ["product: first", "billing: fourth", "technical: third", "product: second"]
+    controller.shutdown()
+
+
+def test_full_queue_rejects_or_displaces_lower_priority():
+    handler = StubHandler()
+    controller = _controller(handler, max_queue_size=1)
+    running = controller.submit("technical: running")
+    time.sleep(0.05)
+    queued = controller.submit("technical: queued")
+    rejected = controller.submit("product: rejected")
+    displacing = controller.submit("billing: urgent")
+    assert rejected.result(timeout=1) == {'status': 'rejected', 'reason': 'queue_full',
+                                          'error_message': "Admission queue is full"}
+    assert queued.result(timeout=1)['reason'] == 'displaced'
+    handler.gate.set()
+    assert running.result(timeout=5)['status'] == displacing.result(timeout=5)['status'] == 'success'
+    assert controller.stats()['shed'] == 1 and controller.stats()['rejected'] == 1
+    controller.shutdown()
+
+
+def test_requests_are_shed_when_their_deadline_passes_in_queue():
+    handler = StubHandler()
+    controller = _controller(handler)
+    running = controller.submit("technical: slow")
+    time.sleep(0.05)
+    waiting = controller.submit("billing: hurry", deadline=0.1)
+    assert waiting.result(timeout=2) == {'status': 'shed', 'reason': 'deadline',
+                                         'error_message': "Deadline passed while queued"}
+    handler.gate.set()
+    assert running.result(timeout=5)['status'] == 'success'
+    assert handler.metrics.counter_value('admission_shed', reason='deadline', domain='billing') == 1
+    controller.shutdown()
+
+
+def test_rate_limit_and_early_rejection():
+    handler = StubHandler()
+    handler.gate.set()
+    controller = _controller(handler, rate_per_second=20, burst=1, max_concurrency=4)
+    start = time.monotonic()
+    futures = [controller.submit(f"technical: {i}") for i in range(4)]
+    assert all(f.result(timeout=5)['status'] == 'success' for f in futures)
+    assert time.monotonic() - start >= 0.14
+
+    blocked = [controller.submit(f"technical: burst {i}") for i in range(10)]
+    late = controller.submit("technical: late", deadline=0.05)
+    assert late.result(timeout=1)['reason'] == 'deadline'
+    assert all(f.result(timeout=5)['status'] == 'success' for f in blocked)
+    controller.shutdown()
+
+
+if __name__ == "__main__":
+    test_billing_is_served_before_queued_product_questions()
+    test_full_queue_rejects_or_displaces_lower_priority()
+    test_requests_are_shed_when_their_deadline_passes_in_queue()
+    test_rate_limit_and_early_rejection()
@@ -0,0 +1,71 @@
+# File: multilingual-support/test_batch_invoke.py
+
+from adapter_manager import LoraAdapterManager
+from fake_runtime import FakeSageMakerRuntime
+from inference_handler import CustomerSupportInference
+from metrics import MetricsRegistry
+from resilience import CircuitBreaker, RetryPolicy
+
+
+def _manager(**overrides):
+    settings = dict(base_latency_seconds=0.001, per_token_seconds=0.0005,
+                    cold_load_seconds=0.01, response_tokens=8, seed=7)
+    settings.update(overrides)
+    manager = LoraAdapterManager(runtime=FakeSageMakerRuntime(**settings), metrics=MetricsRegistry(enabled=False))
+    # Surface every injected ModelError in its own slot instead of retrying it away
+    manager.retry_policy = RetryPolicy(max_attempts=1)
+    manager.circuit_breaker = CircuitBreaker(failure_threshold=1000)
+    return manager
+
+
+def test_invoke_many_keeps_input_order():
+    manager = _manager()
+    requests = [{'input_text': f"pedido {i}"} for i in range(12)]
+    requests[5] = {'input_text': "commande 5", 'language': 'french', 'domain': 'billing'}
+
+    results = manager.invoke_many(requests, max_workers=4)
+    assert [result['status'] for result in results] == ['success'] * 12
+    for request, result in zip(requests, results):
+        assert f"{request['input_text']} " in result['response']
+    assert '[fr-billing-support]' in results[5]['response']
+    assert manager.invoke_many([]) == []
+
+
+def test_invoke_many_reports_failures_in_their_own_slot():
+    manager = _manager(model_error_rate=0.5)
+    requests = [{'input_text': f"pedido {i}"} for i in range(12)]
+    requests.insert(3, {'language': 'french', 'domain': 'billing'})
+
+    results = manager.invoke_many(requests, max_workers=4)
+    assert len(results) == len(requests)
+    assert results[3] == {'status': 'error', 'error_message': "'input_text'"}
+
+    statuses = {result['status'] for i, result in enumerate(results) if i != 3}
+    assert statuses == {'success', 'error'}
+    for request, result in zip(requests, results):
+        if result['status'] == 'success':
+            assert f"{request['input_text']} " in result['response']
+        else:
+            assert result['error_message']
+    model_errors = sum(result['status'] == 'error' for result in results) - 1
+    assert model_errors == manager.runtime.stats()['model_errors']
+
+
+def test_process_queries_keeps_order_and_isolates_failures():
+    handler = CustomerSupportInference(adapter_manager=_manager(model_error_rate=1.0))
+    queries = ["Hola, mi producto no funciona", "Bonjour, ma facture est fausse", "Привет, мой заказ"]
+    results = handler.process_queries(queries, max_workers=2)
+    assert [result['status'] for result in results] == ['error'] * 3
+    assert [result['language'] for result in results] == ['spanish', 'french', 'russian']
+
+    handler = CustomerSupportInference(adapter_manager=_manager())
+    results = handler.process_queries(queries, max_workers=2)
+    assert [result['query'] for result in results] == queries
+    assert all(result['status'] == 'success' for result in results)
+    assert handler.process_queries([]) == []
+
+
+if __name__ == "__main__":
+    test_invoke_many_keeps_input_order()
+    test_invoke_many_reports_failures_in_their_own_slot()
+    test_process_queries_keeps_order_and_isolates_failures()
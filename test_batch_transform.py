@@ -0,0 +1,101 @@
+# File: multilingual-support/test_batch_transform.py
+
+import json
+
+import boto3
+from botocore.stub import ANY, Stubber
+
+from adapter_manager import LoraAdapterManager
+from batch_transform import BatchTransformWorkflow
+from fake_runtime import FakeSageMakerRuntime
+from fake_s3 import FakeS3Client
+from inference_handler import CustomerSupportInference
+
+QUERIES = [
+    "Hola, tengo un error",
+    "Bonjour, ma invoice est fausse",
+    "Hola, el pago failed",
+    "Привет, не работает, error",
+    "Hola otra vez, error",
+]
+
+
+def _workflow(sm_client, s3_client, max_records_per_shard=2):
+    manager = LoraAdapterManager(runtime=FakeSageMakerRuntime(time_scale=0))
+    return BatchTransformWorkflow(
+        sm_client=sm_client,
+        s3_client=s3_client,
+        adapter_manager=manager,
+        bucket='test-bucket',
+        detector=CustomerSupportInference(adapter_manager=manager)._detect_language_and_domain,
+        max_records_per_shard=max_records_per_shard,
+    )
+
+
+def _fake_transform_outputs(s3_client, manifest):
+    """Write the outputs a transform job would produce: one response line per input line"""
+    for shard in manifest['shards']:
+        body = s3_client.get_object(Bucket='test-bucket', Key=shard['key'])['Body'].read().decode('utf-8')
+        lines = [json.dumps({'generated_text': f"answer to {json.loads(line)['inputs']}"})
+                 for line in body.splitlines()]
+        output_key = shard['key'].replace('/input/', '/output/') + '.out'
+        s3_client.put_object(Bucket='test-bucket', Key=output_key, Body='\n'.join(lines))
+
+
+def test_batch_transform_round_trip(tmp_path):
+    s3_client = FakeS3Client()
+    s3_client.create_bucket(Bucket='test-bucket')
+    sm_client = boto3.client('sagemaker', region_name='us-east-2',
+                             aws_access_key_id='test', aws_secret_access_key='test')
+    workflow = _workflow(sm_client, s3_client)
+
+    query_file = tmp_path / 'queries.txt'
+    query_file.write_text('\n'.join(QUERIES), encoding='utf-8')
+    manifest = workflow.shard_queries(QUERIES, 'job-1')
+
+    adapters = [shard['adapter'] for shard in manifest['shards']]
+    assert adapters.count('es-technical-support') == 2  # three records, two per shard
+    assert sorted(i for shard in manifest['shards'] for i in shard['indices']) == list(range(5))
+
+    _fake_transform_outputs(s3_client, manifest)
+    merged = list(workflow.merge_outputs(manifest))
+    assert [index for index, _ in merged] == list(range(5))
+    assert merged[1][1] == f"answer to {QUERIES[1]}"
+
+    with Stubber(sm_client) as stubber:
+        stubber.add_response('create_transform_job', {'TransformJobArn': 'arn:aws:sagemaker:job/job-1'}, {
+            'TransformJobName': 'job-1',
+            'ModelName': 'multilingual-support',
+            'MaxConcurrentTransforms': 4,
+            'MaxPayloadInMB': 6,
+            'BatchStrategy': 'SingleRecord',
+            'TransformInput': ANY,
+            'TransformOutput': ANY,
+            'TransformResources': ANY,
+        })
+        for _ in range(2):
+            stubber.add_response('describe_transform_job', {
+                'TransformJobName': 'job-1',
+                'TransformJobArn': 'arn:aws:sagemaker:job/job-1',
+                'TransformJobStatus': 'Completed',
+                'ModelName': 'multilingual-support',
+                'TransformInput': {'DataSource': {'S3DataSource': {'S3DataType': 'S3Prefix', 'S3Uri': 's3://x'}}},
+                'TransformResources': {'InstanceType': 'ml.g5.2xlarge', 'InstanceCount': 1},
+                'CreationTime': '2024-01-01T00:00:00Z',
+            }, {'TransformJobName': 'job-1'})
+
+        output_file = tmp_path / 'results.jsonl'
+        summary = workflow.run(str(query_file), str(output_file), job_name='job-1', delay=1)
+        stubber.assert_no_pending_responses()
+
+    rows = [json.loads(line) for line in output_file.read_text(encoding='utf-8').splitlines()]
+    assert summary['records'] == 5
+    assert [row['query'] for row in rows] == QUERIES
+    assert all(row['response'] == f"answer to {row['query']}" for row in rows)
+
+
+if __name__ == "__main__":
+    import tempfile
+    from pathlib import Path
+    with tempfile.TemporaryDirectory() as tmp:
+        test_batch_transform_round_trip(Path(tmp))
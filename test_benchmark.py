@@ -0,0 +1,51 @@
+# File: multilingual-support/test_benchmark.py
+
+from benchmark import DEFAULT_CORPUS, build_handler, compare_results, format_ms, percentile, run_benchmark
+
+
+def test_percentile_nearest_rank():
+    values = list(range(1, 101))
+    assert percentile(values, 0.50) == 50
+    assert percentile(values, 0.99) == 99
+    assert percentile([], 0.5) is None
+
+
+def test_benchmark_against_fake_backend():
+    handler = build_handler('fake', fake_options={'time_scale': 0, 'seed': 1})
+    results = run_benchmark(handler, DEFAULT_CORPUS, num_requests=24, concurrency=4)
+    assert results['overall']['requests'] == 24
+    assert results['overall']['error_rate'] == 0.0
+    assert sum(group['requests'] for group in results['per_adapter'].values()) == 24
+    assert compare_results(results, results) == []
+
+
+def test_closed_loop_latency_excludes_client_queueing():
+    fake_options = {'time_scale': 0.02, 'seed': 1, 'cold_load_seconds': 0}
+    handler = build_handler('fake', fake_options=fake_options)
+    runtime = handler.adapter_manager.runtime
+    service_ms = (runtime.base_latency_seconds + runtime.response_tokens * runtime.per_token_seconds) \
+        * fake_options['time_scale'] * 1000
+    # 24 requests through 4 workers: timing from submission would put p50 near 3x the service time
+    results = run_benchmark(handler, DEFAULT_CORPUS, num_requests=24, concurrency=4)
+    assert service_ms * 0.9 <= results['overall']['latency_ms']['p50'] < service_ms * 2
+
+
+def test_errors_are_counted_against_their_adapter():
+    handler = build_handler('fake', fake_options={'time_scale': 0, 'seed': 1, 'model_error_rate': 1.0})
+    results = run_benchmark(handler, DEFAULT_CORPUS, num_requests=12, concurrency=4)
+    assert results['overall']['error_rate'] == 1.0
+    assert 'unknown' not in results['per_adapter']
+    assert all(group['error_rate'] == 1.0 for group in results['per_adapter'].values())
+
+
+def test_format_ms_without_requests():
+    assert format_ms(None) == 'n/a'
+    assert format_ms(12.4) == '12ms'
+
+
+if __name__ == "__main__":
+    test_percentile_nearest_rank()
+    test_benchmark_against_fake_backend()
+    test_closed_loop_latency_excludes_client_queueing()
+    test_errors_are_counted_against_their_adapter()
+    test_format_ms_without_requests()
@@ -0,0 +1,61 @@
+# File: multilingual-support/test_bulk.py
+
+import json
+
+import pytest
+
+from bulk import process_jsonl
+
+
+class EchoHandler:
+    def __init__(self, crash_on=None):
+        self.crash_on = crash_on
+        self.seen = []
+
+    def process_query(self, query):
+        if query == self.crash_on:
+            raise SystemError('worker crashed')
+        self.seen.append(query)
+        return {'status': 'success', 'response': query.upper()}
+
+
+def _write_input(path, count):
+    with open(path, 'w', encoding='utf-8') as f:
+        for i in range(count):
+            f.write(json.dumps({'id': i, 'query': f'pregunta {i}'}) + '\n')
+        f.write('not json\n')
+
+
+def test_results_in_order_with_invalid_lines(tmp_path):
+    input_path, output_path = tmp_path / 'in.jsonl', tmp_path / 'out.jsonl'
+    _write_input(input_path, 25)
+
+    summary = process_jsonl(str(input_path), str(output_path), handler=EchoHandler(), concurrency=4)
+    rows = [json.loads(line) for line in output_path.read_text(encoding='utf-8').splitlines()]
+    assert summary == {'processed': 26, 'failed': 1, 'lines_done': 26}
+    assert [row['id'] for row in rows[:25]] == list(range(25))
+    assert rows[-1]['result']['status'] == 'error'
+
+
+def test_rerun_resumes_from_checkpoint(tmp_path):
+    input_path, output_path = tmp_path / 'in.jsonl', tmp_path / 'out.jsonl'
+    _write_input(input_path, 40)
+
+    with pytest.raises(SystemError):
+        process_jsonl(str(input_path), str(output_path), handler=EchoHandler(crash_on='pregunta 30'),
+                      concurrency=2, checkpoint_every=5)
+
+    resumed = EchoHandler()
+    summary = process_jsonl(str(input_path), str(output_path), handler=resumed, concurrency=2, checkpoint_every=5)
+    assert 'pregunta 0' not in resumed.seen
+    assert summary['lines_done'] == 41
+
+    rows = [json.loads(line) for line in output_path.read_text(encoding='utf-8').splitlines()]
+    assert [row['id'] for row in rows[:40]] == list(range(40))
+
+
+if __name__ == "__main__":
+    import tempfile
+    from pathlib import Path
+    with tempfile.TemporaryDirectory() as tmp:
+        test_results_in_order_with_invalid_lines(Path(tmp))
@@ -0,0 +1,100 @@
+# File: multilingual-support/test_cleanup.py
+
+import threading
+from botocore.exceptions import ClientError
+from cleanup import ResourceCleaner
+from config import SAGEMAKER_CONFIG
+from fake_s3 import FakeS3Client
+
+
+class _FakeSageMaker:
+    """Deletions block until all three run at once, so sequential deletes would fail"""
+
+    class exceptions:
+        ClientError = ClientError
+
+    def __init__(self, missing=()):
+        self.missing = set(missing)
+        self.barrier = threading.Barrier(3, timeout=2)
+        self.deleted = []
+        self.waited = []
+
+    def _delete(self, kind, name):
+        self.barrier.wait()
+        if kind in self.missing:
+            raise ClientError({'Error': {'Code': 'ValidationException',
+                                         'Message': f"Could not find {kind} \"{name}\"."}}, 'Delete')
+        self.deleted.append(kind)
+
+    def delete_endpoint(self, EndpointName):
+        self._delete('endpoint', EndpointName)
+
+    def delete_endpoint_config(self, EndpointConfigName):
+        self._delete('endpoint configuration', EndpointConfigName)
+
+    def delete_model(self, ModelName):
+        self._delete('model', ModelName)
+
+    def get_waiter(self, name):
+        sm_client = self
+
+        class Waiter:
+            def wait(self, **kwargs):
+                sm_client.waited.append((name, kwargs['EndpointName']))
+        return Waiter()
+
+
+def _versioned_bucket():
+    s3 = FakeS3Client()
+    s3.create_bucket(Bucket='lora-bucket')
+    s3.put_bucket_versioning(Bucket='lora-bucket', VersioningConfiguration={'Status': 'Enabled'})
+    for i in range(1500):
+        s3.put_object(Bucket='lora-bucket', Key=f"lora-adapters/{i:04d}", Body=b'x')
+    for i in range(300):
+        s3.put_object(Bucket='lora-bucket', Key=f"lora-adapters/{i:04d}", Body=b'yy')
+    s3.delete_objects(Bucket='lora-bucket', Delete={'Objects': [{'Key': f"lora-adapters/{i:04d}"}
+                                                                for i in range(1400, 1500)]})
+    return s3
+
+
+def test_sagemaker_resources_are_deleted_concurrently_and_awaited():
+    sm_client = _FakeSageMaker()
+    deleted = ResourceCleaner(sm_client=sm_client, s3_client=FakeS3Client()).delete_endpoint()
+    assert deleted == {'endpoint': True, 'endpoint_config': True, 'model': True}
+    assert sm_client.waited == [('endpoint_deleted', SAGEMAKER_CONFIG['endpoint_name'])]
+
+    sm_client = _FakeSageMaker(missing={'endpoint', 'model'})
+    deleted = ResourceCleaner(sm_client=sm_client, s3_client=FakeS3Client()).delete_endpoint()
+    assert deleted == {'endpoint': False, 'endpoint_config': True, 'model': False}
+    assert sm_client.waited == []
+
+
+def test_dry_run_counts_versions_without_deleting():
+    s3 = _versioned_bucket()
+    report = ResourceCleaner(sm_client=_FakeSageMaker(), s3_client=s3, dry_run=True) \
+        .empty_and_delete_bucket('lora-bucket')
+    assert report['dry_run']
+    assert (report['objects'], report['versions'], report['delete_markers']) == (1400, 1800, 100)
+    assert report['bytes'] == 1500 + 300 * 2
+    assert report['deleted'] == 0
+    assert s3.calls.get('DeleteObjects') == 1  # only the setup's delete markers
+
+
+def test_versioned_bucket_is_purged_and_deleted():
+    s3 = _versioned_bucket()
+    report = ResourceCleaner(sm_client=_FakeSageMaker(), s3_client=s3, delete_workers=4) \
+        .empty_and_delete_bucket('lora-bucket')
+    assert report['deleted'] == 1900
+    assert s3.calls['DeleteObjects'] == 1 + 2  # 1900 versions and markers in batches of 1000
+    assert s3.calls['DeleteBucket'] == 1
+    assert 'lora-bucket' not in s3._buckets
+
+    # A missing bucket is not an error
+    assert ResourceCleaner(sm_client=_FakeSageMaker(), s3_client=s3) \
+        .empty_and_delete_bucket('lora-bucket')['deleted'] == 0
+
+
+if __name__ == "__main__":
+    test_sagemaker_resources_are_deleted_concurrently_and_awaited()
+    test_dry_run_counts_versions_without_deleting()
+    test_versioned_bucket_is_purged_and_deleted()
@@ -0,0 +1,118 @@
+# File: multilingual-support/test_deadline.py
+
+from adapter_manager import LoraAdapterManager
+from deadline import Deadline, DeadlineExceeded, max_tokens_within, read_timeout_for
+from fake_runtime import FakeSageMakerRuntime
+from inference_handler import CustomerSupportInference
+from metrics import MetricsRegistry
+from resilience import RetryPolicy
+from single_flight import SingleFlight
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class MaxJitter:
+    """Stands in for random.Random so backoff always returns its ceiling"""
+
+    def uniform(self, low, high):
+        return high
+
+
+def _manager(runtime):
+    return LoraAdapterManager(runtime=runtime, metrics=MetricsRegistry(enabled=False))
+
+
+def test_deadline_budget_and_helpers():
+    clock = FakeClock()
+    deadline = Deadline(1.5, clock=clock)
+    clock.now = 0.4
+    assert abs(deadline.remaining() - 1.1) < 1e-9
+    assert read_timeout_for(1.1) == 1
+    assert read_timeout_for(0.1) is None
+    assert max_tokens_within(1.16, 512) == 50
+    assert max_tokens_within(60, 256) == 256
+    clock.now = 1.6
+    try:
+        deadline.check('detect')
+        assert False, "expected DeadlineExceeded"
+    except DeadlineExceeded as e:
+        assert e.stage == 'detect'
+
+
+def test_tight_deadline_shrinks_max_new_tokens():
+    runtime = FakeSageMakerRuntime(time_scale=0, response_tokens=512)
+    manager = _manager(runtime)
+    manager.invoke_model("Mi router no funciona", 'spanish', 'technical', deadline=1.0)
+    assert runtime.stats()['tokens_generated'] == max_tokens_within(1.0, 512)
+    manager.invoke_model("Mi router no funciona", 'spanish', 'technical')
+    assert runtime.stats()['tokens_generated'] == max_tokens_within(1.0, 512) + 512
+
+
+def test_retry_skipped_when_it_cannot_finish_in_time():
+    runtime = FakeSageMakerRuntime(time_scale=0, throttle_rate=1.0)
+    manager = _manager(runtime)
+    manager.retry_policy = RetryPolicy(max_attempts=5, throttle_base_delay=2.0, throttle_max_delay=2.0,
+                                       rng=MaxJitter())
+    try:
+        manager.invoke_model("Bonjour", 'french', 'technical', deadline=1.5)
+        assert False, "expected DeadlineExceeded"
+    except DeadlineExceeded as e:
+        assert e.stage == 'invoke_endpoint'
+    assert runtime.stats()['requests'] == 1
+
+
+def test_process_query_returns_structured_result():
+    handler = CustomerSupportInference(adapter_manager=_manager(FakeSageMakerRuntime(time_scale=0)))
+    result = handler.process_query("Hola, mi pago falló", deadline=0.1)
+    assert result['status'] == 'deadline_exceeded'
+    assert result['stage'] == 'invoke_model'
+    assert result['budget_seconds'] == 0.1
+    assert handler.process_query("Hola, mi pago falló", deadline=5.0)['status'] == 'success'
+
+
+class RecordingSingleFlight(SingleFlight):
+    def __init__(self):
+        super().__init__()
+        self.keys = []
+
+    def do(self, key, fn, timeout=None):
+        self.keys.append(key)
+        return super().do(key, fn, timeout=timeout)
+
+
+def test_callers_without_a_deadline_do_not_share_a_deadline_flight():
+    manager = _manager(FakeSageMakerRuntime(time_scale=0, response_tokens=512))
+    manager.single_flight = RecordingSingleFlight()
+    manager.invoke_model("Hola", 'spanish', 'technical')
+    manager.invoke_model("Hola", 'spanish', 'technical', deadline=30)
+    manager.invoke_model("Hola", 'spanish', 'technical', deadline=Deadline(30))
+    no_deadline, with_deadline, same_budget = manager.single_flight.keys
+    assert no_deadline != with_deadline
+    assert with_deadline == same_budget
+
+
+def test_deadline_exceeded_without_a_deadline_is_still_a_result():
+    # e.g. raised by the leader of a coalesced call that had a deadline
+    def inherited_timeout(**kwargs):
+        raise DeadlineExceeded("Endpoint call timed out within the deadline", stage='invoke_endpoint')
+
+    manager = _manager(FakeSageMakerRuntime(time_scale=0))
+    manager.invoke_model = inherited_timeout
+    result = CustomerSupportInference(adapter_manager=manager).process_query("Hola")
+    assert result['status'] == 'deadline_exceeded'
+    assert result['budget_seconds'] is None
+
+
+if __name__ == "__main__":
+    test_deadline_budget_and_helpers()
+    test_tight_deadline_shrinks_max_new_tokens()
+    test_retry_skipped_when_it_cannot_finish_in_time()
+    test_process_query_returns_structured_result()
+    test_callers_without_a_deadline_do_not_share_a_deadline_flight()
+    test_deadline_exceeded_without_a_deadline_is_still_a_result()
@@ -0,0 +1,63 @@
+# File: multilingual-support/test_fake_runtime.py
+
+import json
+
+import pytest
+
+from adapter_manager import LoraAdapterManager
+from fake_runtime import FakeSageMakerRuntime
+from inference_handler import CustomerSupportInference
+
+
+def _fast_runtime(**overrides):
+    settings = dict(base_latency_seconds=0.001, per_token_seconds=0.0005,
+                    cold_load_seconds=0.01, response_tokens=8, seed=7)
+    settings.update(overrides)
+    return FakeSageMakerRuntime(**settings)
+
+
+def test_invoke_model_against_fake_runtime():
+    manager = LoraAdapterManager(runtime=_fast_runtime())
+    response = manager.invoke_model("Hola, mi producto no funciona", 'spanish', 'technical')
+    assert response.startswith('[es-technical-support]')
+
+
+def test_lora_cache_evicts_least_recently_used():
+    runtime = _fast_runtime(max_cpu_lora=2)
+    manager = LoraAdapterManager(runtime=runtime)
+    for language in ('spanish', 'french', 'russian', 'spanish'):
+        manager.invoke_model('hola', language, 'billing')
+    stats = runtime.stats()
+    assert stats['adapter_loads'] == 4
+    assert stats['adapter_evictions'] == 2
+    assert runtime.resident_adapters() == ['ru-billing-support', 'es-billing-support']
+
+
+def test_injected_model_error_uses_boto3_shape():
+    runtime = _fast_runtime(model_error_rate=1.0)
+    with pytest.raises(runtime.exceptions.ModelError) as excinfo:
+        runtime.invoke_endpoint(EndpointName='multilingual-support', Body=json.dumps({'inputs': 'hola'}))
+    assert excinfo.value.response['Error']['Code'] == 'ModelError'
+
+
+def test_rolling_batch_limits_concurrency():
+    runtime = _fast_runtime(max_rolling_batch_size=4, per_token_seconds=0.002)
+    manager = LoraAdapterManager(runtime=runtime)
+    results = manager.invoke_many([{'input_text': f'q{i}'} for i in range(16)])
+    assert all(result['status'] == 'success' for result in results)
+    assert 'q3' in results[3]['response']
+    assert runtime.stats()['max_active'] <= 4
+
+
+def test_streaming_through_handler():
+    handler = CustomerSupportInference(adapter_manager=LoraAdapterManager(runtime=_fast_runtime()))
+    tokens = list(handler.process_query_stream("Bonjour, merci, mon invoice est fausse"))
+    assert ''.join(tokens).startswith('[fr-billing-support]')
+    assert handler.adapter_manager.stream_stats.summary()['streams'] == 1
+
+
+if __name__ == "__main__":
+    test_invoke_model_against_fake_runtime()
+    test_lora_cache_evicts_least_recently_used()
+    test_rolling_batch_limits_concurrency()
+    test_streaming_through_handler()
@@ -0,0 +1,85 @@
+# File: multilingual-support/test_hedging.py
+
+import threading
+import time
+
+from adapter_manager import LoraAdapterManager
+from fake_runtime import FakeSageMakerRuntime
+from hedging import HedgedInvoker, LatencyTracker
+from metrics import MetricsRegistry
+
+
+class FixedTracker(LatencyTracker):
+    """Always reports a tiny latency so every call outlives the hedge delay"""
+
+    def record(self, key, seconds):
+        pass
+
+    def count(self, key):
+        return 100
+
+    def quantile(self, key, q):
+        return 0.001
+
+
+def test_no_hedging_without_history():
+    invoker = HedgedInvoker(min_samples=5, max_hedge_ratio=1.0, max_workers=4)
+    assert invoker.call('es-technical-support', lambda: 'ok') == 'ok'
+    assert invoker.stats()['hedges_sent'] == 0
+
+
+def test_slow_primary_is_hedged_and_hedge_wins():
+    invoker = HedgedInvoker(quantile=0.95, min_delay=0.01, min_samples=3, max_hedge_ratio=1.0, max_workers=4)
+    for _ in range(3):
+        invoker.tracker.record('fr-billing-support', 0.01)
+
+    attempts = []
+    lock = threading.Lock()
+
+    def call():
+        with lock:
+            attempts.append(1)
+            first = len(attempts) == 1
+        time.sleep(0.5 if first else 0.01)
+        return 'slow' if first else 'fast'
+
+    assert invoker.call('fr-billing-support', call) == 'fast'
+    stats = invoker.stats()
+    assert stats['hedges_sent'] == 1
+    assert stats['hedge_wins'] == 1
+
+
+def test_hedge_rate_is_capped():
+    invoker = HedgedInvoker(min_delay=0.001, min_samples=1, max_hedge_ratio=0.25, max_workers=8,
+                            tracker=FixedTracker())
+
+    def slow_call():
+        time.sleep(0.01)
+        return 'ok'
+
+    for _ in range(20):
+        invoker.call('ru-product-support', slow_call)
+    stats = invoker.stats()
+    assert stats['hedges_sent'] <= 20 * 0.25
+    assert stats['budget_denied'] > 0
+
+
+def test_hedges_do_not_earn_retry_budget():
+    manager = LoraAdapterManager(runtime=FakeSageMakerRuntime(time_scale=0.01, cold_load_seconds=0),
+                                 metrics=MetricsRegistry(enabled=False))
+    manager.hedger = HedgedInvoker(min_delay=0.001, min_samples=1, max_hedge_ratio=1.0, max_workers=8,
+                                   tracker=FixedTracker())
+    recorded = []
+    manager.retry_policy.budget.record_request = lambda: recorded.append(1)
+
+    for _ in range(5):
+        manager.invoke_model("Hola", 'spanish', 'technical')
+    assert manager.hedger.stats()['hedges_sent'] > 0
+    assert len(recorded) == 5
+
+
+if __name__ == "__main__":
+    test_no_hedging_without_history()
+    test_slow_primary_is_hedged_and_hedge_wins()
+    test_hedge_rate_is_capped()
+    test_hedges_do_not_earn_retry_budget()
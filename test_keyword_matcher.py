@@ -0,0 +1,53 @@
+# File: multilingual-support/test_keyword_matcher.py
+
+from keyword_matcher import KeywordMatcher, get_default_matcher
+
+
+def test_matches_previous_detection_on_sample_queries():
+    matcher = get_default_matcher()
+    expected = {
+        "Hola, mi producto no está funcionando correctamente": ('spanish', 'technical'),
+        "Bonjour, merci pour l'invoice": ('french', 'billing'),
+        "Привет, какие features?": ('russian', 'product'),
+        "Something unrelated": ('spanish', 'technical'),
+    }
+    for query, (language, domain) in expected.items():
+        detection = matcher.detect(query)
+        assert (detection['language'], detection['domain']) == (language, domain)
+
+
+def test_scores_and_confidence():
+    matcher = KeywordMatcher(
+        {'spanish': {'hola': 1.0}, 'french': {'bonjour': 1.0, 'merci': 2.0}},
+        {'billing': {'invoice': 1.0, 'payment': 1.0}, 'technical': {'error': 1.0}},
+        'spanish', 'technical'
+    )
+    detection = matcher.detect("Hola! Bonjour, MERCI: invoice error, payment")
+    assert detection['language'] == 'french'
+    assert detection['language_scores'] == {'spanish': 1.0, 'french': 3.0}
+    assert detection['language_confidence'] == 0.75
+    assert detection['domain'] == 'billing'
+
+    fallback = matcher.detect("nothing here")
+    assert fallback['language'] == 'spanish' and fallback['language_confidence'] == 0.0
+
+
+def test_longest_overlapping_marker_wins():
+    matcher = KeywordMatcher({'english': {'hi': 1.0}},
+                             {'technical': {'not working': 2.0}, 'other': {'not': 1.0, 'no': 1.0}},
+                             'english', 'other')
+    detection = matcher.detect("It is NOT WORKING")
+    assert detection['domain_scores'] == {'technical': 2.0, 'other': 0.0}
+
+
+def test_detect_many_preserves_order():
+    matcher = get_default_matcher()
+    results = matcher.detect_many(["bonjour", "привет", "hola"])
+    assert [r['language'] for r in results] == ['french', 'russian', 'spanish']
+
+
+if __name__ == "__main__":
+    test_matches_previous_detection_on_sample_queries()
+    test_scores_and_confidence()
+    test_longest_overlapping_marker_wins()
+    test_detect_many_preserves_order()
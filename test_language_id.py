@@ -0,0 +1,111 @@
+# File: multilingual-support/test_language_id.py
+
+import numpy as np
+import pytest
+from config import LANGUAGE_ID_CONFIG
+from keyword_matcher import KeywordMatcher, get_default_matcher
+from language_id import LanguageDetector, NgramLanguageIdentifier, get_default_detector, hashed_ngrams
+
+TRAINING_SAMPLES = [
+    ("Mi producto no funciona desde ayer y necesito ayuda", 'spanish'),
+    ("¿Cuándo llegará mi pedido? Lo compré la semana pasada", 'spanish'),
+    ("No puedo iniciar sesión en mi cuenta, la contraseña es incorrecta", 'spanish'),
+    ("Quiero cambiar la dirección de envío de mi compra", 'spanish'),
+    ("Mon produit ne fonctionne plus depuis hier, j'ai besoin d'aide", 'french'),
+    ("Quand est-ce que ma commande va arriver ? Je l'ai achetée la semaine dernière", 'french'),
+    ("Je ne peux pas me connecter à mon compte, le mot de passe est incorrect", 'french'),
+    ("Je voudrais changer l'adresse de livraison de mon achat", 'french'),
+    ("Мой продукт не работает со вчерашнего дня, нужна помощь", 'russian'),
+    ("Когда придёт мой заказ? Я купил его на прошлой неделе", 'russian'),
+    ("Не могу войти в аккаунт, пароль неверный", 'russian'),
+    ("Хочу изменить адрес доставки моей покупки", 'russian'),
+]
+
+
+def _train():
+    return NgramLanguageIdentifier.train(TRAINING_SAMPLES, n_features=2 ** 14)
+
+
+def test_hashed_ngrams_do_not_cross_texts():
+    rows, buckets = hashed_ngrams(["ab", "c"], (1, 2), 2 ** 10)
+    # " ab " has 4 unigrams and 3 bigrams, " c " has 3 unigrams and 2 bigrams
+    assert np.bincount(rows).tolist() == [7, 5]
+    assert buckets.min() >= 0 and buckets.max() < 2 ** 10
+
+
+def test_detects_languages_without_markers():
+    model = _train()
+    predictions = model.predict([
+        "Mi cuenta no funciona",
+        "Ma commande n'est pas arrivée",
+        "Мой заказ не пришёл",
+    ])
+    assert [language for language, _ in predictions] == ['spanish', 'french', 'russian']
+    assert np.allclose(model.predict_proba(["hola"]).sum(axis=1), 1.0)
+
+
+def test_save_and_memory_mapped_load(tmp_path):
+    model = _train()
+    path = str(tmp_path / 'language_id.bin')
+    model.save(path)
+    loaded = NgramLanguageIdentifier.load(path)
+    assert isinstance(loaded.weights, np.memmap)
+    assert loaded.labels == model.labels
+    texts = ["Je voudrais de l'aide", "Necesito ayuda con mi pedido"]
+    assert np.allclose(loaded.predict_proba(texts), model.predict_proba(texts))
+
+
+def test_detector_combines_model_language_with_keyword_domain():
+    detector = LanguageDetector(_train(), get_default_matcher(), min_confidence=0.6)
+    detection = detector.detect("Ma facture est fausse, le payment a échoué")
+    assert detection['language'] == 'french'
+    assert detection['language_source'] == 'model'
+    assert detection['domain'] == 'billing'
+
+    strict = LanguageDetector(_train(), get_default_matcher(), min_confidence=1.1)
+    results = strict.detect_many(["Bonjour", "Ma commande"])
+    assert [r['language_source'] for r in results] == ['keywords', 'keywords']
+    assert [r['language'] for r in results] == ['french', 'spanish']
+
+
+def test_load_rejects_languages_without_adapters(tmp_path):
+    path = str(tmp_path / 'language_id.bin')
+    NgramLanguageIdentifier.train(TRAINING_SAMPLES + [("Hello, my order is late", 'english')],
+                                  labels=['spanish', 'french', 'russian', 'english'],
+                                  n_features=2 ** 14).save(path)
+    with pytest.raises(ValueError, match='english'):
+        NgramLanguageIdentifier.load(path)
+    assert 'english' in NgramLanguageIdentifier.load(path, allowed_labels=['spanish', 'french', 'russian',
+                                                                            'english']).labels
+
+
+def test_default_detector_trains_from_seed_corpus_without_weights(tmp_path, monkeypatch):
+    monkeypatch.setitem(LANGUAGE_ID_CONFIG, 'weights_path', str(tmp_path / 'missing.bin'))
+    get_default_detector.cache_clear()
+    try:
+        detector = get_default_detector()
+        assert isinstance(detector, LanguageDetector)
+        detection = detector.detect("Quisiera saber dónde está mi paquete")
+        assert detection['language'] == 'spanish'
+        assert detection['language_source'] == 'model'
+
+        monkeypatch.setitem(LANGUAGE_ID_CONFIG, 'seed_samples_path', str(tmp_path / 'missing.jsonl'))
+        get_default_detector.cache_clear()
+        assert isinstance(get_default_detector(), KeywordMatcher)
+    finally:
+        get_default_detector.cache_clear()
+
+
+if __name__ == "__main__":
+    import tempfile
+    from pathlib import Path
+    test_hashed_ngrams_do_not_cross_texts()
+    test_detects_languages_without_markers()
+    with tempfile.TemporaryDirectory() as tmp:
+        test_save_and_memory_mapped_load(Path(tmp))
+    test_detector_combines_model_language_with_keyword_domain()
+    with tempfile.TemporaryDirectory() as tmp:
+        test_load_rejects_languages_without_adapters(Path(tmp))
+    with tempfile.TemporaryDirectory() as tmp:
+        with pytest.MonkeyPatch.context() as monkeypatch:
+            test_default_detector_trains_from_seed_corpus_without_weights(Path(tmp), monkeypatch)
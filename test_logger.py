@@ -0,0 +1,70 @@
+# File: multilingual-support/test_logger.py
+
+import json
+import logging
+import os
+import subprocess
+import sys
+import textwrap
+
+from logger import JsonFormatter, RequestSampleFilter, setup_logger
+
+
+def test_setup_logger_is_idempotent():
+    first = setup_logger('test_logger_idempotent')
+    second = setup_logger('test_logger_idempotent')
+    assert first is second
+    assert len(second.handlers) == 1
+
+
+def test_json_formatter_includes_extra_fields():
+    record = logging.LogRecord('inference_handler', logging.INFO, __file__, 1,
+                               "Detected language: %s", ('french',), None)
+    record.adapter = 'fr-billing-support'
+    entry = json.loads(JsonFormatter().format(record))
+    assert entry['message'] == 'Detected language: french'
+    assert entry['adapter'] == 'fr-billing-support'
+
+
+def test_request_sampling_only_affects_per_request_info():
+    sampler = RequestSampleFilter(rate=0.0)
+    per_request = logging.LogRecord('x', logging.INFO, __file__, 1, 'detected', (), None)
+    per_request.per_request = True
+    warning = logging.LogRecord('x', logging.WARNING, __file__, 1, 'retry', (), None)
+    warning.per_request = True
+    plain = logging.LogRecord('x', logging.INFO, __file__, 1, 'startup', (), None)
+    assert not sampler.filter(per_request)
+    assert sampler.filter(warning)
+    assert sampler.filter(plain)
+
+
+def test_records_logged_after_shutdown_are_written(tmp_path):
+    # atexit hooks run last-registered first, so this one runs after the listener stopped
+    script = textwrap.dedent("""
+        import atexit
+        from logger import setup_logger, shutdown_logging
+
+        def late():
+            setup_logger('early').warning('logged after shutdown')
+            setup_logger('created_late').warning('from a new logger')
+
+        atexit.register(late)
+        setup_logger('early').info('before shutdown')
+    """)
+    repo = os.path.dirname(os.path.abspath(__file__))
+    completed = subprocess.run([sys.executable, '-c', script], cwd=tmp_path, capture_output=True, text=True,
+                               env={**os.environ, 'PYTHONPATH': repo}, timeout=30)
+    assert completed.returncode == 0, completed.stderr
+    for message in ('before shutdown', 'logged after shutdown', 'from a new logger'):
+        assert message in completed.stdout
+        assert message in (tmp_path / 'logs' / 'application.log').read_text(encoding='utf-8')
+
+
+if __name__ == "__main__":
+    test_setup_logger_is_idempotent()
+    test_json_formatter_includes_extra_fields()
+    test_request_sampling_only_affects_per_request_info()
+    import tempfile
+    from pathlib import Path
+    with tempfile.TemporaryDirectory() as tmp:
+        test_records_logged_after_shutdown_are_written(Path(tmp))
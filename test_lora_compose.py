@@ -0,0 +1,106 @@
+# File: multilingual-support/test_lora_compose.py
+
+import json
+import os
+import numpy as np
+from lora_compose import SafetensorsReader, SafetensorsWriter, compose_adapters
+
+MODULES = {
+    'base_model.model.model.layers.0.self_attn.q_proj': (24, 16),
+    'base_model.model.model.layers.0.self_attn.v_proj': (12, 16),
+}
+
+
+def _write_adapter(path, modules, rank, alpha, seed, dtype='F32'):
+    """Random PEFT adapter; returns each module's scaled update B @ A"""
+    rng = np.random.default_rng(seed)
+    os.makedirs(path)
+    factors, layout = {}, {}
+    for module, (out_features, in_features) in modules.items():
+        factors[module] = (rng.normal(size=(rank, in_features)), rng.normal(size=(out_features, rank)))
+        layout[f"{module}.lora_A.weight"] = (dtype, (rank, in_features))
+        layout[f"{module}.lora_B.weight"] = (dtype, (out_features, rank))
+    with SafetensorsWriter(os.path.join(path, 'adapter_model.safetensors'), layout) as writer:
+        for module, (lora_a, lora_b) in factors.items():
+            writer.write(f"{module}.lora_A.weight", lora_a)
+            writer.write(f"{module}.lora_B.weight", lora_b)
+    with open(os.path.join(path, 'adapter_config.json'), 'w') as f:
+        json.dump({'peft_type': 'LORA', 'r': rank, 'lora_alpha': alpha,
+                   'base_model_name_or_path': 'HuggingFaceH4/zephyr-7b-beta'}, f)
+    return {module: (alpha / rank) * lora_b.astype(np.float32) @ lora_a.astype(np.float32)
+            for module, (lora_a, lora_b) in factors.items()}
+
+
+def _composed_updates(path):
+    tensors = SafetensorsReader(os.path.join(path, 'adapter_model.safetensors'))
+    return {
+        name[:-len('.lora_A.weight')]: tensors.get(name[:-len('A.weight')] + 'B.weight') @ tensors.get(name)
+        for name in tensors.entries if name.endswith('.lora_A.weight')
+    }
+
+
+def test_safetensors_round_trip(tmp_path):
+    values = np.linspace(-3, 3, 12, dtype=np.float32).reshape(3, 4)
+    path = str(tmp_path / 'tensors.safetensors')
+    layout = {'f32': ('F32', (3, 4)), 'f16': ('F16', (3, 4)), 'bf16': ('BF16', (3, 4))}
+    with SafetensorsWriter(path, layout, metadata={'format': 'pt'}) as writer:
+        for name in layout:
+            writer.write(name, values)
+
+    with open(path, 'rb') as f:
+        assert int.from_bytes(f.read(8), 'little') % 8 == 0
+    tensors = SafetensorsReader(path)
+    assert tensors.metadata == {'format': 'pt'}
+    assert np.array_equal(tensors.get('f32'), values)
+    assert np.allclose(tensors.get('f16'), values, atol=1e-3)
+    assert np.allclose(tensors.get('bf16'), values, rtol=1e-2)
+
+
+def test_full_rank_composition_is_exact(tmp_path):
+    language = _write_adapter(str(tmp_path / 'spanish'), MODULES, rank=4, alpha=8, seed=1)
+    domain_modules = {**MODULES, 'base_model.model.model.layers.0.mlp.down_proj': (16, 20)}
+    domain = _write_adapter(str(tmp_path / 'technical'), domain_modules, rank=2, alpha=2, seed=2)
+
+    report = compose_adapters(str(tmp_path / 'spanish'), str(tmp_path / 'technical'),
+                              str(tmp_path / 'es-technical-support'),
+                              language_weight=1.0, domain_weight=0.5, rank=64, output_dtype='F32')
+    assert report['rank'] == 6
+    assert report['max_relative_error'] < 1e-6
+
+    composed = _composed_updates(str(tmp_path / 'es-technical-support'))
+    for module, update in composed.items():
+        expected = language.get(module, 0) + 0.5 * domain[module]
+        assert np.allclose(update, expected, atol=1e-4)
+
+    with open(tmp_path / 'es-technical-support' / 'adapter_config.json') as f:
+        config = json.load(f)
+    assert (config['r'], config['lora_alpha']) == (6, 6)
+    assert config['target_modules'] == ['down_proj', 'q_proj', 'v_proj']
+
+
+def test_truncated_composition_reports_its_error(tmp_path):
+    language = _write_adapter(str(tmp_path / 'french'), MODULES, rank=4, alpha=4, seed=3, dtype='F16')
+    domain = _write_adapter(str(tmp_path / 'billing'), MODULES, rank=4, alpha=4, seed=4, dtype='F16')
+
+    report = compose_adapters(str(tmp_path / 'french'), str(tmp_path / 'billing'),
+                              str(tmp_path / 'fr-billing-support'), rank=3, output_dtype='F32')
+    assert report['rank'] == 3
+    assert report['dtype'] == 'F32'
+
+    composed = _composed_updates(str(tmp_path / 'fr-billing-support'))
+    for layer in report['layers']:
+        module = layer['module']
+        expected = language[module] + domain[module]
+        actual_error = np.linalg.norm(composed[module] - expected) / np.linalg.norm(expected)
+        assert 0 < layer['relative_error'] < 1
+        assert abs(actual_error - layer['relative_error']) < 1e-3
+    assert os.path.exists(tmp_path / 'fr-billing-support' / 'composition_report.json')
+
+
+if __name__ == "__main__":
+    import tempfile
+    from pathlib import Path
+    for test in (test_safetensors_round_trip, test_full_rank_composition_is_exact,
+                 test_truncated_composition_reports_its_error):
+        with tempfile.TemporaryDirectory() as tmp:
+            test(Path(tmp))
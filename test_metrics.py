@@ -0,0 +1,45 @@
+# File: multilingual-support/test_metrics.py
+
+import json
+
+from adapter_manager import LoraAdapterManager
+from fake_runtime import FakeSageMakerRuntime
+from inference_handler import CustomerSupportInference
+from metrics import Histogram, MetricsRegistry
+
+
+def test_histogram_buckets_are_inclusive_and_cumulative():
+    histogram = Histogram([1, 10, 100])
+    for value in (0.5, 1, 5, 1000):
+        histogram.observe(value)
+    assert histogram.cumulative() == {'1': 2, '10': 3, '100': 3, '+Inf': 4}
+
+
+def test_disabled_registry_records_nothing():
+    registry = MetricsRegistry(enabled=False)
+    with registry.stage('detect', language='spanish') as timer:
+        timer.tag(domain='billing')
+    registry.increment('cache_hits')
+    assert registry.snapshot() == {'histograms': [], 'counters': [], 'gauges': []}
+
+
+def test_process_query_stages_are_exported():
+    registry = MetricsRegistry(enabled=True)
+    runtime = FakeSageMakerRuntime(time_scale=0, response_tokens=4)
+    handler = CustomerSupportInference(adapter_manager=LoraAdapterManager(runtime=runtime, metrics=registry))
+    handler.process_query("Hola, tengo un error")
+
+    stages = {h['tags']['stage'] for h in json.loads(registry.to_json())['histograms']}
+    assert {'process_query', 'detect', 'invoke_model', 'encode', 'endpoint', 'decode'} <= stages
+    detect = registry.histogram('stage_latency_ms', stage='detect', language='spanish', domain='technical')
+    assert detect.count == 1
+
+    text = registry.to_prometheus()
+    assert '# TYPE multilingual_support_stage_latency_ms histogram' in text
+    assert 'stage="endpoint"' in text and 'le="+Inf"' in text
+
+
+if __name__ == "__main__":
+    test_histogram_buckets_are_inclusive_and_cumulative()
+    test_disabled_registry_records_nothing()
+    test_process_query_stages_are_exported()
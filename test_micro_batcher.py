@@ -0,0 +1,64 @@
+# File: multilingual-support/test_micro_batcher.py
+
+from concurrent.futures import ThreadPoolExecutor
+from adapter_manager import LoraAdapterManager
+from fake_runtime import FakeSageMakerRuntime
+from metrics import MetricsRegistry
+from micro_batcher import MicroBatcher
+
+
+def _manager(runtime, max_batch_size=4, max_wait_ms=200):
+    manager = LoraAdapterManager(runtime=runtime, metrics=MetricsRegistry(enabled=False))
+    manager.batcher = MicroBatcher(manager._send_batch, max_batch_size=max_batch_size,
+                                   max_wait_ms=max_wait_ms, metrics=manager.metrics)
+    return manager
+
+
+def test_concurrent_requests_share_batched_payloads():
+    runtime = FakeSageMakerRuntime(time_scale=0, responder=lambda inputs, adapter: f"{adapter}: {inputs}")
+    manager = _manager(runtime)
+    queries = [f"question {i}" for i in range(8)]
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        responses = list(executor.map(lambda q: manager.invoke_model(q, 'french', 'billing'), queries))
+
+    for query, response in zip(queries, responses):
+        assert response.startswith(f"fr-billing-support: {query}")
+    assert runtime.stats()['requests'] == 2
+    assert runtime.stats()['batched_inputs'] == 8
+    assert manager.batcher.stats()['mean_batch_size'] == 4
+
+
+def test_adapters_are_never_mixed_and_single_requests_stay_plain():
+    runtime = FakeSageMakerRuntime(time_scale=0, responder=lambda inputs, adapter: f"{adapter}: {inputs}")
+    manager = _manager(runtime, max_wait_ms=50)
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        french, spanish = executor.map(lambda args: manager.invoke_model(*args),
+                                       [("uno", 'french', 'billing'), ("dos", 'spanish', 'billing')])
+    assert french.startswith("fr-billing-support: uno")
+    assert spanish.startswith("es-billing-support: dos")
+    assert runtime.stats()['requests'] == 2
+    assert runtime.stats()['batched_inputs'] == 0
+
+
+def test_batch_failure_reaches_every_caller():
+    def send(payload):
+        raise RuntimeError("endpoint down")
+
+    batcher = MicroBatcher(send, max_batch_size=3, max_wait_ms=200, metrics=MetricsRegistry(enabled=False))
+    payload = {'inputs': 'hola', 'parameters': {'adapter_name': 'es-technical-support'}}
+
+    def submit(_):
+        try:
+            batcher.submit(payload)
+        except RuntimeError as e:
+            return str(e)
+
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        assert list(executor.map(submit, range(3))) == ["endpoint down"] * 3
+    assert batcher.stats()['batches'] == 1
+
+
+if __name__ == "__main__":
+    test_concurrent_requests_share_batched_payloads()
+    test_adapters_are_never_mixed_and_single_requests_stay_plain()
+    test_batch_failure_reaches_every_caller()
@@ -0,0 +1,53 @@
+# File: multilingual-support/test_prompt_shaper.py
+
+from metrics import MetricsRegistry
+from prompt_shaper import ApproximateTokenizer, PromptShaper, compact_text
+
+
+def _shaper(**kwargs):
+    return PromptShaper(tokenizer=ApproximateTokenizer(), metrics=MetricsRegistry(enabled=False), **kwargs)
+
+
+def test_approximate_tokenizer_round_trips():
+    tokenizer = ApproximateTokenizer(chars_per_token=4)
+    text = "  Hola, mi producto\nno funciona: error 0x80070005!  "
+    tokens = tokenizer.encode(text)
+    assert tokenizer.decode(tokens) == text
+    assert len(tokenizer.encode("internationalization")) == 5
+
+
+def test_compact_folds_repeated_lines():
+    log = "start\nERROR timeout\nERROR timeout\nERROR timeout\n\n\n\nend   "
+    assert compact_text(log) == "start\nERROR timeout (repeated 3 times)\n\nend"
+
+
+def test_short_query_gets_domain_budget():
+    shaped = _shaper().shape("Why was I charged twice?", 'billing')
+    assert shaped['inputs'] == "Why was I charged twice?"
+    assert shaped['max_new_tokens'] == 256
+    assert shaped['generation_tokens_saved'] == 512 - 256
+    assert not shaped['truncated']
+
+
+def test_long_input_is_compacted_then_truncated():
+    shaper = _shaper(max_input_tokens=200, max_total_tokens=400, min_new_tokens=64)
+    repeated_log = "Mi router no funciona\n" + "WARN retrying connection\n" * 500
+    shaped = shaper.shape(repeated_log, 'technical')
+    assert shaped['compacted'] and not shaped['truncated']
+    assert "(repeated 500 times)" in shaped['inputs']
+
+    unique_log = "Mi router no funciona\n" + "".join(f"line {i} failed\n" for i in range(500)) + "please help"
+    shaped = shaper.shape(unique_log, 'technical')
+    assert shaped['truncated']
+    assert shaped['inputs'].startswith("Mi router no funciona") and shaped['inputs'].endswith("please help")
+    assert shaped['input_tokens'] <= shaper.input_limit
+    assert shaped['input_tokens'] + shaped['max_new_tokens'] <= 400
+    assert shaped['input_tokens_saved'] == shaped['original_input_tokens'] - shaped['input_tokens']
+    assert shaper.stats()['truncated'] == 1
+
+
+if __name__ == "__main__":
+    test_approximate_tokenizer_round_trips()
+    test_compact_folds_repeated_lines()
+    test_short_query_gets_domain_budget()
+    test_long_input_is_compacted_then_truncated()
@@ -0,0 +1,128 @@
+# File: multilingual-support/test_resilience.py
+
+import random
+
+import pytest
+from botocore.exceptions import ClientError
+
+from adapter_manager import LoraAdapterManager
+from fake_runtime import FakeSageMakerRuntime
+from resilience import CircuitBreaker, CircuitOpenError, RetryBudget, RetryPolicy, TokenBucket
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def _client_error(code, status=None):
+    response = {'Error': {'Code': code, 'Message': code}}
+    if status is not None:
+        response['OriginalStatusCode'] = status
+    return ClientError(response, 'InvokeEndpoint')
+
+
+def test_classify_distinguishes_throttling_from_model_errors():
+    assert RetryPolicy.classify(_client_error('ThrottlingException')) == 'throttle'
+    assert RetryPolicy.classify(_client_error('ModelError', 500)) == 'model'
+    assert RetryPolicy.classify(_client_error('ModelError', 400)) is None
+    assert RetryPolicy.classify(_client_error('ValidationError')) is None
+    assert RetryPolicy.classify(ValueError('bad json')) is None
+
+
+def test_backoff_is_jittered_and_capped():
+    policy = RetryPolicy(base_delay=0.1, max_delay=1.0, throttle_base_delay=0.5,
+                         throttle_max_delay=4.0, rng=random.Random(3))
+    delays = [policy.backoff(attempt, 'model') for attempt in range(10)]
+    assert all(0 <= delay <= 1.0 for delay in delays)
+    assert len(set(delays)) == len(delays)
+    assert all(0 <= policy.backoff(attempt, 'throttle') <= 4.0 for attempt in range(10))
+
+
+def test_token_bucket_and_retry_budget():
+    clock = FakeClock()
+    bucket = TokenBucket(rate=2, capacity=2, clock=clock)
+    assert bucket.try_acquire() and bucket.try_acquire()
+    assert not bucket.try_acquire()
+    clock.now += 0.5
+    assert bucket.try_acquire()
+
+    budget = RetryBudget(ratio=0.5, min_per_second=0, clock=clock)
+    budget._bucket._tokens = 0
+    budget.record_request()
+    assert not budget.try_spend()
+    budget.record_request()
+    assert budget.try_spend()
+
+
+def test_circuit_breaker_opens_and_probes():
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=10, clock=clock)
+    breaker.record_failure()
+    assert breaker.allow_request()
+    breaker.record_failure()
+    assert not breaker.allow_request()
+
+    clock.now += 10
+    assert breaker.allow_request()       # single probe
+    assert not breaker.allow_request()
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_manager_retries_then_fails_fast():
+    runtime = FakeSageMakerRuntime(time_scale=0, model_error_rate=1.0, seed=1)
+    manager = LoraAdapterManager(runtime=runtime)
+    manager.retry_policy = RetryPolicy(max_attempts=3, base_delay=0, budget=RetryBudget(ratio=1, min_per_second=100))
+    manager.circuit_breaker = CircuitBreaker(failure_threshold=3, reset_timeout=60)
+
+    with pytest.raises(runtime.exceptions.ModelError):
+        manager.invoke_model('hola')
+    assert runtime.stats()['requests'] == 3
+
+    with pytest.raises(CircuitOpenError):
+        manager.invoke_model('hola')
+    assert runtime.stats()['requests'] == 3
+
+
+def test_throttled_half_open_probe_then_recovery():
+    clock = FakeClock()
+    runtime = FakeSageMakerRuntime(time_scale=0, throttle_rate=1.0, seed=1)
+    manager = LoraAdapterManager(runtime=runtime)
+    manager.retry_policy = RetryPolicy(max_attempts=1, base_delay=0)
+    manager.circuit_breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10, clock=clock)
+    manager.circuit_breaker.record_failure()
+    clock.now += 10
+
+    with pytest.raises(ClientError):
+        manager.invoke_model('hola')
+    assert manager.circuit_breaker.state == CircuitBreaker.CLOSED
+
+    runtime.throttle_rate = 0.0
+    assert manager.invoke_model('hola')
+
+
+def test_abandoned_half_open_stream_releases_the_probe():
+    clock = FakeClock()
+    manager = LoraAdapterManager(runtime=FakeSageMakerRuntime(time_scale=0, seed=1))
+    manager.circuit_breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10, clock=clock)
+    manager.circuit_breaker.record_failure()
+    clock.now += 10
+
+    stream = manager.invoke_model_stream('hola')
+    next(stream)
+    stream.close()
+    assert manager.circuit_breaker.state == CircuitBreaker.HALF_OPEN
+    assert ''.join(manager.invoke_model_stream('hola'))
+    assert manager.circuit_breaker.state == CircuitBreaker.CLOSED
+
+
+if __name__ == "__main__":
+    test_classify_distinguishes_throttling_from_model_errors()
+    test_backoff_is_jittered_and_capped()
+    test_circuit_breaker_opens_and_probes()
+    test_throttled_half_open_probe_then_recovery()
+    test_abandoned_half_open_stream_releases_the_probe()
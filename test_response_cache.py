@@ -0,0 +1,62 @@
+# File: multilingual-support/test_response_cache.py
+
+from response_cache import ResponseCache, normalize_query
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_normalize_query():
+    assert normalize_query("  Hola,   mi producto\nNO está ") == normalize_query("hola, mi producto no está")
+
+
+def test_lru_eviction():
+    cache = ResponseCache(max_entries=2, ttl_seconds=60, disk_path=None)
+    cache.put('a', 'A')
+    cache.put('b', 'B')
+    assert cache.get('a') == 'A'  # 'a' becomes most recently used
+    cache.put('c', 'C')
+    assert cache.get('b') is None
+    assert cache.get('a') == 'A'
+    assert cache.stats()['evictions'] == 1
+
+
+def test_ttl_expiry():
+    clock = FakeClock()
+    cache = ResponseCache(max_entries=10, ttl_seconds=60, disk_path=None, clock=clock)
+    cache.put('a', 'A')
+    clock.now += 61
+    assert cache.get('a') is None
+    stats = cache.stats()
+    assert stats['expirations'] == 1
+    assert stats['misses'] == 1
+
+
+def test_disk_store_survives_restart(tmp_path):
+    db_path = str(tmp_path / 'responses.sqlite3')
+    cache = ResponseCache(max_entries=10, ttl_seconds=60, disk_path=db_path)
+    cache.put('a', 'A')
+    cache.close()
+
+    restarted = ResponseCache(max_entries=10, ttl_seconds=60, disk_path=db_path)
+    assert restarted.get('a') == 'A'
+    assert restarted.stats()['disk_hits'] == 1
+
+
+def test_sampled_payloads_bypass_unless_opted_in():
+    payload = {'inputs': 'hola', 'parameters': {'do_sample': True}}
+    assert not ResponseCache(disk_path=None).should_cache(payload)
+    assert ResponseCache(disk_path=None, cache_sampled=True).should_cache(payload)
+    assert ResponseCache(disk_path=None).should_cache({'inputs': 'hola', 'parameters': {'do_sample': False}})
+
+
+if __name__ == "__main__":
+    test_normalize_query()
+    test_lru_eviction()
+    test_ttl_expiry()
+    test_sampled_payloads_bypass_unless_opted_in()
@@ -0,0 +1,145 @@
+# File: multilingual-support/test_router.py
+
+import pytest
+from botocore.exceptions import ReadTimeoutError
+import router as router_module
+from adapter_manager import LoraAdapterManager
+from deadline import DeadlineExceeded
+from fake_runtime import FakeSageMakerRuntime
+from metrics import MetricsRegistry
+from router import EndpointRouter, RouteTarget
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def _target(name, runtime=None, **kwargs):
+    return RouteTarget('multilingual-support', variant=name,
+                       runtime=runtime or FakeSageMakerRuntime(time_scale=0), **kwargs)
+
+
+def test_least_outstanding_weighted_by_latency():
+    fast, slow = _target('fast'), _target('slow')
+    fast.ewma_latency, slow.ewma_latency = 1.0, 3.0
+    router = EndpointRouter([fast, slow])
+    # (outstanding + 1) * latency: fast wins until 3 requests are outstanding there (ties go to the first)
+    assert [router.choose().variant for _ in range(4)] == ['fast', 'fast', 'fast', 'slow']
+
+
+def test_adapter_affinity_breaks_near_ties():
+    first, second = _target('a'), _target('b')
+    router = EndpointRouter([first, second], affinity_discount=0.5)
+    second.recent_adapters['fr-billing-support'] = None
+    assert router.choose('fr-billing-support') is second
+    assert router.choose('es-technical-support') is first
+
+
+def test_failing_target_is_ejected_and_probed_back_in():
+    clock = FakeClock()
+    broken_runtime = FakeSageMakerRuntime(time_scale=0, model_error_rate=1.0, seed=1)
+    broken = _target('broken', broken_runtime, failure_threshold=2, ejection_seconds=10, clock=clock)
+    healthy = _target('healthy', failure_threshold=2, ejection_seconds=10, clock=clock)
+    broken.ewma_latency = 0.1  # preferred until it fails
+    router = EndpointRouter([broken, healthy])
+    body = '{"inputs": "hola", "parameters": {"adapter_name": "es-technical-support"}}'
+
+    failures = 0
+    for _ in range(6):
+        try:
+            response = router.invoke_endpoint(EndpointName='ignored', ContentType='application/json', Body=body)
+            assert response['InvokedProductionVariant'] == 'healthy'
+        except broken_runtime.exceptions.ModelError:
+            failures += 1
+    assert failures == 2
+    assert router.stats()[0]['state'] == 'open' and router.stats()[0]['ejections'] == 1
+
+    broken_runtime.model_error_rate = 0.0
+    clock.now += 11
+    response = router.invoke_endpoint(EndpointName='ignored', ContentType='application/json', Body=body)
+    assert response['InvokedProductionVariant'] == 'broken'
+    assert router.stats()[0]['state'] == 'closed'
+
+
+def test_manager_routes_across_stand_in_endpoints():
+    runtimes = [FakeSageMakerRuntime(time_scale=0), FakeSageMakerRuntime(time_scale=0)]
+    router = EndpointRouter([_target(f"v{i}", runtime) for i, runtime in enumerate(runtimes)])
+    manager = LoraAdapterManager(runtime=router, metrics=MetricsRegistry(enabled=False))
+    assert "Bonjour" in manager.invoke_model("Bonjour", 'french', 'billing')
+    streamed = ''.join(manager.invoke_model_stream("Hola", 'spanish', 'technical'))
+    assert streamed
+    assert sum(runtime.stats()['requests'] for runtime in runtimes) == 2
+    assert all(target['outstanding'] == 0 for target in router.stats())
+    assert any('fr-billing-support' in target['recent_adapters'] for target in router.stats())
+
+
+class SlowSharedClient:
+    """Stands in for a shared runtime client whose calls outlive any read timeout"""
+    exceptions = FakeSageMakerRuntime(time_scale=0).exceptions
+
+    def __init__(self, read_timeout, calls):
+        self.read_timeout = read_timeout
+        self.calls = calls
+
+    def invoke_endpoint(self, **kwargs):
+        self.calls.append(self.read_timeout)
+        raise ReadTimeoutError(endpoint_url='https://runtime.sagemaker.us-east-1.amazonaws.com')
+
+
+def test_deadline_bounds_a_routed_call(monkeypatch):
+    calls = []
+    monkeypatch.setattr(router_module, 'get_runtime_client',
+                        lambda region=None, read_timeout=None: SlowSharedClient(read_timeout, calls))
+    target = RouteTarget('multilingual-support', variant='shared', failure_threshold=1)
+    router = EndpointRouter([target])
+    manager = LoraAdapterManager(runtime=router, metrics=MetricsRegistry(enabled=False))
+    try:
+        manager.invoke_model("Hola", 'spanish', 'technical', deadline=2.5)
+        assert False, "expected DeadlineExceeded"
+    except DeadlineExceeded as e:
+        assert e.stage == 'invoke_endpoint'
+    # The call used a client with the deadline's read timeout step, not the default one
+    assert calls == [2]
+    # A timeout shortened to fit a deadline does not eject the target
+    assert router.stats()[0]['state'] == 'closed'
+    assert (router.stats()[0]['outstanding'], router.stats()[0]['failures']) == (0, 0)
+
+
+def test_abandoned_stream_releases_the_target_without_a_sample():
+    target = _target('only', FakeSageMakerRuntime(time_scale=0, response_tokens=8))
+    target.ewma_latency = 5.0
+    router = EndpointRouter([target])
+    body = '{"inputs": "hola", "parameters": {"adapter_name": "es-technical-support"}}'
+    events = router.invoke_endpoint_with_response_stream(EndpointName='ignored', Body=body)['Body']
+    next(events)
+    events.close()
+    stats = router.stats()[0]
+    assert stats['outstanding'] == 0
+    assert stats['ewma_latency_seconds'] == 5.0
+    assert stats['recent_adapters'] == []
+
+    # An abandoned probe leaves the target half-open for the next one
+    clock = FakeClock()
+    ejected = _target('ejected', failure_threshold=1, ejection_seconds=10, clock=clock)
+    router = EndpointRouter([ejected])
+    ejected.health.record_failure()
+    clock.now += 11
+    events = router.invoke_endpoint_with_response_stream(EndpointName='ignored', Body=body)['Body']
+    next(events)
+    events.close()
+    assert router.stats()[0]['state'] == 'half_open'
+    assert router.choose() is ejected
+
+
+if __name__ == "__main__":
+    test_least_outstanding_weighted_by_latency()
+    test_adapter_affinity_breaks_near_ties()
+    test_failing_target_is_ejected_and_probed_back_in()
+    test_manager_routes_across_stand_in_endpoints()
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        test_deadline_bounds_a_routed_call(monkeypatch)
+    test_abandoned_stream_releases_the_target_without_a_sample()
@@ -0,0 +1,108 @@
+# File: multilingual-support/test_semantic_cache.py
+
+import numpy as np
+from adapter_manager import LoraAdapterManager
+from fake_runtime import FakeSageMakerRuntime
+from inference_handler import CustomerSupportInference
+from metrics import MetricsRegistry
+from semantic_cache import SemanticCache, embed_queries
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_embeddings_are_unit_length_and_rank_paraphrases_higher():
+    vectors = embed_queries([
+        "My invoice is wrong",
+        "my invoice is wrong!",
+        "The invoice is wrong",
+        "How do I reset my router?",
+    ])
+    assert np.allclose(np.linalg.norm(vectors, axis=1), 1.0)
+    similarities = vectors[1:] @ vectors[0]
+    assert similarities[0] > similarities[1] > similarities[2]
+
+
+def test_hit_above_threshold_and_miss_below(tmp_path):
+    cache = SemanticCache(threshold=0.8, capacity_per_adapter=4, index_dir=str(tmp_path))
+    cache.put('fr-billing-support', "My invoice is wrong", "Sorry about your invoice")
+    response, similarity = cache.get('fr-billing-support', "my invoice is wrong!")
+    assert response == "Sorry about your invoice" and similarity >= 0.8
+    assert cache.get('fr-billing-support', "How do I reset my router?") is None
+    assert cache.get('es-billing-support', "My invoice is wrong") is None  # other adapter
+    assert isinstance(cache._indexes['fr-billing-support'].vectors, np.memmap)
+
+    stats = cache.stats()
+    assert stats['hits'] == 1 and stats['misses'] == 2
+    assert stats['similarity']['+Inf'] == 3
+
+
+def test_instances_sharing_index_dir_do_not_share_entries(tmp_path):
+    first = SemanticCache(threshold=0.8, capacity_per_adapter=4, index_dir=str(tmp_path))
+    second = SemanticCache(threshold=0.8, capacity_per_adapter=4, index_dir=str(tmp_path))
+    first.put('fr-billing-support', "My invoice is wrong", "Sorry about your invoice")
+    second.put('fr-billing-support', "How do I reset my router?", "Hold the reset button")
+    assert first.get('fr-billing-support', "My invoice is wrong")[0] == "Sorry about your invoice"
+    assert second.get('fr-billing-support', "My invoice is wrong") is None
+
+
+def test_lru_eviction_and_ttl():
+    clock = FakeClock()
+    cache = SemanticCache(threshold=0.95, capacity_per_adapter=2, ttl_seconds=60, index_dir=None, clock=clock)
+    cache.put('a', "first question about payments", "A")
+    cache.put('a', "second question about routers", "B")
+    assert cache.get('a', "first question about payments")[0] == "A"
+    cache.put('a', "third question about features", "C")  # evicts the routers entry
+    assert cache.get('a', "second question about routers") is None
+    assert cache.get('a', "first question about payments")[0] == "A"
+    assert cache.stats()['evictions'] == 1
+
+    clock.now += 61
+    assert cache.get('a', "first question about payments") is None
+    assert cache.stats()['expirations'] == 1
+
+
+def test_handler_answers_paraphrase_from_cache():
+    runtime = FakeSageMakerRuntime(time_scale=0)
+    manager = LoraAdapterManager(runtime=runtime, metrics=MetricsRegistry(enabled=False))
+    handler = CustomerSupportInference(adapter_manager=manager,
+                                       semantic_cache=SemanticCache(threshold=0.8, index_dir=None,
+                                                                    cache_sampled=True))
+    first = handler.process_query("Bonjour, my invoice is wrong")
+    second = handler.process_query("bonjour, my invoice is wrong!")
+    assert first['status'] == second['status'] == 'success'
+    assert second['response'] == first['response']
+    assert runtime.stats()['requests'] == 1
+
+
+def test_handler_skips_sampled_and_deadline_shortened_answers():
+    manager = LoraAdapterManager(runtime=FakeSageMakerRuntime(time_scale=0),
+                                 metrics=MetricsRegistry(enabled=False))
+    sampled = SemanticCache(threshold=0.8, index_dir=None)
+    CustomerSupportInference(adapter_manager=manager, semantic_cache=sampled) \
+        .process_query("Bonjour, my invoice is wrong")
+    assert sampled.stats()['size'] == {} and sampled.stats()['bypassed'] == 1
+
+    shortened = SemanticCache(threshold=0.8, index_dir=None, cache_sampled=True)
+    result = CustomerSupportInference(adapter_manager=manager, semantic_cache=shortened) \
+        .process_query("Bonjour, my invoice is wrong", deadline=1.0)
+    assert result['status'] == 'success'
+    assert shortened.stats()['size'] == {}
+
+
+if __name__ == "__main__":
+    import tempfile
+    from pathlib import Path
+    test_embeddings_are_unit_length_and_rank_paraphrases_higher()
+    with tempfile.TemporaryDirectory() as tmp:
+        test_hit_above_threshold_and_miss_below(Path(tmp))
+    with tempfile.TemporaryDirectory() as tmp:
+        test_instances_sharing_index_dir_do_not_share_entries(Path(tmp))
+    test_lru_eviction_and_ttl()
+    test_handler_answers_paraphrase_from_cache()
+    test_handler_skips_sampled_and_deadline_shortened_answers()
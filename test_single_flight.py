@@ -0,0 +1,56 @@
+# File: multilingual-support/test_single_flight.py
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from single_flight import SingleFlight
+
+
+def test_identical_calls_share_one_execution():
+    group = SingleFlight()
+    release = threading.Event()
+    executions = []
+
+    def slow_call():
+        executions.append(1)
+        release.wait(5)
+        return 'respuesta'
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        futures = [executor.submit(group.do, 'same-payload', slow_call) for _ in range(8)]
+        while group.stats()['calls'] < 8:
+            time.sleep(0.01)
+        release.set()
+        results = [f.result() for f in futures]
+
+    assert results == ['respuesta'] * 8
+    assert len(executions) == 1
+    stats = group.stats()
+    assert stats['coalesced'] == 7
+    assert stats['in_flight'] == 0
+
+
+def test_results_are_not_kept_after_completion():
+    group = SingleFlight()
+    assert group.do('key', lambda: 'first') == 'first'
+    assert group.do('key', lambda: 'second') == 'second'
+    assert group.stats()['coalesced'] == 0
+
+
+def test_errors_propagate_to_caller():
+    group = SingleFlight()
+
+    def failing_call():
+        raise RuntimeError('model error')
+
+    with pytest.raises(RuntimeError):
+        group.do('key', failing_call)
+    assert group.in_flight() == 0
+
+
+if __name__ == "__main__":
+    test_identical_calls_share_one_execution()
+    test_results_are_not_kept_after_completion()
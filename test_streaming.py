@@ -0,0 +1,51 @@
+# File: multilingual-support/test_streaming.py
+
+import json
+
+from streaming import StreamLatencyStats, TokenStreamDecoder
+
+
+def _stream_bytes(tokens):
+    lines = [json.dumps({'token': {'id': i, 'text': t}}, ensure_ascii=False) for i, t in enumerate(tokens)]
+    lines[-1] = json.dumps({'token': {'id': len(tokens), 'text': tokens[-1]},
+                            'generated_text': ''.join(tokens)}, ensure_ascii=False)
+    return ('\n'.join(lines) + '\n').encode('utf-8')
+
+
+def test_tokens_survive_arbitrary_chunk_boundaries():
+    tokens = ['Здравствуйте', ', ', 'ваш ', 'продукт', ' está']
+    data = _stream_bytes(tokens)
+
+    for chunk_size in (1, 3, 7, len(data)):
+        decoder = TokenStreamDecoder()
+        received = []
+        for i in range(0, len(data), chunk_size):
+            received.extend(decoder.feed(data[i:i + chunk_size]))
+        received.extend(decoder.flush())
+        assert received == tokens
+        assert decoder.generated_text == ''.join(tokens)
+
+
+def test_unterminated_last_line_and_sse_framing():
+    decoder = TokenStreamDecoder()
+    assert decoder.feed(b'data: {"token": {"text": "Bon"}}\n\ndata: {"token": {"text": "jour"}}') == ['Bon']
+    assert decoder.flush() == ['jour']
+
+
+def test_outputs_format():
+    decoder = TokenStreamDecoder()
+    assert decoder.feed(b'{"outputs": ["Hola"]}\n') == ['Hola']
+
+
+def test_latency_summary():
+    stats = StreamLatencyStats()
+    stats.record(0.2, 2.0)
+    stats.record(None, 0.5)
+    summary = stats.summary()
+    assert summary['streams'] == 2
+    assert summary['ttft_ms']['p50'] == 200.0
+
+
+if __name__ == "__main__":
+    test_tokens_survive_arbitrary_chunk_boundaries()
+    test_unterminated_last_line_and_sse_framing()